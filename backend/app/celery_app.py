@@ -1,14 +1,77 @@
 """Celery应用配置"""
-from celery import Celery
+from celery import Celery, Task
 from celery.schedules import crontab
+from celery.signals import worker_process_init
+from flask import current_app, has_app_context
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
+# 本进程共享的 Flask 应用及其常驻应用上下文
+_flask_app = None
+_flask_app_context = None
+
+
+def get_flask_app():
+    """本进程的 Flask 应用（首次调用时创建并推入常驻应用上下文，之后复用）"""
+    global _flask_app, _flask_app_context
+    
+    if _flask_app is None:
+        from app import create_app
+        _flask_app = create_app(register_blueprints=False)
+        _flask_app_context = _flask_app.app_context()
+        _flask_app_context.push()
+    
+    return _flask_app
+
+
+class AppContextTask(Task):
+    """
+    在进程共享的应用上下文中执行任务，不再每次调用 create_app
+    任务结束后归还数据库会话，避免上一个任务的会话状态带入下一个任务
+    """
+    
+    def __call__(self, *args, **kwargs):
+        # 调用方已在其他应用的上下文中（如测试），直接使用该上下文，会话由调用方管理
+        if has_app_context() and current_app._get_current_object() is not _flask_app:
+            return self.run(*args, **kwargs)
+        
+        get_flask_app()
+        
+        from app import db
+        try:
+            return self.run(*args, **kwargs)
+        finally:
+            db.session.remove()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """worker 子进程启动时创建应用并预热数据库连接池与平台客户端"""
+    from app import db
+    from app.platform_client import get_platform_client
+    
+    get_flask_app()
+    
+    # 不沿用 fork 前父进程的连接
+    db.engine.dispose(close=False)
+    try:
+        with db.engine.connect():
+            pass
+    except Exception as e:
+        logger.warning(f"预热数据库连接失败: {e}")
+    
+    get_platform_client()
+
+
 # 创建Celery应用
 celery = Celery(
     'job_monitor',
     broker=os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
     backend=os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
-    include=['app.tasks.monitor', 'app.tasks.email']
+    include=['app.tasks.monitor', 'app.tasks.email', 'app.tasks.scheduler'],
+    task_cls=AppContextTask
 )
 
 # 配置
@@ -26,10 +89,10 @@ celery.conf.update(
 
 # 定时任务配置
 celery.conf.beat_schedule = {
-    # 每30分钟执行一次监控任务
-    'execute-all-monitoring-tasks': {
-        'task': 'app.tasks.monitor.execute_all_monitoring_tasks',
-        'schedule': crontab(minute='*/30'),
+    # 每分钟领取到期的监控规则（各规则按自己的下次执行时间错开，默认每30分钟执行一次）
+    'schedule-due-rules': {
+        'task': 'app.tasks.scheduler.schedule_due_rules',
+        'schedule': crontab(minute='*'),
     },
 }
 
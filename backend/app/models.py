@@ -2,9 +2,21 @@
 from datetime import datetime
 from app import db
 import bcrypt
+import hashlib
 import json
 
 
+# 变化检测比较的招聘关键字段
+JOB_KEY_FIELDS = ['salary_min', 'salary_max', 'job_description', 'status', 'experience_required']
+
+
+def job_fingerprint(job):
+    """招聘关键字段的 64 位指纹（blake2b，转为有符号整数以存入 BIGINT）"""
+    payload = json.dumps([job.get(field) for field in JOB_KEY_FIELDS], ensure_ascii=False, separators=(',', ':'))
+    digest = hashlib.blake2b(payload.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
 class User(db.Model):
     """用户表"""
     __tablename__ = 'users'
@@ -60,9 +72,19 @@ class MonitoringRule(db.Model):
     is_active = db.Column(db.Boolean, default=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_executed_at = db.Column(db.DateTime)
+    # 增量同步水位：已同步到的平台变更序号，为空表示需要全量同步
+    sync_seq = db.Column(db.BigInteger)
+    # 水位所属的平台变更日志纪元，与平台当前纪元不同时序号不可比较，需要全量同步
+    sync_epoch = db.Column(db.String(32))
+    last_full_sync_at = db.Column(db.DateTime)
+    # 下次计划执行时间，由调度任务按批领取到期的规则；为空表示尚未排期
+    next_run_at = db.Column(db.DateTime, index=True)
+    # 自适应执行间隔（分钟），为空表示使用默认间隔
+    poll_interval = db.Column(db.Integer)
     
     # 关系
     scan_results = db.relationship('ScanResult', backref='rule', lazy='dynamic', cascade='all, delete-orphan')
+    rule_jobs = db.relationship('RuleJob', backref='rule', lazy='dynamic', cascade='all, delete-orphan')
     
     def get_keywords(self):
         """获取关键词列表"""
@@ -88,6 +110,16 @@ class MonitoringRule(db.Model):
         """设置城市过滤列表"""
         self.city_filter = json.dumps(cities_list, ensure_ascii=False)
     
+    def filter_state(self):
+        """决定命中招聘的匹配条件（存储形式），用于判断条件是否被修改"""
+        return (self.keywords, self.exclude_keywords, self.city_filter, self.salary_min, self.salary_max)
+    
+    def reset_sync_watermark(self):
+        """清除增量同步水位：匹配条件变化后已有命中记录不再可靠，下次执行全量同步"""
+        self.sync_epoch = None
+        self.sync_seq = None
+        self.last_full_sync_at = None
+    
     def to_dict(self):
         """转换为字典"""
         return {
@@ -102,7 +134,9 @@ class MonitoringRule(db.Model):
             'notification_count': self.notification_count,
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_executed_at': self.last_executed_at.isoformat() if self.last_executed_at else None
+            'last_executed_at': self.last_executed_at.isoformat() if self.last_executed_at else None,
+            'next_run_at': self.next_run_at.isoformat() if self.next_run_at else None,
+            'poll_interval': self.poll_interval
         }
 
 
@@ -114,14 +148,29 @@ class ScanResult(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False, index=True)
     rule_id = db.Column(db.Integer, db.ForeignKey('monitoring_rules.rule_id'), nullable=False, index=True)
     scan_time = db.Column(db.DateTime, default=datetime.utcnow, index=True)
-    jobs_new = db.Column(db.Text)  # JSON
-    jobs_updated = db.Column(db.Text)  # JSON
-    jobs_deleted = db.Column(db.Text)  # JSON
+    jobs_new = db.Column(db.Text)  # JSON（旧数据，新结果改存 job_refs）
+    jobs_updated = db.Column(db.Text)  # JSON（旧数据）
+    jobs_deleted = db.Column(db.Text)  # JSON（旧数据）
+    job_refs = db.Column(db.Text)  # JSON: {"new"/"updated"/"deleted": [[招聘ID, 版本], ...]}
+    new_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_count = db.Column(db.Integer, nullable=False, default=0)
+    deleted_count = db.Column(db.Integer, nullable=False, default=0)
+    full_sync = db.Column(db.Boolean, nullable=False, default=False)  # 是否为全量对账（不参与自适应轮询）
     email_sent = db.Column(db.Boolean, default=False)
     email_sent_time = db.Column(db.DateTime)
     
+    def get_job_refs(self):
+        """获取招聘版本引用"""
+        return json.loads(self.job_refs) if self.job_refs else {}
+    
+    def set_job_refs(self, refs):
+        """设置招聘版本引用"""
+        self.job_refs = json.dumps(refs, ensure_ascii=False)
+    
     def get_jobs_new(self):
         """获取新增招聘列表"""
+        if self.job_refs:
+            return JobVersion.resolve(self.get_job_refs().get('new'))
         return json.loads(self.jobs_new) if self.jobs_new else []
     
     def set_jobs_new(self, jobs_list):
@@ -130,6 +179,8 @@ class ScanResult(db.Model):
     
     def get_jobs_updated(self):
         """获取更新招聘列表"""
+        if self.job_refs:
+            return JobVersion.resolve(self.get_job_refs().get('updated'))
         return json.loads(self.jobs_updated) if self.jobs_updated else []
     
     def set_jobs_updated(self, jobs_list):
@@ -138,24 +189,35 @@ class ScanResult(db.Model):
     
     def get_jobs_deleted(self):
         """获取删除招聘列表"""
+        if self.job_refs:
+            return JobVersion.resolve(self.get_job_refs().get('deleted'))
         return json.loads(self.jobs_deleted) if self.jobs_deleted else []
     
     def set_jobs_deleted(self, jobs_list):
         """设置删除招聘列表"""
         self.jobs_deleted = json.dumps(jobs_list, ensure_ascii=False)
     
-    def to_dict(self):
-        """转换为字典"""
+    def to_summary_dict(self):
+        """转换为摘要字典（列表页使用，只含变化数量，不读取招聘数据）"""
         return {
             'result_id': self.result_id,
             'rule_id': self.rule_id,
             'scan_time': self.scan_time.isoformat() if self.scan_time else None,
-            'jobs_new': self.get_jobs_new(),
-            'jobs_updated': self.get_jobs_updated(),
-            'jobs_deleted': self.get_jobs_deleted(),
+            'new_count': self.new_count,
+            'updated_count': self.updated_count,
+            'deleted_count': self.deleted_count,
             'email_sent': self.email_sent,
             'email_sent_time': self.email_sent_time.isoformat() if self.email_sent_time else None,
-            'total_changes': len(self.get_jobs_new()) + len(self.get_jobs_updated()) + len(self.get_jobs_deleted())
+            'total_changes': self.new_count + self.updated_count + self.deleted_count
+        }
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            **self.to_summary_dict(),
+            'jobs_new': self.get_jobs_new(),
+            'jobs_updated': self.get_jobs_updated(),
+            'jobs_deleted': self.get_jobs_deleted()
         }
 
 
@@ -193,25 +255,61 @@ class UserPreference(db.Model):
         }
 
 
-class JobCache(db.Model):
-    """招聘信息缓存表（用于变化检测）"""
-    __tablename__ = 'job_cache'
+class Job(db.Model):
+    """招聘信息表（每个平台招聘一行，所有规则共享，保存当前版本）"""
+    __tablename__ = 'jobs'
     
-    cache_id = db.Column(db.Integer, primary_key=True)
-    rule_id = db.Column(db.Integer, db.ForeignKey('monitoring_rules.rule_id'), nullable=False, index=True)
-    job_id = db.Column(db.String(100), nullable=False, index=True)
+    job_id = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)  # 关键字段每变化一次递增
+    fingerprint = db.Column(db.BigInteger)  # 当前版本的关键字段指纹
     job_data = db.Column(db.Text)  # JSON
-    cached_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def get_job_data(self):
+        """获取招聘数据"""
+        return json.loads(self.job_data) if self.job_data else {}
+
+
+class JobVersion(db.Model):
+    """招聘版本表（扫描结果引用某一版本，展示当时的招聘内容）"""
+    __tablename__ = 'job_versions'
+    
+    version_id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(100), db.ForeignKey('jobs.job_id'), nullable=False, index=True)
+    version = db.Column(db.Integer, nullable=False)
+    fingerprint = db.Column(db.BigInteger)
+    job_data = db.Column(db.Text)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     __table_args__ = (
-        db.UniqueConstraint('rule_id', 'job_id', name='uq_rule_job'),
+        db.UniqueConstraint('job_id', 'version', name='uq_job_version'),
     )
     
     def get_job_data(self):
         """获取招聘数据"""
         return json.loads(self.job_data) if self.job_data else {}
     
-    def set_job_data(self, data):
-        """设置招聘数据"""
-        self.job_data = json.dumps(data, ensure_ascii=False)
+    @classmethod
+    def resolve(cls, refs):
+        """把 [招聘ID, 版本] 引用列表解析为招聘数据列表（保持顺序）"""
+        if not refs:
+            return []
+        
+        keys = [(job_id, version) for job_id, version in refs]
+        rows = db.session.query(cls.job_id, cls.version, cls.job_data).filter(
+            db.tuple_(cls.job_id, cls.version).in_(keys)
+        )
+        data = {(job_id, version): job_data for job_id, version, job_data in rows}
+        
+        return [json.loads(data[key]) for key in keys if key in data]
+
 
+class RuleJob(db.Model):
+    """规则命中的招聘（只记录命中关系及命中时的版本，用于变化检测）"""
+    __tablename__ = 'rule_jobs'
+    
+    rule_id = db.Column(db.Integer, db.ForeignKey('monitoring_rules.rule_id'), primary_key=True)
+    job_id = db.Column(db.String(100), db.ForeignKey('jobs.job_id'), primary_key=True, index=True)
+    version = db.Column(db.Integer, nullable=False)
+    fingerprint = db.Column(db.BigInteger)  # 该版本的关键字段指纹，变化检测时无需连表
+    matched_at = db.Column(db.DateTime, default=datetime.utcnow)
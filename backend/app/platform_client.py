@@ -0,0 +1,144 @@
+"""
+模拟平台 HTTP 客户端
+每个进程共享一个 requests.Session：连接池复用 keep-alive 连接，幂等请求按带抖动的指数退避重试，
+并按接口统计调用次数、失败次数与耗时
+"""
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import requests
+import threading
+import logging
+import random
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+# 超过该耗时（秒）的调用记录警告日志
+SLOW_CALL_SECONDS = 2
+
+# 平台过载或重启时返回的状态码，幂等请求遇到时重试
+RETRY_STATUSES = (502, 503, 504)
+
+
+class PlatformClient:
+    """模拟平台客户端（线程安全，可在请求线程与任务间共享）"""
+
+    def __init__(self, base_url, pool_size=10, connect_timeout=3, read_timeout=30,
+                 retries=3, backoff=0.3, backoff_jitter=0.2):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_jitter = backoff_jitter
+
+        # 只重试幂等方法（GET/HEAD 等）；批量查询与匹配虽只读但使用 POST，不自动重试
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def request(self, method, path, endpoint=None, timeout=None, **kwargs):
+        """
+        发起请求，返回 requests.Response，网络错误抛出 requests.RequestException
+        endpoint: 统计用的接口名（路径含ID时应指定，默认取路径）
+        timeout: 秒数或 (连接, 读取) 元组，默认使用客户端配置
+        stream=True 时统计的是收到响应头的耗时
+        """
+        endpoint = endpoint or path
+        start = time.perf_counter()
+
+        try:
+            response = self.session.request(
+                method,
+                f'{self.base_url}{path}',
+                timeout=timeout or self.timeout,
+                **kwargs
+            )
+        except requests.RequestException:
+            self.record(endpoint, time.perf_counter() - start, error=True)
+            raise
+
+        self.record(endpoint, time.perf_counter() - start, error=response.status_code >= 500)
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def backoff_delay(self, attempt):
+        """第 attempt 次重试前的等待秒数（与 session 的重试策略一致）"""
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff_jitter)
+
+    def record(self, endpoint, seconds, error=False):
+        """记录一次调用（并发获取等不经过 session 的调用也通过此方法计入统计）"""
+        with self._lock:
+            stats = self._metrics.setdefault(endpoint, {
+                'count': 0,
+                'errors': 0,
+                'total_seconds': 0.0,
+                'max_seconds': 0.0
+            })
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['total_seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+        if seconds >= SLOW_CALL_SECONDS:
+            logger.warning(f"平台调用较慢: {endpoint} 耗时 {seconds:.2f}s")
+
+    def metrics(self):
+        """各接口的调用统计快照"""
+        with self._lock:
+            return {
+                endpoint: {
+                    **stats,
+                    'avg_seconds': stats['total_seconds'] / stats['count'] if stats['count'] else 0.0
+                }
+                for endpoint, stats in self._metrics.items()
+            }
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_platform_client():
+    """
+    当前进程共享的平台客户端（需在应用上下文中首次调用，按应用配置创建）
+    Celery prefork 子进程不能沿用父进程的连接，按进程号重新创建
+    """
+    global _client, _client_pid
+
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                config = current_app.config
+                _client = PlatformClient(
+                    config['MOCK_PLATFORM_URL'],
+                    pool_size=config['PLATFORM_POOL_SIZE'],
+                    connect_timeout=config['PLATFORM_CONNECT_TIMEOUT'],
+                    read_timeout=config['PLATFORM_READ_TIMEOUT'],
+                    retries=config['PLATFORM_RETRIES'],
+                    backoff=config['PLATFORM_RETRY_BACKOFF']
+                )
+                _client_pid = os.getpid()
+
+    return _client
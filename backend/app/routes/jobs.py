@@ -2,12 +2,13 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from datetime import datetime
+from app.platform_client import get_platform_client
 import requests
-import os
 
 bp = Blueprint('jobs', __name__)
 
-MOCK_PLATFORM_URL = os.getenv('MOCK_PLATFORM_URL', 'http://localhost:5001')
+# 代理接口等待平台的超时时间（秒），比后台任务短
+PROXY_TIMEOUT = 10
 
 
 @bp.route('', methods=['GET'])
@@ -52,7 +53,7 @@ def get_jobs():
     }
     
     try:
-        response = requests.get(f'{MOCK_PLATFORM_URL}/api/v1/jobs', params=params, timeout=10)
+        response = get_platform_client().get('/api/v1/jobs', params=params, timeout=PROXY_TIMEOUT)
         response.raise_for_status()
         return jsonify(response.json())
     except requests.RequestException as e:
@@ -84,7 +85,71 @@ def get_job_detail(job_id):
         description: 成功获取招聘详情
     """
     try:
-        response = requests.get(f'{MOCK_PLATFORM_URL}/api/v1/jobs/{job_id}', timeout=10)
+        response = get_platform_client().get(
+            f'/api/v1/jobs/{job_id}',
+            endpoint='/api/v1/jobs/<job_id>',
+            timeout=PROXY_TIMEOUT
+        )
+        response.raise_for_status()
+        return jsonify(response.json())
+    except requests.RequestException as e:
+        return jsonify({
+            'code': 500,
+            'message': f'无法连接到招聘平台: {str(e)}',
+            'data': None,
+            'timestamp': datetime.utcnow().isoformat()
+        }), 500
+
+
+@bp.route('/batch', methods=['POST'])
+@jwt_required()
+def get_jobs_batch():
+    """
+    批量获取招聘详情
+    ---
+    tags:
+      - 招聘信息
+    security:
+      - Bearer: []
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - ids
+          properties:
+            ids:
+              type: array
+              items:
+                type: string
+              description: 招聘ID列表（最多500个）
+    responses:
+      200:
+        description: 成功获取招聘详情，jobs 为 招聘ID -> 招聘信息，missing 为不存在的ID
+      400:
+        description: 参数错误
+    """
+    data = request.get_json(silent=True) or {}
+    
+    if not isinstance(data.get('ids'), list):
+        return jsonify({
+            'code': 400,
+            'message': '缺少招聘ID列表',
+            'data': None,
+            'timestamp': datetime.utcnow().isoformat()
+        }), 400
+    
+    try:
+        response = get_platform_client().post(
+            '/api/v1/jobs/batch',
+            json={'ids': data['ids']},
+            timeout=PROXY_TIMEOUT
+        )
+        # 参数错误原样返回给调用方
+        if response.status_code == 400:
+            return jsonify(response.json()), 400
         response.raise_for_status()
         return jsonify(response.json())
     except requests.RequestException as e:
@@ -135,7 +200,7 @@ def search_jobs():
     }
     
     try:
-        response = requests.get(f'{MOCK_PLATFORM_URL}/api/v1/jobs/search', params=params, timeout=10)
+        response = get_platform_client().get('/api/v1/jobs/search', params=params, timeout=PROXY_TIMEOUT)
         response.raise_for_status()
         return jsonify(response.json())
     except requests.RequestException as e:
@@ -146,3 +211,24 @@ def search_jobs():
             'timestamp': datetime.utcnow().isoformat()
         }), 500
 
+@bp.route('/platform-metrics', methods=['GET'])
+@jwt_required()
+def get_platform_metrics():
+    """
+    获取本进程调用招聘平台的统计
+    ---
+    tags:
+      - 招聘信息
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: 各平台接口的调用次数、失败次数与耗时（秒）
+    """
+    return jsonify({
+        'code': 0,
+        'message': 'success',
+        'data': get_platform_client().metrics(),
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
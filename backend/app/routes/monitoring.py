@@ -224,6 +224,8 @@ def update_monitoring_rule(rule_id):
             'data': None
         }), 404
     
+    filters_before = rule.filter_state()
+    
     # 更新字段
     if 'rule_name' in data:
         rule.rule_name = data['rule_name']
@@ -244,6 +246,10 @@ def update_monitoring_rule(rule_id):
     if 'is_active' in data:
         rule.is_active = data['is_active']
     
+    # 匹配条件变化后，按旧条件同步的水位不能继续增量使用
+    if rule.filter_state() != filters_before:
+        rule.reset_sync_watermark()
+    
     db.session.commit()
     
     return jsonify({
@@ -1,12 +1,21 @@
 """扫描结果路由"""
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
 from datetime import datetime
 from app import db
 from app.models import ScanResult
 
 bp = Blueprint('scan_results', __name__)
 
+# 摘要序列化所需的列
+SUMMARY_COLUMNS = (
+    ScanResult.result_id, ScanResult.rule_id, ScanResult.scan_time,
+    ScanResult.new_count, ScanResult.updated_count, ScanResult.deleted_count,
+    ScanResult.email_sent, ScanResult.email_sent_time
+)
+
 
 @bp.route('', methods=['GET'])
 @jwt_required()
@@ -45,12 +54,12 @@ def get_scan_results():
     if rule_id:
         query = query.filter_by(rule_id=int(rule_id))
     
-    # 按时间倒序
-    query = query.order_by(ScanResult.scan_time.desc())
+    # 按时间倒序；列表只返回摘要，不加载招聘数据列
+    query = query.options(load_only(*SUMMARY_COLUMNS)).order_by(ScanResult.scan_time.desc())
     
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     
-    results = [result.to_dict() for result in pagination.items]
+    results = [result.to_summary_dict() for result in pagination.items]
     
     return jsonify({
         'code': 0,
@@ -125,24 +134,29 @@ def get_scan_stats():
     """
     current_user_id = int(get_jwt_identity())  # 转回整数
     
-    # 获取最近的扫描结果统计
-    recent_results = ScanResult.query.filter_by(user_id=current_user_id)\
+    # 获取最近的扫描结果统计（直接对数量列求和）
+    recent_results = db.session.query(
+        ScanResult.new_count, ScanResult.updated_count, ScanResult.deleted_count
+    ).filter_by(user_id=current_user_id)\
         .order_by(ScanResult.scan_time.desc())\
         .limit(10)\
-        .all()
+        .subquery()
     
-    total_new = sum(len(r.get_jobs_new()) for r in recent_results)
-    total_updated = sum(len(r.get_jobs_updated()) for r in recent_results)
-    total_deleted = sum(len(r.get_jobs_deleted()) for r in recent_results)
+    recent_scans, total_new, total_updated, total_deleted = db.session.query(
+        func.count(),
+        func.coalesce(func.sum(recent_results.c.new_count), 0),
+        func.coalesce(func.sum(recent_results.c.updated_count), 0),
+        func.coalesce(func.sum(recent_results.c.deleted_count), 0)
+    ).select_from(recent_results).one()
     
     return jsonify({
         'code': 0,
         'message': 'success',
         'data': {
-            'recent_scans': len(recent_results),
-            'total_new_jobs': total_new,
-            'total_updated_jobs': total_updated,
-            'total_deleted_jobs': total_deleted
+            'recent_scans': recent_scans,
+            'total_new_jobs': int(total_new),
+            'total_updated_jobs': int(total_updated),
+            'total_deleted_jobs': int(total_deleted)
         },
         'timestamp': datetime.utcnow().isoformat()
     })
@@ -1,7 +1,8 @@
 """邮件发送任务"""
 from app.celery_app import celery
-from app import create_app, db, mail
+from app import db, mail
 from app.models import ScanResult, User, UserPreference, MonitoringRule
+from app.tasks.monitor import DIGEST_WINDOWS, pending_digest_results
 from flask_mail import Message
 from datetime import datetime
 import logging
@@ -12,62 +13,70 @@ logger = logging.getLogger(__name__)
 @celery.task(bind=True, name='app.tasks.email.send_monitoring_notification')
 def send_monitoring_notification(self, result_id):
     """发送监控通知邮件"""
-    app = create_app(register_blueprints=False)
+    result = ScanResult.query.get(result_id)
     
-    with app.app_context():
-        result = ScanResult.query.get(result_id)
-        
-        if not result:
-            logger.error(f"扫描结果不存在: {result_id}")
-            return {'error': 'Result not found'}
+    if not result:
+        logger.error(f"扫描结果不存在: {result_id}")
+        return {'error': 'Result not found'}
+    
+    user = User.query.get(result.user_id)
+    rule = MonitoringRule.query.get(result.rule_id)
+    preference = UserPreference.query.filter_by(user_id=result.user_id).first()
+    
+    if not user or not rule:
+        logger.error(f"用户或规则不存在: user_id={result.user_id}, rule_id={result.rule_id}")
+        return {'error': 'User or rule not found'}
+    
+    # 获取收件人邮箱
+    recipient = preference.email_address if preference and preference.email_address else user.email
+    
+    # 汇总通知合并此前尚未通知的扫描结果；都已由之前的汇总发送时不再发送
+    results = [result]
+    if rule.notification_trigger in DIGEST_WINDOWS:
+        results = pending_digest_results(rule.rule_id, up_to=result_id).all()
+        if not results:
+            logger.info(f"没有待汇总的扫描结果，跳过通知: result_id={result_id}")
+            return {'result_id': result_id, 'skipped': True}
+    
+    # 构建邮件内容
+    subject, body = build_email_content(user, rule, results)
+    
+    try:
+        # 发送邮件
+        msg = Message(
+            subject=subject,
+            recipients=[recipient],
+            html=body
+        )
         
-        user = User.query.get(result.user_id)
-        rule = MonitoringRule.query.get(result.rule_id)
-        preference = UserPreference.query.filter_by(user_id=result.user_id).first()
+        mail.send(msg)
         
-        if not user or not rule:
-            logger.error(f"用户或规则不存在: user_id={result.user_id}, rule_id={result.rule_id}")
-            return {'error': 'User or rule not found'}
+        # 更新发送状态
+        sent_time = datetime.utcnow()
+        for sent in results:
+            sent.email_sent = True
+            sent.email_sent_time = sent_time
+        db.session.commit()
         
-        # 获取收件人邮箱
-        recipient = preference.email_address if preference and preference.email_address else user.email
+        logger.info(f"邮件发送成功: result_id={result_id}, recipient={recipient}")
         
-        # 构建邮件内容
-        subject, body = build_email_content(user, rule, result)
+        return {
+            'result_id': result_id,
+            'recipient': recipient,
+            'sent_at': datetime.utcnow().isoformat()
+        }
         
-        try:
-            # 发送邮件
-            msg = Message(
-                subject=subject,
-                recipients=[recipient],
-                html=body
-            )
-            
-            mail.send(msg)
-            
-            # 更新发送状态
-            result.email_sent = True
-            result.email_sent_time = datetime.utcnow()
-            db.session.commit()
-            
-            logger.info(f"邮件发送成功: result_id={result_id}, recipient={recipient}")
-            
-            return {
-                'result_id': result_id,
-                'recipient': recipient,
-                'sent_at': datetime.utcnow().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"邮件发送失败: {e}")
-            raise
+    except Exception as e:
+        logger.error(f"邮件发送失败: {e}")
+        raise
 
 
-def build_email_content(user: User, rule: MonitoringRule, result: ScanResult):
-    """构建邮件内容"""
-    jobs_new = result.get_jobs_new()
-    jobs_updated = result.get_jobs_updated()
-    jobs_deleted = result.get_jobs_deleted()
+def build_email_content(user: User, rule: MonitoringRule, results):
+    """构建邮件内容（results 为按时间先后排列的一条或多条扫描结果，多条时合并展示）"""
+    result = results[-1]
+    jobs_new = [job for item in results for job in item.get_jobs_new()]
+    jobs_updated = [job for item in results for job in item.get_jobs_updated()]
+    jobs_deleted = [job for item in results for job in item.get_jobs_deleted()]
     
     total_changes = len(jobs_new) + len(jobs_updated) + len(jobs_deleted)
     
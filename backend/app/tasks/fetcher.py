@@ -0,0 +1,75 @@
+"""
+并发获取平台搜索结果
+一个批量任务内用 asyncio + aiohttp 同时发起多条规则的平台搜索请求，
+信号量限制同时在途的请求数，避免压垮平台；
+超时、重试退避与耗时统计沿用进程共享的平台客户端配置
+"""
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from app.platform_client import RETRY_STATUSES
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PATH = '/api/v1/jobs/search'
+
+
+async def _search(client, session, semaphore, params):
+    """请求一次平台搜索接口（网络错误与 5xx 按客户端策略重试），失败时返回 None"""
+    # aiohttp 不接受 None 参数，与 requests 一样省略
+    params = {key: value for key, value in params.items() if value is not None}
+
+    for attempt in range(client.retries + 1):
+        if attempt:
+            await asyncio.sleep(client.backoff_delay(attempt - 1))
+
+        start = time.perf_counter()
+        async with semaphore:
+            try:
+                async with session.get(f'{client.base_url}{SEARCH_PATH}', params=params) as response:
+                    if response.status in RETRY_STATUSES and attempt < client.retries:
+                        client.record(SEARCH_PATH, time.perf_counter() - start, error=True)
+                        continue
+                    response.raise_for_status()
+                    data = await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                client.record(SEARCH_PATH, time.perf_counter() - start, error=True)
+                if attempt < client.retries and not isinstance(e, aiohttp.ClientResponseError):
+                    continue
+                logger.error(f"请求模拟平台失败: {e}")
+                return None
+
+        client.record(SEARCH_PATH, time.perf_counter() - start)
+
+        if data.get('code') == 0:
+            return data['data']['jobs']
+
+        logger.error(f"平台返回错误: {data.get('message')}")
+        return None
+
+
+async def _search_all(client, params_list, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    connect_timeout, read_timeout = client.timeout
+
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=concurrency),
+        timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+    ) as session:
+        return await asyncio.gather(*(
+            _search(client, session, semaphore, params) for params in params_list
+        ))
+
+
+def search_many(client, params_list, concurrency=50):
+    """
+    并发执行多组平台搜索，返回与 params_list 一一对应的招聘列表（失败的为 None）
+    client 为 PlatformClient；在同步代码（Celery 任务）中调用，内部新建事件循环
+    """
+    if not params_list:
+        return []
+
+    return asyncio.run(_search_all(client, params_list, concurrency))
@@ -0,0 +1,170 @@
+"""
+本地规则匹配
+把一批监控规则编译为一个关键词自动机（Aho-Corasick）+ 城市集合 + 薪资区间，
+对每条招聘只扫描一遍文本即可得到命中的全部规则
+"""
+from collections import deque
+
+
+class KeywordAutomaton:
+    """多模式子串匹配自动机（关键词统一小写）"""
+
+    def __init__(self, keywords):
+        # 每个状态：字符 -> 下一状态
+        self.goto = [{}]
+        self.fail = [0]
+        # 每个状态结束的关键词编号（含经失败链可达的关键词）
+        self.output = [set()]
+
+        for keyword_id, keyword in enumerate(keywords):
+            self._insert(keyword, keyword_id)
+
+        self._build()
+
+    def _insert(self, keyword, keyword_id):
+        state = 0
+        for char in keyword:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(set())
+            state = next_state
+        self.output[state].add(keyword_id)
+
+    def _build(self):
+        """按广度优先计算失败指针"""
+        queue = deque(self.goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] |= self.output[self.fail[next_state]]
+
+    def search(self, text, found):
+        """扫描文本，把命中的关键词编号加入 found"""
+        state = 0
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+
+        return found
+
+
+class CompiledRule:
+    """编译后的单条规则"""
+
+    __slots__ = ('rule_id', 'keyword_ids', 'exclude_ids', 'cities', 'salary_min', 'salary_max')
+
+    def __init__(self, rule_id, keyword_ids, exclude_ids, cities, salary_min, salary_max):
+        self.rule_id = rule_id
+        self.keyword_ids = keyword_ids
+        self.exclude_ids = exclude_ids
+        self.cities = cities
+        self.salary_min = salary_min
+        self.salary_max = salary_max
+
+    def accepts(self, job, hits):
+        """关键词命中后的其余条件：排除词、城市、薪资区间重叠"""
+        if self.exclude_ids and not self.exclude_ids.isdisjoint(hits):
+            return False
+        if self.cities and job.get('location') not in self.cities:
+            return False
+        return job['salary_max'] >= self.salary_min and job['salary_min'] <= self.salary_max
+
+
+class RuleMatcher:
+    """
+    批量规则匹配器
+    规则字段与平台 /api/v1/jobs/match 一致：keywords 命中任一、exclude_keywords 命中任一则排除、
+    cities 命中任一、salary_min/salary_max 与岗位薪资区间重叠；
+    关键词在岗位名称、公司、技能中做不区分大小写的子串匹配
+    """
+
+    def __init__(self, rules):
+        """rules: [{'rule_id', 'keywords', 'exclude_keywords', 'cities', 'salary_min', 'salary_max'}]"""
+        keyword_ids = {}
+
+        def intern(keywords):
+            ids = set()
+            for keyword in keywords or []:
+                keyword = keyword.strip().lower()
+                if keyword:
+                    ids.add(keyword_ids.setdefault(keyword, len(keyword_ids)))
+            return frozenset(ids)
+
+        self.rules = []
+        # 关键词编号 -> 含该关键词的规则
+        self.by_keyword = {}
+        # 没有关键词的规则对所有招聘都要检查
+        self.unconditional = []
+
+        for rule in rules:
+            compiled = CompiledRule(
+                rule_id=rule['rule_id'],
+                keyword_ids=intern(rule.get('keywords')),
+                exclude_ids=intern(rule.get('exclude_keywords')),
+                cities=frozenset(rule.get('cities') or []),
+                salary_min=rule.get('salary_min') or 0,
+                salary_max=rule.get('salary_max') or 999999
+            )
+            self.rules.append(compiled)
+
+            if compiled.keyword_ids:
+                for keyword_id in compiled.keyword_ids:
+                    self.by_keyword.setdefault(keyword_id, []).append(compiled)
+            else:
+                self.unconditional.append(compiled)
+
+        self.automaton = KeywordAutomaton(sorted(keyword_ids, key=keyword_ids.get))
+
+    def keyword_hits(self, job):
+        """招聘命中的关键词编号；各字段分别扫描，避免跨字段拼接出的误匹配"""
+        hits = set()
+        self.automaton.search(job['position'].lower(), hits)
+        self.automaton.search(job['company'].lower(), hits)
+        for skill in job.get('skills') or []:
+            self.automaton.search(skill.lower(), hits)
+        return hits
+
+    def match(self, job):
+        """返回该招聘命中的规则ID列表"""
+        hits = self.keyword_hits(job)
+
+        candidates = {}
+        for keyword_id in hits:
+            for rule in self.by_keyword.get(keyword_id, ()):
+                candidates[rule.rule_id] = rule
+        for rule in self.unconditional:
+            candidates[rule.rule_id] = rule
+
+        return [rule_id for rule_id, rule in candidates.items() if rule.accepts(job, hits)]
+
+    def match_all(self, jobs):
+        """一遍扫描全部招聘，返回 规则ID -> 命中的招聘列表"""
+        matched = {rule.rule_id: [] for rule in self.rules}
+
+        for job in jobs:
+            if job.get('status', 'active') != 'active':
+                continue
+            for rule_id in self.match(job):
+                matched[rule_id].append(job)
+
+        return matched
@@ -1,115 +1,606 @@
 """监控任务"""
 from app.celery_app import celery
-from app import create_app, db
-from app.models import MonitoringRule, ScanResult, JobCache
-from datetime import datetime
+from app import db
+from app.models import MonitoringRule, ScanResult, Job, JobVersion, RuleJob, JOB_KEY_FIELDS, job_fingerprint
+from app.tasks.matcher import RuleMatcher
+from app.tasks.fetcher import search_many
+from app.tasks.polling import adapt_poll_interval
+from app.platform_client import get_platform_client
+from flask import current_app
+from sqlalchemy import delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime, timedelta
+import hashlib
+import json
 import requests
+import redis
+import time
+import zlib
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
-MOCK_PLATFORM_URL = os.getenv('MOCK_PLATFORM_URL', 'http://localhost:5001')
+# 一轮扫描内共享的平台查询结果缓存时间（秒），与调度的扫描窗口（MONITOR_SWEEP_WINDOW_MINUTES）一致：
+# 窗口结束后的调度属于新一轮，旧结果不再被读取
+SWEEP_CACHE_TTL = int(os.getenv('SWEEP_CACHE_TTL', 10 * 60))
+# 同一查询由一个任务负责请求，其余任务等待其结果的最长时间（秒）
+SWEEP_FETCH_WAIT = 30
+# 全量导出的请求超时与等待时间（秒）
+EXPORT_TIMEOUT = 120
+# 缓存批量写入时每条语句的行数
+CACHE_WRITE_CHUNK = 1000
+# 汇总通知的时间窗口
+DIGEST_WINDOWS = {
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1)
+}
 
 
 @celery.task(bind=True, name='app.tasks.monitor.execute_all_monitoring_tasks')
 def execute_all_monitoring_tasks(self):
-    """执行所有活跃的监控任务"""
-    app = create_app(register_blueprints=False)
+    """立即执行所有活跃的监控任务（定时执行由 app.tasks.scheduler 按各规则的下次执行时间分散调度）"""
+    # 获取所有活跃的监控规则
+    rules = MonitoringRule.query.filter_by(is_active=True).all()
     
-    with app.app_context():
-        # 获取所有活跃的监控规则
-        rules = MonitoringRule.query.filter_by(is_active=True).all()
-        
-        logger.info(f"开始执行 {len(rules)} 个监控任务")
-        
-        for rule in rules:
-            try:
-                execute_monitoring_task.delay(rule.rule_id)
-            except Exception as e:
-                logger.error(f"提交监控任务失败 rule_id={rule.rule_id}: {e}")
-        
-        return {
-            'executed_count': len(rules),
-            'timestamp': datetime.utcnow().isoformat()
-        }
+    logger.info(f"开始执行 {len(rules)} 个监控任务")
+    
+    # 本轮扫描标识：同一轮内查询条件相同的规则共享一次平台请求
+    sweep_id = self.request.id or datetime.utcnow().strftime('%Y%m%d%H%M%S')
+    
+    return dispatch_rules(sweep_id, [rule.rule_id for rule in rules])
 
 
-@celery.task(bind=True, name='app.tasks.monitor.execute_monitoring_task')
-def execute_monitoring_task(self, rule_id):
-    """执行单个监控任务"""
-    app = create_app(register_blueprints=False)
+def dispatch_rules(sweep_id, rule_ids):
+    """按监控匹配模式提交一轮扫描的规则任务"""
+    batch_task = {
+        'local': execute_rule_batch,
+        'batch': execute_search_batch
+    }.get(current_app.config['MONITOR_MATCH_MODE'])
     
-    with app.app_context():
-        rule = MonitoringRule.query.get(rule_id)
-        
-        if not rule:
-            logger.error(f"监控规则不存在: {rule_id}")
-            return {'error': 'Rule not found'}
-        
-        logger.info(f"开始执行监控任务: rule_id={rule_id}, rule_name={rule.rule_name}")
-        
+    if batch_task is not None:
+        return dispatch_rule_batches(
+            batch_task,
+            sweep_id,
+            rule_ids,
+            current_app.config['MONITOR_MATCH_BATCH_SIZE']
+        )
+    
+    for rule_id in rule_ids:
         try:
-            # 1. 从模拟平台获取招聘信息
-            jobs = fetch_jobs_from_platform(rule)
-            
-            # 2. 获取上次的缓存数据
-            cached_jobs = get_cached_jobs(rule_id)
-            
-            # 3. 检测变化
-            changes = detect_changes(jobs, cached_jobs)
-            
-            # 4. 更新缓存
-            update_job_cache(rule_id, jobs)
-            
-            # 5. 保存扫描结果
-            result = save_scan_result(rule, changes)
-            
-            # 6. 更新规则执行时间
-            rule.last_executed_at = datetime.utcnow()
-            db.session.commit()
-            
-            # 7. 触发邮件通知
+            execute_monitoring_task.delay(rule_id, sweep_id)
+        except Exception as e:
+            logger.error(f"提交监控任务失败 rule_id={rule_id}: {e}")
+    
+    return {
+        'executed_count': len(rule_ids),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+
+def dispatch_rule_batches(batch_task, sweep_id, rule_ids, batch_size):
+    """
+    批量模式：按批提交规则任务
+    先记录本轮的平台变更序号，全量数据由首个需要的批量任务获取并在本轮共享
+    """
+    fetch_platform_watermark(sweep_id)
+    
+    batch_count = 0
+    for start in range(0, len(rule_ids), batch_size):
+        batch = rule_ids[start:start + batch_size]
+        try:
+            batch_task.delay(batch, sweep_id)
+            batch_count += 1
+        except Exception as e:
+            logger.error(f"提交批量监控任务失败 rule_ids={batch[0]}..{batch[-1]}: {e}")
+    
+    return {
+        'executed_count': len(rule_ids),
+        'batch_count': batch_count,
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+
+@celery.task(bind=True, name='app.tasks.monitor.execute_rule_batch')
+def execute_rule_batch(self, rule_ids, sweep_id):
+    """
+    本地匹配一批监控规则
+    需要全量同步的规则读取本轮共享的全量数据，编译后一遍扫描得到每条规则的命中招聘；
+    可增量同步的规则只应用变更日志；之后逐条规则走与单规则任务相同的变化检测与结果保存流程
+    """
+    rules = MonitoringRule.query.filter(
+        MonitoringRule.rule_id.in_(rule_ids),
+        MonitoringRule.is_active.is_(True)
+    ).all()
+    
+    full_matches = {}
+    # 导出失败也只尝试一次：其余需全量同步的规则直接失败，不再逐条重试导出
+    export_failed = []
+    
+    def fetch_full(rule):
+        # 全量导出与匹配在本批内只做一次
+        if export_failed:
+            raise RuntimeError(export_failed[0])
+        if not full_matches:
+            jobs = load_sweep_export(sweep_id)
+            if jobs is None:
+                export_failed.append(f"无法获取本轮平台数据: sweep_id={sweep_id}")
+                raise RuntimeError(export_failed[0])
+            full_matches.update(RuleMatcher([rule_filters(r) for r in rules]).match_all(jobs))
+        return full_matches[rule.rule_id]
+    
+    results = []
+    for rule in rules:
+        try:
+            jobs, cached_jobs = sync_rule_jobs(
+                rule, sweep_id, rule_filters(rule), lambda: fetch_full(rule)
+            )
+            results.append(process_rule_jobs(rule, jobs, cached_jobs))
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"执行监控任务失败 rule_id={rule.rule_id}: {e}")
+    
+    logger.info(f"批量监控任务完成: sweep_id={sweep_id}, 规则数={len(rules)}")
+    
+    return {
+        'sweep_id': sweep_id,
+        'rule_count': len(rules),
+        'results': results
+    }
+
+
+@celery.task(bind=True, name='app.tasks.monitor.execute_search_batch')
+def execute_search_batch(self, rule_ids, sweep_id):
+    """
+    并发搜索一批监控规则
+    可增量同步的规则只应用变更日志；其余规则的平台搜索请求在本任务内并发发出（查询参数相同的只请求一次），
+    全部返回后再逐条做变化检测，每条规则在独立的保存点内写入，整批只提交一次
+    """
+    rules = MonitoringRule.query.filter(
+        MonitoringRule.rule_id.in_(rule_ids),
+        MonitoringRule.is_active.is_(True)
+    ).all()
+    
+    # 同步水位在保存点之外修改，规则处理失败时需手动还原，避免跳过未处理的变更
+    watermarks = {rule.rule_id: (rule.sync_epoch, rule.sync_seq, rule.last_full_sync_at) for rule in rules}
+    
+    def restore_watermark(rule):
+        rule.sync_epoch, rule.sync_seq, rule.last_full_sync_at = watermarks[rule.rule_id]
+    
+    synced = {}
+    full_rules = []
+    for rule in rules:
+        try:
+            result = sync_rule_incremental(rule, sweep_id, search_filters(rule))
+        except Exception as e:
+            logger.error(f"增量同步失败 rule_id={rule.rule_id}: {e}")
+            restore_watermark(rule)
+            result = None
+        if result is None:
+            full_rules.append(rule)
+        else:
+            synced[rule.rule_id] = result
+    
+    if full_rules:
+        # 先记录序号再全量获取，与 sync_rule_jobs 相同
+        last_seq, epoch = fetch_platform_watermark(sweep_id)
+        searches = fetch_platform_searches(
+            sweep_id,
+            [build_search_params(rule) for rule in full_rules],
+            current_app.config['MONITOR_FETCH_CONCURRENCY']
+        )
+        now = datetime.utcnow()
+        for rule, jobs in zip(full_rules, searches):
+            if jobs is None:
+                logger.error(f"获取平台搜索结果失败 rule_id={rule.rule_id}")
+                continue
+            rule.sync_epoch = epoch
+            rule.sync_seq = last_seq
+            rule.last_full_sync_at = now
+            synced[rule.rule_id] = (jobs, None)
+    
+    results = []
+    notifications = []
+    for rule in rules:
+        if rule.rule_id not in synced:
+            continue
+        try:
+            with db.session.begin_nested():
+                summary, result, changes = apply_rule_changes(rule, *synced[rule.rule_id])
+            results.append(summary)
             if should_send_notification(rule, changes):
-                from app.tasks.email import send_monitoring_notification
-                send_monitoring_notification.delay(result.result_id)
-            
-            logger.info(f"监控任务完成: rule_id={rule_id}, 新增={len(changes['new'])}, "
-                       f"更新={len(changes['updated'])}, 下架={len(changes['deleted'])}")
-            
-            return {
-                'rule_id': rule_id,
-                'result_id': result.result_id,
-                'changes': {
-                    'new': len(changes['new']),
-                    'updated': len(changes['updated']),
-                    'deleted': len(changes['deleted'])
-                }
-            }
-            
+                notifications.append(result.result_id)
         except Exception as e:
-            logger.error(f"执行监控任务失败 rule_id={rule_id}: {e}")
-            raise
+            restore_watermark(rule)
+            logger.error(f"执行监控任务失败 rule_id={rule.rule_id}: {e}")
+    
+    db.session.commit()
+    
+    from app.tasks.email import send_monitoring_notification
+    for result_id in notifications:
+        send_monitoring_notification.delay(result_id)
+    
+    logger.info(f"并发搜索批量任务完成: sweep_id={sweep_id}, 规则数={len(rules)}, "
+               f"全量搜索={len(full_rules)}, 成功={len(results)}")
+    
+    return {
+        'sweep_id': sweep_id,
+        'rule_count': len(rules),
+        'results': results
+    }
+
+
+@celery.task(bind=True, name='app.tasks.monitor.execute_monitoring_task')
+def execute_monitoring_task(self, rule_id, sweep_id=None):
+    """
+    执行单个监控任务
+    sweep_id: 所属扫描轮次，由 execute_all_monitoring_tasks 传入；单独执行时为空，不使用共享缓存
+    """
+    rule = MonitoringRule.query.get(rule_id)
+    
+    if not rule:
+        logger.error(f"监控规则不存在: {rule_id}")
+        return {'error': 'Rule not found'}
+    
+    logger.info(f"开始执行监控任务: rule_id={rule_id}, rule_name={rule.rule_name}")
+    
+    try:
+        # 1. 从模拟平台获取招聘信息（有水位时只拉取变更）
+        jobs, cached_jobs = sync_rule_jobs(
+            rule, sweep_id, search_filters(rule), lambda: fetch_jobs_from_platform(rule, sweep_id)
+        )
+        
+        return process_rule_jobs(rule, jobs, cached_jobs)
+        
+    except Exception as e:
+        logger.error(f"执行监控任务失败 rule_id={rule_id}: {e}")
+        raise
+
+
+def sync_rule_jobs(rule: MonitoringRule, sweep_id, filters, fetch_full):
+    """
+    获取规则当前命中的招聘，返回 (招聘列表, 上次缓存)
+    规则有水位且未到全量对账时间时，只拉取水位之后的平台变更并用 filters 重新判断是否命中，
+    此时两者都只包含变更涉及的招聘，未涉及的招聘保持不变；
+    否则调用 fetch_full 全量获取，上次缓存为空表示由调用方按指纹比对
+    （平台日志纪元变化、日志被截断或序号回退时同样退回全量）
+    """
+    result = sync_rule_incremental(rule, sweep_id, filters)
+    if result is not None:
+        return result
+    
+    # 先记录序号再全量获取：获取期间发生的变更会在下次增量时重放（修补是幂等的）
+    last_seq, epoch = fetch_platform_watermark(sweep_id)
+    jobs = fetch_full()
+    
+    rule.sync_epoch = epoch
+    rule.sync_seq = last_seq
+    rule.last_full_sync_at = datetime.utcnow()
+    
+    return jobs, None
 
 
-def fetch_jobs_from_platform(rule: MonitoringRule):
-    """从模拟平台获取招聘信息"""
+def sync_rule_incremental(rule: MonitoringRule, sweep_id, filters):
+    """按水位增量同步，返回 (招聘列表, 上次缓存)；不满足增量条件或拉取失败时返回 None，由调用方全量获取"""
+    config = current_app.config
+    
+    if not (config['MONITOR_INCREMENTAL'] and rule.sync_seq is not None and rule.last_full_sync_at
+            and datetime.utcnow() - rule.last_full_sync_at < timedelta(hours=config['MONITOR_FULL_SYNC_HOURS'])):
+        return None
+    
+    updates = fetch_platform_updates(rule.sync_seq, sweep_id)
+    
+    # 纪元不同说明平台重新生成了数据或丢失了快照之后的变更，序号即使更大也与水位无关
+    if (updates is not None and not updates['resync'] and updates.get('epoch') == rule.sync_epoch
+            and updates['last_seq'] >= rule.sync_seq):
+        rule.sync_seq = updates['last_seq']
+        return apply_platform_updates(rule.rule_id, updates, filters)
+    
+    logger.info(f"无法增量同步，执行全量对账: rule_id={rule.rule_id}")
+    return None
+
+
+def apply_platform_updates(rule_id: int, updates, filters):
+    """
+    只处理平台变更涉及的招聘：返回 (其中仍命中规则的当前数据, 其中已在缓存中的上次数据)
+    交给 detect_changes 后，更新后仍命中的为新增或更新，不再命中或已下架的为下架
+    """
+    updated = updates['updated']
+    matched = RuleMatcher([filters]).match_all(updated)[filters['rule_id']]
+    
+    touched = [job['id'] for job in updated] + [job['id'] for job in updates['deleted']]
+    
+    return matched, get_cached_jobs(rule_id, touched)
+
+
+def process_rule_jobs(rule: MonitoringRule, jobs, cached_jobs=None):
+    """对规则当前命中的招聘做变化检测、更新缓存、保存结果并触发通知"""
+    summary, result, changes = apply_rule_changes(rule, jobs, cached_jobs)
+    db.session.commit()
+    
+    # 7. 触发邮件通知
+    if should_send_notification(rule, changes):
+        from app.tasks.email import send_monitoring_notification
+        send_monitoring_notification.delay(result.result_id)
+    
+    return summary
+
+
+def apply_rule_changes(rule: MonitoringRule, jobs, cached_jobs=None):
+    """
+    变化检测并写入缓存与扫描结果（只 flush 不提交，由调用方决定提交时机）
+    返回 (结果摘要, 扫描结果, 变化)
+    """
+    rule_id = rule.rule_id
+    
+    # 全量获取的结果在增量模式下是一次对账；未开启增量时每次都全量获取，只有首次扫描算作对账
+    full_sync = cached_jobs is None and (
+        current_app.config['MONITOR_INCREMENTAL'] or rule.last_executed_at is None
+    )
+    
+    # 2~3. 与上次的缓存比较检测变化
+    if cached_jobs is None:
+        changes = detect_changes_with_fingerprints(rule_id, jobs)
+    else:
+        changes = detect_changes(jobs, cached_jobs)
+    
+    # 4. 只把变化写入缓存（招聘版本全局共享，规则只记录命中关系）
+    cache_writes, versions = update_job_cache(rule_id, changes)
+    
+    # 5. 保存扫描结果（引用招聘版本，不再复制招聘数据）
+    result = save_scan_result(rule, changes, versions, full_sync)
+    
+    # 6. 更新规则执行时间，并按最近的变化情况调整执行间隔
+    rule.last_executed_at = datetime.utcnow()
+    adapt_poll_interval(rule, rule.last_executed_at, full_sync)
+    db.session.flush()
+    
+    logger.info(f"监控任务完成: rule_id={rule_id}, 新增={len(changes['new'])}, "
+               f"更新={len(changes['updated'])}, 下架={len(changes['deleted'])}, "
+               f"缓存写入={cache_writes['upserted']}, 缓存删除={cache_writes['deleted']}")
+    
+    summary = {
+        'rule_id': rule_id,
+        'result_id': result.result_id,
+        'changes': {
+            'new': len(changes['new']),
+            'updated': len(changes['updated']),
+            'deleted': len(changes['deleted'])
+        },
+        'cache_writes': cache_writes
+    }
+    
+    return summary, result, changes
+
+
+def build_search_params(rule: MonitoringRule):
+    """由监控规则生成平台搜索参数"""
     keywords = rule.get_keywords()
     cities = rule.get_city_filter()
     
-    params = {
+    return {
         'keyword': ','.join(keywords) if keywords else '',
         'city': cities[0] if cities else None,
         'salary_min': rule.salary_min or 0,
         'salary_max': rule.salary_max or 999999
     }
+
+
+def fetch_jobs_from_platform(rule: MonitoringRule, sweep_id=None):
+    """
+    从模拟平台获取招聘信息
+    指定 sweep_id 时先查本轮扫描的共享缓存，查询参数相同的规则只请求一次平台
+    """
+    params = build_search_params(rule)
+    
+    def produce():
+        jobs = search_platform(params)
+        return None if jobs is None else json.dumps(jobs, ensure_ascii=False).encode('utf-8')
+    
+    cached = sweep_shared(sweep_id, sweep_cache_key(sweep_id, params), produce, SWEEP_FETCH_WAIT)
+    return json.loads(cached) if cached is not None else []
+
+
+def search_filters(rule: MonitoringRule):
+    """与平台搜索参数等价的匹配条件（增量修补时在本地判断招聘是否仍命中）"""
+    params = build_search_params(rule)
+    
+    return {
+        'rule_id': rule.rule_id,
+        'keywords': [params['keyword']] if params['keyword'] else [],
+        'cities': [params['city']] if params['city'] else [],
+        'salary_min': params['salary_min'],
+        'salary_max': params['salary_max']
+    }
+
+
+def fetch_platform_searches(sweep_id, params_list, concurrency):
+    """
+    并发获取多组搜索结果，返回与 params_list 一一对应的招聘列表（失败的为 None）
+    先批量读取本轮扫描的共享缓存，只对未命中且互不相同的查询发请求，成功的结果写回缓存供其他批次使用
+    """
+    keys = [sweep_cache_key(sweep_id, params) for params in params_list]
+    values = dict.fromkeys(keys)
+    
+    from app import redis_client
+    
+    if sweep_id:
+        try:
+            values.update(zip(keys, redis_client.mget(keys)))
+        except redis.RedisError as e:
+            logger.warning(f"扫描缓存不可用，直接请求平台: {e}")
+            sweep_id = None
+    
+    missing = {key: params for key, params in zip(keys, params_list) if values[key] is None}
+    fetched = search_many(get_platform_client(), list(missing.values()), concurrency)
+    
+    for key, jobs in zip(missing, fetched):
+        if jobs is None:
+            continue
+        values[key] = json.dumps(jobs, ensure_ascii=False).encode('utf-8')
+        if sweep_id:
+            try:
+                redis_client.set(key, values[key], ex=SWEEP_CACHE_TTL)
+            except redis.RedisError as e:
+                logger.warning(f"写入扫描缓存失败: {e}")
+    
+    decoded = {key: json.loads(value) for key, value in values.items() if value is not None}
+    return [decoded.get(key) for key in keys]
+
+
+def sweep_shared(sweep_id, key, produce, wait):
+    """有扫描轮次时通过 Redis 在本轮共享 produce() 的结果，否则（或 Redis 不可用时）直接生成"""
+    if not sweep_id:
+        return produce()
     
     try:
-        response = requests.get(
-            f'{MOCK_PLATFORM_URL}/api/v1/jobs/search',
-            params=params,
-            timeout=30
-        )
+        return shared_sweep_value(key, produce, wait)
+    except redis.RedisError as e:
+        logger.warning(f"扫描缓存不可用，直接请求平台: {e}")
+        return produce()
+
+
+def fetch_platform_watermark(sweep_id=None):
+    """
+    平台当前的变更日志纪元与序号，返回 (序号, 纪元)，失败时均为 None
+    同一轮扫描内只取一次：本轮所有全量获取都发生在该序号之后
+    """
+    def produce():
+        try:
+            response = get_platform_client().get('/api/v1/stats', timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            if data.get('code') == 0:
+                watermark = {'last_seq': data['data']['last_seq'], 'epoch': data['data'].get('epoch')}
+                return json.dumps(watermark).encode('utf-8')
+            logger.error(f"平台返回错误: {data.get('message')}")
+        except (requests.RequestException, KeyError) as e:
+            logger.error(f"获取平台变更序号失败: {e}")
+        return None
+    
+    value = sweep_shared(sweep_id, f'platform_watermark:{sweep_id}', produce, SWEEP_FETCH_WAIT)
+    if value is None:
+        return None, None
+    
+    watermark = json.loads(value)
+    return watermark['last_seq'], watermark['epoch']
+
+
+def fetch_platform_updates(since_seq, sweep_id=None):
+    """拉取变更序号 since_seq 之后的平台更新，同一轮内相同水位的规则共享一次请求，失败时返回 None"""
+    def produce():
+        try:
+            response = get_platform_client().get(
+                '/api/v1/jobs/updates',
+                params={'since_seq': since_seq}
+            )
+            response.raise_for_status()
+            data = response.json()
+            if data.get('code') == 0:
+                return json.dumps(data['data'], ensure_ascii=False).encode('utf-8')
+            logger.error(f"平台返回错误: {data.get('message')}")
+        except requests.RequestException as e:
+            logger.error(f"拉取平台更新失败: {e}")
+        return None
+    
+    value = sweep_shared(sweep_id, f'platform_updates:{sweep_id}:{since_seq}', produce, SWEEP_FETCH_WAIT)
+    return json.loads(value) if value is not None else None
+
+
+def sweep_cache_key(sweep_id, params):
+    """共享缓存键：扫描轮次 + 规范化查询参数的摘要"""
+    normalized = json.dumps(
+        {key: value for key, value in params.items() if value is not None},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    digest = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+    return f'platform_fetch:{sweep_id}:{digest}'
+
+
+def shared_sweep_value(key, produce, wait):
+    """
+    读取本轮扫描内共享的值
+    未命中时以 SET NX 抢占生成锁，抢到的任务调用 produce() 生成并写入缓存，其余任务轮询等待；
+    produce 返回 None 表示失败，失败结果不缓存，避免影响同轮其他任务
+    """
+    from app import redis_client
+    
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + wait
+    
+    while True:
+        cached = redis_client.get(key)
+        if cached is not None:
+            return cached
+        
+        if redis_client.set(lock_key, 1, nx=True, ex=wait):
+            try:
+                value = produce()
+                if value is not None:
+                    redis_client.set(key, value, ex=SWEEP_CACHE_TTL)
+                return value
+            finally:
+                redis_client.delete(lock_key)
+        
+        if time.monotonic() >= deadline:
+            logger.warning(f"等待共享结果超时，自行生成: {key}")
+            return produce()
+        
+        time.sleep(0.2)
+
+
+def sweep_export_key(sweep_id):
+    return f'platform_export:{sweep_id}'
+
+
+def load_sweep_export(sweep_id):
+    """本轮扫描的全量在招招聘（整轮只从平台导出一次），失败时返回 None"""
+    data = sweep_shared(sweep_id, sweep_export_key(sweep_id), fetch_platform_export, EXPORT_TIMEOUT)
+    if data is None:
+        return None
+    
+    return [json.loads(line) for line in zlib.decompress(data).splitlines() if line]
+
+
+def fetch_platform_export():
+    """流式读取平台的 NDJSON 全量导出，边读边压缩，返回压缩后的字节串，失败时返回 None"""
+    compressor = zlib.compressobj()
+    chunks = []
+    
+    try:
+        with get_platform_client().get(
+            '/api/v1/jobs/export',
+            stream=True,
+            timeout=EXPORT_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                chunks.append(compressor.compress(chunk))
+    except requests.RequestException as e:
+        logger.error(f"导出平台数据失败: {e}")
+        return None
+    
+    chunks.append(compressor.flush())
+    return b''.join(chunks)
+
+
+def rule_filters(rule: MonitoringRule):
+    """本地匹配使用的规则条件（城市命中任一即可，排除关键词生效）"""
+    return {
+        'rule_id': rule.rule_id,
+        'keywords': rule.get_keywords(),
+        'exclude_keywords': rule.get_exclude_keywords(),
+        'cities': rule.get_city_filter(),
+        'salary_min': rule.salary_min,
+        'salary_max': rule.salary_max
+    }
+
+
+def search_platform(params):
+    """请求平台搜索接口，失败时返回 None"""
+    try:
+        response = get_platform_client().get('/api/v1/jobs/search', params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -117,17 +608,51 @@ def fetch_jobs_from_platform(rule: MonitoringRule):
             return data['data']['jobs']
         else:
             logger.error(f"平台返回错误: {data.get('message')}")
-            return []
+            return None
             
     except requests.RequestException as e:
         logger.error(f"请求模拟平台失败: {e}")
-        return []
+        return None
+
+
+def get_cached_jobs(rule_id: int, job_ids=None):
+    """获取规则上次命中的招聘（命中时的版本数据；指定 job_ids 时只读取这些招聘）"""
+    query = db.session.query(RuleJob.job_id, JobVersion.job_data).join(
+        JobVersion,
+        (JobVersion.job_id == RuleJob.job_id) & (JobVersion.version == RuleJob.version)
+    ).filter(RuleJob.rule_id == rule_id)
+    if job_ids is not None:
+        if not job_ids:
+            return {}
+        query = query.filter(RuleJob.job_id.in_(job_ids))
+    return {job_id: json.loads(job_data) for job_id, job_data in query}
+
 
+def get_cached_fingerprints(rule_id: int):
+    """只读取规则命中记录的 (招聘ID, 指纹)，不加载招聘数据"""
+    rows = db.session.query(RuleJob.job_id, RuleJob.fingerprint).filter_by(rule_id=rule_id)
+    return {job_id: fingerprint for job_id, fingerprint in rows}
 
-def get_cached_jobs(rule_id: int):
-    """获取缓存的招聘信息"""
-    cached = JobCache.query.filter_by(rule_id=rule_id).all()
-    return {cache.job_id: cache.get_job_data() for cache in cached}
+
+def detect_changes_with_fingerprints(rule_id: int, current_jobs):
+    """
+    基于指纹检测变化：先只读取命中记录的指纹，
+    仅对指纹不同以及已下架的招聘解码版本数据，再交给 detect_changes
+    """
+    fingerprints = get_cached_fingerprints(rule_id)
+    current = {job['id']: job for job in current_jobs}
+    
+    unchanged = {
+        job_id for job_id in current.keys() & fingerprints.keys()
+        if fingerprints[job_id] == job_fingerprint(current[job_id])
+    }
+    cached_jobs = get_cached_jobs(rule_id, list(fingerprints.keys() - unchanged))
+    
+    # 指纹相同的招聘以当前数据占位，不会被判定为新增或更新
+    for job_id in unchanged:
+        cached_jobs[job_id] = current[job_id]
+    
+    return detect_changes(current_jobs, cached_jobs)
 
 
 def detect_changes(current_jobs, cached_jobs):
@@ -173,9 +698,7 @@ def detect_changes(current_jobs, cached_jobs):
 
 def has_job_changed(current, cached):
     """判断招聘信息是否有变化"""
-    key_fields = ['salary_min', 'salary_max', 'job_description', 'status', 'experience_required']
-    
-    for field in key_fields:
+    for field in JOB_KEY_FIELDS:
         if current.get(field) != cached.get(field):
             return True
     
@@ -185,9 +708,8 @@ def has_job_changed(current, cached):
 def get_job_changes(current, cached):
     """获取具体的变化内容"""
     changes = {}
-    key_fields = ['salary_min', 'salary_max', 'job_description', 'status', 'experience_required']
     
-    for field in key_fields:
+    for field in JOB_KEY_FIELDS:
         if current.get(field) != cached.get(field):
             changes[field] = {
                 'old': cached.get(field),
@@ -197,53 +719,203 @@ def get_job_changes(current, cached):
     return changes
 
 
-def update_job_cache(rule_id: int, jobs):
-    """更新招聘缓存"""
-    # 删除旧缓存
-    JobCache.query.filter_by(rule_id=rule_id).delete()
+def store_job_versions(jobs):
+    """
+    把招聘写入全局招聘表，返回 招聘ID -> 当前版本
+    关键字段指纹与当前版本相同的招聘不写（多条规则命中同一招聘时只有第一条会写入），
+    指纹不同时版本号加一并追加一条版本记录
+    """
+    versions = {}
+    now = datetime.utcnow()
+    # 按招聘ID排序后分批：并发任务以相同顺序锁定行，避免相互等待形成死锁
+    jobs = sorted({job['id']: job for job in jobs}.values(), key=lambda job: job['id'])
     
-    # 添加新缓存
-    for job in jobs:
-        cache = JobCache(rule_id=rule_id, job_id=job['id'])
-        cache.set_job_data(job)
-        db.session.add(cache)
+    for start in range(0, len(jobs), CACHE_WRITE_CHUNK):
+        chunk = jobs[start:start + CACHE_WRITE_CHUNK]
+        existing = {
+            job_id: (version, fingerprint)
+            for job_id, version, fingerprint in db.session.query(
+                Job.job_id, Job.version, Job.fingerprint
+            ).filter(Job.job_id.in_([job['id'] for job in chunk]))
+        }
+        
+        values = []
+        for job in chunk:
+            fingerprint = job_fingerprint(job)
+            version, current = existing.get(job['id'], (0, None))
+            if version and current == fingerprint:
+                versions[job['id']] = version
+                continue
+            
+            versions[job['id']] = version + 1
+            values.append({
+                'job_id': job['id'],
+                'version': version + 1,
+                'fingerprint': fingerprint,
+                'job_data': json.dumps(job, ensure_ascii=False)
+            })
+        
+        if not values:
+            continue
+        
+        stmt = _dialect_insert()(Job).values([{**value, 'updated_at': now} for value in values])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['job_id'],
+            set_={
+                'version': stmt.excluded.version,
+                'fingerprint': stmt.excluded.fingerprint,
+                'job_data': stmt.excluded.job_data,
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+        db.session.execute(stmt)
+        
+        # 并发任务写入同一版本时以先写入的为准
+        stmt = _dialect_insert()(JobVersion).values([{**value, 'created_at': now} for value in values])
+        db.session.execute(stmt.on_conflict_do_nothing(index_elements=['job_id', 'version']))
     
-    db.session.commit()
+    return versions
 
 
-def save_scan_result(rule: MonitoringRule, changes):
-    """保存扫描结果"""
+def update_job_cache(rule_id: int, changes):
+    """
+    按变化差量更新规则命中记录：新增与更新的招聘先写入全局招聘表，
+    再以 INSERT ... ON CONFLICT 批量写入命中的版本，下架的招聘按ID批量删除，未变化的行不写
+    返回 (写入/删除的行数, 招聘ID -> 本次扫描引用的版本)
+    """
+    rows = changes['new'] + [u['current'] for u in changes['updated']]
+    deleted_ids = [job['id'] for job in changes['deleted']]
+    now = datetime.utcnow()
+    
+    versions = store_job_versions(rows)
+    
+    for start in range(0, len(rows), CACHE_WRITE_CHUNK):
+        values = [
+            {
+                'rule_id': rule_id,
+                'job_id': job['id'],
+                'version': versions[job['id']],
+                'fingerprint': job_fingerprint(job),
+                'matched_at': now
+            }
+            for job in rows[start:start + CACHE_WRITE_CHUNK]
+        ]
+        
+        stmt = _dialect_insert()(RuleJob).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['rule_id', 'job_id'],
+            set_={
+                'version': stmt.excluded.version,
+                'fingerprint': stmt.excluded.fingerprint,
+                'matched_at': stmt.excluded.matched_at
+            }
+        )
+        db.session.execute(stmt)
+    
+    for start in range(0, len(deleted_ids), CACHE_WRITE_CHUNK):
+        chunk = deleted_ids[start:start + CACHE_WRITE_CHUNK]
+        # 下架的招聘引用规则最后命中的版本
+        versions.update(
+            db.session.query(RuleJob.job_id, RuleJob.version).filter(
+                RuleJob.rule_id == rule_id,
+                RuleJob.job_id.in_(chunk)
+            )
+        )
+        db.session.execute(
+            delete(RuleJob).where(
+                RuleJob.rule_id == rule_id,
+                RuleJob.job_id.in_(chunk)
+            )
+        )
+    
+    db.session.flush()
+    
+    return {'upserted': len(rows), 'deleted': len(deleted_ids)}, versions
+
+
+def _dialect_insert():
+    """支持 ON CONFLICT 的 insert（生产为 PostgreSQL，本地开发可用 SQLite）"""
+    if db.engine.dialect.name == 'sqlite':
+        return sqlite.insert
+    return postgresql.insert
+
+
+def save_scan_result(rule: MonitoringRule, changes, versions, full_sync=False):
+    """保存扫描结果（以 [招聘ID, 版本] 引用招聘版本表）"""
     result = ScanResult(
         user_id=rule.user_id,
-        rule_id=rule.rule_id
+        rule_id=rule.rule_id,
+        new_count=len(changes['new']),
+        updated_count=len(changes['updated']),
+        deleted_count=len(changes['deleted']),
+        full_sync=full_sync
     )
     
-    result.set_jobs_new(changes['new'])
-    result.set_jobs_updated([u['current'] for u in changes['updated']])
-    result.set_jobs_deleted(changes['deleted'])
+    def refs(jobs):
+        return [[job['id'], versions[job['id']]] for job in jobs]
+    
+    result.set_job_refs({
+        'new': refs(changes['new']),
+        'updated': refs([u['current'] for u in changes['updated']]),
+        'deleted': refs(changes['deleted'])
+    })
     
     db.session.add(result)
-    db.session.commit()
+    db.session.flush()
     
     return result
 
 
 def should_send_notification(rule: MonitoringRule, changes):
     """判断是否应该发送通知"""
+    trigger = rule.notification_trigger
+    
+    # 汇总通知：与本次是否有变化无关，窗口到期且有未通知的变化时发送
+    if trigger in DIGEST_WINDOWS:
+        return digest_due(rule, DIGEST_WINDOWS[trigger])
+    
     total_changes = len(changes['new']) + len(changes['updated']) + len(changes['deleted'])
     
     if total_changes == 0:
         return False
     
-    trigger = rule.notification_trigger
-    
     if trigger == 'immediately':
         return True
     
     if trigger == 'when_count':
         return total_changes >= (rule.notification_count or 5)
     
-    # hourly, daily等可以根据last_executed_at判断
-    # 这里简化处理，直接返回True
     return True
 
+
+def digest_due(rule: MonitoringRule, window):
+    """
+    有尚未通知的变化，且距上次通知已超过汇总窗口；
+    从未通知过时从最早一条未通知的变化起算，一个窗口内至多发送一次
+    """
+    oldest_pending = pending_digest_results(rule.rule_id).order_by(None).with_entities(
+        func.min(ScanResult.scan_time)
+    ).scalar()
+    
+    if oldest_pending is None:
+        return False
+    
+    last_sent = db.session.query(func.max(ScanResult.email_sent_time)).filter(
+        ScanResult.rule_id == rule.rule_id,
+        ScanResult.email_sent.is_(True)
+    ).scalar()
+    
+    return datetime.utcnow() - (last_sent or oldest_pending) >= window
+
+
+def pending_digest_results(rule_id: int, up_to=None):
+    """尚未通知且有变化的扫描结果（up_to 指定时只取该结果及之前的）"""
+    query = ScanResult.query.filter(
+        ScanResult.rule_id == rule_id,
+        ScanResult.email_sent.isnot(True),
+        ScanResult.new_count + ScanResult.updated_count + ScanResult.deleted_count > 0
+    )
+    if up_to is not None:
+        query = query.filter(ScanResult.result_id <= up_to)
+    return query.order_by(ScanResult.result_id)
+
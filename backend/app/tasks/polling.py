@@ -0,0 +1,93 @@
+"""
+自适应轮询
+根据规则最近几次扫描结果的变化情况调整其执行间隔（poll_interval，分钟）：
+最近几次都没有变化的规则间隔加倍直到上限，变化频繁的规则间隔减半直到下限；
+调度任务再按全局每分钟轮询预算整体放大间隔（未配置预算时按规则数推导，总轮询量始终有上限）
+"""
+from app import db
+from app.models import MonitoringRule, ScanResult
+from flask import current_app
+from datetime import timedelta
+
+# 参考最近几次扫描结果
+HISTORY_SIZE = 4
+
+# 推导预算时在“全部规则按默认间隔执行”的轮询量上留出的余量：
+# 到期时间分布不均时的高峰不至于积压，变化频繁的规则也能用到其他规则让出的配额
+BUDGET_HEADROOM = 1.25
+
+
+def rule_interval(rule: MonitoringRule):
+    """规则当前的执行间隔（分钟），未调整过的使用默认间隔"""
+    return rule.poll_interval or current_app.config['MONITOR_INTERVAL_MINUTES']
+
+
+def recent_change_counts(rule_id: int):
+    """最近几次增量扫描的变化总数（新的在前），只读取数量列；全量对账的结果不计入"""
+    rows = db.session.query(
+        ScanResult.new_count + ScanResult.updated_count + ScanResult.deleted_count
+    ).filter(
+        ScanResult.rule_id == rule_id,
+        ScanResult.full_sync.is_(False)
+    ).order_by(ScanResult.result_id.desc()).limit(HISTORY_SIZE)
+
+    return [total for total, in rows]
+
+
+def adapt_poll_interval(rule: MonitoringRule, now, full_sync=False):
+    """
+    按最近的扫描结果调整规则的执行间隔，返回调整后的间隔（分钟）
+    - 最近 HISTORY_SIZE 次都无变化：间隔加倍（不超过上限）
+    - 最近一次有变化且至少一半有变化：间隔减半（不低于下限），并相应提前下次执行时间
+    以全量对账结束的间隔（首次扫描、修改筛选条件后的重建、定期对账）不调整：
+    其变化是与整份快照比较得出的，不代表这段间隔内的变化频率
+    """
+    config = current_app.config
+    if not config['MONITOR_ADAPTIVE_POLLING'] or full_sync:
+        return rule_interval(rule)
+
+    counts = recent_change_counts(rule.rule_id)
+    changed = sum(1 for total in counts if total > 0)
+    current = rule_interval(rule)
+
+    if len(counts) >= HISTORY_SIZE and changed == 0:
+        interval = min(current * 2, config['MONITOR_POLL_MAX_MINUTES'])
+    elif len(counts) >= 2 and counts[0] > 0 and changed * 2 >= len(counts):
+        interval = max(current // 2, config['MONITOR_POLL_MIN_MINUTES'])
+    else:
+        interval = current
+
+    if interval != current:
+        rule.poll_interval = interval
+        if interval < current and rule.next_run_at:
+            rule.next_run_at = min(rule.next_run_at, now + timedelta(minutes=interval))
+
+    return interval
+
+
+def poll_budget(default_interval, configured=0):
+    """
+    全局每分钟轮询预算：配置了预算时直接使用；
+    否则取全部活跃规则都按默认间隔执行时的轮询量（留出 BUDGET_HEADROOM 余量），
+    自适应缩短间隔只是在规则之间重新分配轮询次数，总量不会超过不调整时的水平
+    """
+    if configured:
+        return configured
+
+    active = MonitoringRule.query.filter(MonitoringRule.is_active.is_(True)).count()
+    return max(1.0, active * BUDGET_HEADROOM / default_interval)
+
+
+def budget_scale(default_interval, budget):
+    """
+    全局预算下的间隔放大倍数：按各规则当前间隔估算的每分钟轮询次数超过预算时，
+    所有规则的间隔按同一比例放大，否则为 1
+    """
+    if not budget:
+        return 1.0
+
+    demand = db.session.query(
+        db.func.sum(1.0 / db.func.coalesce(MonitoringRule.poll_interval, default_interval))
+    ).filter(MonitoringRule.is_active.is_(True)).scalar() or 0
+
+    return max(1.0, demand / budget)
@@ -0,0 +1,128 @@
+"""
+监控规则调度
+每条规则记录下次执行时间（next_run_at），调度任务每分钟以 FOR UPDATE SKIP LOCKED 按批领取到期规则，
+推后其下次执行时间并提交扫描任务；多个调度实例同时运行时各自领取不同的规则，不会重复执行。
+新规则的首次执行在一个周期内按规则ID确定性地错开，避免所有规则在同一时刻集中执行。
+同一扫描窗口内的各次调度属于同一轮扫描，共享平台请求，窗口内至多做一次全量导出。
+各规则的执行间隔由 app.tasks.polling 按变化频率自适应调整，并受全局每分钟轮询预算约束
+"""
+from app.celery_app import celery
+from app import db
+from app.models import MonitoringRule
+from app.tasks.monitor import dispatch_rules
+from app.tasks.polling import rule_interval, budget_scale, poll_budget
+from flask import current_app
+from datetime import datetime, timedelta
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# 单次调度最多领取的批数，防止积压过多时一次调度运行过久
+MAX_SCHEDULE_BATCHES = 20
+
+# 计算执行相位的基准时间
+SCHEDULE_EPOCH = datetime(2024, 1, 1)
+
+
+def rule_jitter(rule_id, interval):
+    """规则在一个执行周期内的固定偏移（乘法散列，相邻ID均匀分散）"""
+    fraction = (rule_id * 2654435761 % 2 ** 32) / 2 ** 32
+    return timedelta(seconds=int(interval.total_seconds() * fraction))
+
+
+def first_run_time(rule_id, now, interval):
+    """
+    首次执行时间：当前时间之后、落在规则固定相位上的第一个时刻（一个周期之内）
+    同时排期的大量规则因相位不同而均匀分布在整个周期内
+    """
+    period = interval.total_seconds()
+    offset = rule_jitter(rule_id, interval).total_seconds()
+    elapsed = (now - SCHEDULE_EPOCH).total_seconds()
+    
+    cycles = math.ceil((elapsed - offset) / period)
+    return SCHEDULE_EPOCH + timedelta(seconds=cycles * period + offset)
+
+
+def sweep_window_id(now, minutes):
+    """调度扫描轮次标识：按扫描窗口划分，同一窗口内每分钟的调度得到相同的标识"""
+    window = int((now - SCHEDULE_EPOCH).total_seconds() // (minutes * 60))
+    return f'window-{minutes}-{window}'
+
+
+def next_run_time(rule: MonitoringRule, now, interval):
+    """
+    领取后的下次执行时间：按原计划时间推进一个周期，保持规则的错开相位；
+    积压超过一个周期时从当前时间起算，不补执行错过的周期
+    """
+    next_run_at = rule.next_run_at + interval
+    if next_run_at <= now:
+        next_run_at = now + interval
+    return next_run_at
+
+
+def claim_due_rules(now, scale, batch_size):
+    """
+    领取一批到期规则并按各自的执行间隔（乘以预算放大倍数 scale）推后下次执行时间，
+    返回 (本批到期需执行的规则ID, 领取的规则数)
+    尚未排期的规则只分配首次执行时间，不在本次执行
+    提交事务后释放行锁，其他调度实例随后读到的是新的执行时间
+    """
+    rules = MonitoringRule.query.filter(
+        MonitoringRule.is_active.is_(True),
+        db.or_(MonitoringRule.next_run_at.is_(None), MonitoringRule.next_run_at <= now)
+    ).order_by(
+        MonitoringRule.next_run_at.asc().nulls_first()
+    ).limit(batch_size).with_for_update(skip_locked=True).all()
+    
+    due_ids = []
+    for rule in rules:
+        interval = timedelta(minutes=rule_interval(rule) * scale)
+        
+        if rule.next_run_at is None:
+            rule.next_run_at = first_run_time(rule.rule_id, now, interval)
+            if rule.next_run_at > now:
+                continue
+        
+        due_ids.append(rule.rule_id)
+        rule.next_run_at = next_run_time(rule, now, interval)
+    
+    db.session.commit()
+    
+    return due_ids, len(rules)
+
+
+@celery.task(bind=True, name='app.tasks.scheduler.schedule_due_rules')
+def schedule_due_rules(self):
+    """领取到期的监控规则并提交扫描任务（由 Celery Beat 每分钟触发）"""
+    config = current_app.config
+    batch_size = config['MONITOR_SCHEDULE_BATCH_SIZE']
+    now = datetime.utcnow()
+    
+    # 预期轮询量超出预算时整体放大间隔；本次调度执行的规则数也不超过预算，
+    # 未领取的到期规则留到下一分钟（按计划时间先后领取）
+    budget = poll_budget(config['MONITOR_INTERVAL_MINUTES'], config['MONITOR_POLL_BUDGET_PER_MINUTE'])
+    scale = budget_scale(config['MONITOR_INTERVAL_MINUTES'], budget)
+    remaining = math.ceil(budget)
+    
+    # 同一扫描窗口内领取的规则属于同一轮扫描，共享平台请求
+    sweep_id = sweep_window_id(now, config['MONITOR_SWEEP_WINDOW_MINUTES'])
+    
+    due_ids = []
+    for _ in range(MAX_SCHEDULE_BATCHES):
+        limit = int(min(batch_size, remaining))
+        if limit <= 0:
+            break
+        
+        batch_ids, claimed = claim_due_rules(now, scale, limit)
+        due_ids.extend(batch_ids)
+        remaining -= len(batch_ids)
+        if claimed < limit:
+            break
+    
+    if not due_ids:
+        return {'executed_count': 0, 'timestamp': now.isoformat()}
+    
+    logger.info(f"调度到期监控任务: sweep_id={sweep_id}, 规则数={len(due_ids)}, 间隔倍数={scale:.2f}")
+    
+    return dispatch_rules(sweep_id, due_ids)
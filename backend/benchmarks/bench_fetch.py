@@ -0,0 +1,74 @@
+"""
+平台搜索获取基准
+对同一组规则查询参数，比较逐条同步请求（单规则任务的获取方式）与批量任务内并发请求的耗时
+需先启动模拟平台（MOCK_PLATFORM_URL，默认 http://localhost:5001）；两种方式共用进程内的平台客户端
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_fetch [规则数] [并发数]
+"""
+import itertools
+import sys
+import time
+
+from app import create_app
+from app.platform_client import get_platform_client
+from app.tasks.fetcher import search_many
+from app.tasks.monitor import search_platform
+
+DEFAULT_RULES = 200
+DEFAULT_CONCURRENCY = 50
+
+KEYWORDS = ['python', 'java', 'go', '前端', '数据', '算法', '测试', '运维']
+CITIES = [None, '北京', '上海', '深圳', '杭州']
+SALARY_RANGES = [(0, 999999), (10, 30), (20, 50), (30, 999999)]
+
+
+def rule_params(count: int):
+    """生成互不相同的规则查询参数"""
+    combos = itertools.cycle(itertools.product(KEYWORDS, CITIES, SALARY_RANGES))
+    return [
+        {
+            'keyword': keyword,
+            'city': city,
+            'salary_min': salary_min,
+            # 组合用尽后改变上限，保证查询参数不重复
+            'salary_max': salary_max + i // (len(KEYWORDS) * len(CITIES) * len(SALARY_RANGES))
+        }
+        for i, (keyword, city, (salary_min, salary_max)) in zip(range(count), combos)
+    ]
+
+
+def main(rule_count: int, concurrency: int):
+    params_list = rule_params(rule_count)
+    client = get_platform_client()
+
+    start = time.perf_counter()
+    sequential = [search_platform(params) for params in params_list]
+    sequential_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = search_many(client, params_list, concurrency)
+    concurrent_seconds = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for a, b in zip(sequential, concurrent)
+        if a is None or b is None or {job['id'] for job in a} != {job['id'] for job in b}
+    )
+
+    print(f"platform={client.base_url} rules={rule_count} concurrency={concurrency}")
+    print(f"sequential: {sequential_seconds:.2f}s ({rule_count / sequential_seconds:,.0f} rules/s)")
+    print(f"concurrent: {concurrent_seconds:.2f}s ({rule_count / concurrent_seconds:,.0f} rules/s)")
+    print(f"speedup:    {sequential_seconds / concurrent_seconds:.1f}x")
+    print(f"mismatches: {mismatches}")
+    for endpoint, stats in client.metrics().items():
+        print(f"{endpoint}: calls={stats['count']} errors={stats['errors']} "
+              f"avg={stats['avg_seconds'] * 1000:.1f}ms max={stats['max_seconds'] * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    with create_app(register_blueprints=False).app_context():
+        main(
+            int(args[0]) if len(args) > 0 else DEFAULT_RULES,
+            int(args[1]) if len(args) > 1 else DEFAULT_CONCURRENCY
+        )
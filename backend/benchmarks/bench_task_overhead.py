@@ -0,0 +1,59 @@
+"""
+任务调用开销基准
+比较每次调用都 create_app 并推入应用上下文（旧方式）与进程共享应用 + AppContextTask（新方式）
+执行同一个只做一次简单查询的任务的单次耗时；任务在本进程内直接调用，不经过消息队列
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bench_task_overhead [调用次数]
+"""
+import sys
+import time
+
+from sqlalchemy import text
+
+from app import create_app, db
+from app.celery_app import celery, init_worker_process
+
+DEFAULT_CALLS = 200
+
+
+def query_once():
+    return db.session.execute(text('SELECT 1')).scalar()
+
+
+@celery.task(name='benchmarks.bench_task_overhead.shared_app_task')
+def shared_app_task():
+    return query_once()
+
+
+def per_call_app_task():
+    """旧方式：每次调用重建应用"""
+    app = create_app(register_blueprints=False)
+
+    with app.app_context():
+        return query_once()
+
+
+def measure(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def main(calls: int):
+    # 与 worker 子进程启动时相同：创建应用、预热连接池
+    init_worker_process()
+
+    before = measure(per_call_app_task, calls)
+    after = measure(shared_app_task, calls)
+
+    print(f"calls={calls}")
+    print(f"create_app per task: {before * 1000:.2f} ms/call")
+    print(f"shared app context:  {after * 1000:.2f} ms/call")
+    print(f"speedup:             {before / after:.1f}x")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if len(args) > 0 else DEFAULT_CALLS)
@@ -47,6 +47,37 @@ class Config:
     
     # 模拟平台配置
     MOCK_PLATFORM_URL = os.getenv('MOCK_PLATFORM_URL', 'http://localhost:5001')
+    # 平台客户端：每个进程的连接池大小、连接/读取超时（秒）、幂等请求的重试次数与退避系数（秒）
+    PLATFORM_POOL_SIZE = int(os.getenv('PLATFORM_POOL_SIZE', 10))
+    PLATFORM_CONNECT_TIMEOUT = float(os.getenv('PLATFORM_CONNECT_TIMEOUT', 3))
+    PLATFORM_READ_TIMEOUT = float(os.getenv('PLATFORM_READ_TIMEOUT', 30))
+    PLATFORM_RETRIES = int(os.getenv('PLATFORM_RETRIES', 3))
+    PLATFORM_RETRY_BACKOFF = float(os.getenv('PLATFORM_RETRY_BACKOFF', 0.3))
+    
+    # 监控匹配模式
+    # remote: 每条规则单独请求平台搜索接口
+    # local: 每轮扫描从平台导出一次全量在招数据，按批在本地匹配全部规则
+    # batch: 按批提交任务，每个任务内并发请求平台搜索接口
+    MONITOR_MATCH_MODE = os.getenv('MONITOR_MATCH_MODE', 'remote')
+    # local/batch 模式下每个批量任务处理的规则数
+    MONITOR_MATCH_BATCH_SIZE = int(os.getenv('MONITOR_MATCH_BATCH_SIZE', 200))
+    # batch 模式下单个任务同时在途的平台请求数
+    MONITOR_FETCH_CONCURRENCY = int(os.getenv('MONITOR_FETCH_CONCURRENCY', 50))
+    # 增量同步：有水位的规则只拉取平台变更日志，超过该时间（小时）做一次全量对账
+    MONITOR_INCREMENTAL = os.getenv('MONITOR_INCREMENTAL', 'True') == 'True'
+    MONITOR_FULL_SYNC_HOURS = int(os.getenv('MONITOR_FULL_SYNC_HOURS', 24))
+    # 调度：规则执行间隔（分钟），调度任务每分钟领取到期规则，每批最多领取的规则数
+    MONITOR_INTERVAL_MINUTES = int(os.getenv('MONITOR_INTERVAL_MINUTES', 30))
+    MONITOR_SCHEDULE_BATCH_SIZE = int(os.getenv('MONITOR_SCHEDULE_BATCH_SIZE', 500))
+    # 自适应轮询：按规则的变化频率在上下限（分钟）之间调整执行间隔
+    MONITOR_ADAPTIVE_POLLING = os.getenv('MONITOR_ADAPTIVE_POLLING', 'True') == 'True'
+    MONITOR_POLL_MIN_MINUTES = int(os.getenv('MONITOR_POLL_MIN_MINUTES', 10))
+    MONITOR_POLL_MAX_MINUTES = int(os.getenv('MONITOR_POLL_MAX_MINUTES', 480))
+    # 扫描窗口（分钟）：同一窗口内各次调度领取的规则属于同一轮扫描，共享平台请求与全量导出；
+    # 默认取最短执行间隔，任何规则在一个窗口内至多执行一次，不会读到比自身间隔更旧的数据
+    MONITOR_SWEEP_WINDOW_MINUTES = int(os.getenv('MONITOR_SWEEP_WINDOW_MINUTES', MONITOR_POLL_MIN_MINUTES))
+    # 全局每分钟最多执行的规则数；0 表示按活跃规则数与默认间隔推导（见 app.tasks.polling.poll_budget）
+    MONITOR_POLL_BUDGET_PER_MINUTE = float(os.getenv('MONITOR_POLL_BUDGET_PER_MINUTE', 0))
     
     # Swagger配置
     SWAGGER = {
@@ -0,0 +1,27 @@
+"""Add incremental sync watermark to monitoring rules
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 增量同步水位：平台变更日志序号与上次全量对账时间
+    op.add_column('monitoring_rules', sa.Column('sync_seq', sa.BigInteger(), nullable=True))
+    op.add_column('monitoring_rules', sa.Column('last_full_sync_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('monitoring_rules', 'last_full_sync_at')
+    op.drop_column('monitoring_rules', 'sync_seq')
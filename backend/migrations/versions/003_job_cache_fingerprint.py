@@ -0,0 +1,25 @@
+"""Add key-field fingerprint to job cache
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 已有缓存行的指纹为空，变化检测时按需解码比较，下次写入缓存时补齐
+    op.add_column('job_cache', sa.Column('fingerprint', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('job_cache', 'fingerprint')
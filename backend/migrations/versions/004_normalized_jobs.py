@@ -0,0 +1,245 @@
+"""Normalize job storage: global jobs/job_versions, rule_jobs membership
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+import hashlib
+import json
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+# 与 app.models.JOB_KEY_FIELDS 一致（迁移不依赖应用代码）
+JOB_KEY_FIELDS = ['salary_min', 'salary_max', 'job_description', 'status', 'experience_required']
+
+# 迁移缓存时每批读取的行数
+MIGRATE_BATCH = 1000
+
+job_cache = sa.table('job_cache',
+    sa.column('cache_id', sa.Integer),
+    sa.column('rule_id', sa.Integer),
+    sa.column('job_id', sa.String),
+    sa.column('job_data', sa.Text),
+    sa.column('fingerprint', sa.BigInteger),
+    sa.column('cached_at', sa.DateTime)
+)
+jobs = sa.table('jobs',
+    sa.column('job_id', sa.String),
+    sa.column('version', sa.Integer),
+    sa.column('fingerprint', sa.BigInteger),
+    sa.column('job_data', sa.Text),
+    sa.column('updated_at', sa.DateTime)
+)
+job_versions = sa.table('job_versions',
+    sa.column('job_id', sa.String),
+    sa.column('version', sa.Integer),
+    sa.column('fingerprint', sa.BigInteger),
+    sa.column('job_data', sa.Text),
+    sa.column('created_at', sa.DateTime)
+)
+rule_jobs = sa.table('rule_jobs',
+    sa.column('rule_id', sa.Integer),
+    sa.column('job_id', sa.String),
+    sa.column('version', sa.Integer),
+    sa.column('fingerprint', sa.BigInteger),
+    sa.column('matched_at', sa.DateTime)
+)
+
+
+def job_fingerprint(job):
+    payload = json.dumps([job.get(field) for field in JOB_KEY_FIELDS], ensure_ascii=False, separators=(',', ':'))
+    digest = hashlib.blake2b(payload.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def cached_fingerprint(job_data):
+    return job_fingerprint(json.loads(job_data) if job_data else {})
+
+
+def iter_cache_batches(bind, *columns):
+    """按主键分批读取缓存行（首列为 cache_id），避免一次性加载全部招聘数据"""
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(job_cache.c.cache_id, *columns)
+            .where(job_cache.c.cache_id > last_id).order_by(job_cache.c.cache_id).limit(MIGRATE_BATCH)
+        ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    op.create_table('jobs',
+        sa.Column('job_id', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('fingerprint', sa.BigInteger(), nullable=True),
+        sa.Column('job_data', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('job_id')
+    )
+    op.create_table('job_versions',
+        sa.Column('version_id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('fingerprint', sa.BigInteger(), nullable=True),
+        sa.Column('job_data', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.job_id'], ),
+        sa.PrimaryKeyConstraint('version_id'),
+        sa.UniqueConstraint('job_id', 'version', name='uq_job_version')
+    )
+    op.create_index(op.f('ix_job_versions_job_id'), 'job_versions', ['job_id'], unique=False)
+    op.create_table('rule_jobs',
+        sa.Column('rule_id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('fingerprint', sa.BigInteger(), nullable=True),
+        sa.Column('matched_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['rule_id'], ['monitoring_rules.rule_id'], ),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.job_id'], ),
+        sa.PrimaryKeyConstraint('rule_id', 'job_id')
+    )
+    op.create_index(op.f('ix_rule_jobs_job_id'), 'rule_jobs', ['job_id'], unique=False)
+    op.add_column('scan_results', sa.Column('job_refs', sa.Text(), nullable=True))
+
+    # 把各规则缓存的招聘副本合并为版本：同一招聘的不同关键字段内容按最后缓存时间依次编号，
+    # 最近缓存的内容编号最大，作为当前版本。缓存可能很大，分三遍按主键分批读取：
+    # 第一遍只记录每种内容最后出现的行，第二遍写入当前版本，第三遍写入版本记录与规则命中
+    bind = op.get_bind()
+
+    latest = {}  # (招聘ID, 指纹) -> (最后缓存时间, cache_id)
+    for rows in iter_cache_batches(bind, job_cache.c.job_id, job_cache.c.job_data, job_cache.c.cached_at):
+        for cache_id, job_id, job_data, cached_at in rows:
+            key = (job_id, cached_fingerprint(job_data))
+            order = (cached_at or datetime.min, cache_id)
+            if key not in latest or latest[key] < order:
+                latest[key] = order
+
+    contents = {}  # 招聘ID -> [(最后缓存时间, cache_id, 指纹)]
+    for (job_id, fingerprint), order in latest.items():
+        contents.setdefault(job_id, []).append((*order, fingerprint))
+    del latest
+
+    versions = {}  # (招聘ID, 指纹) -> 版本
+    sources = {}  # 版本内容所取的 cache_id -> 版本
+    current_ids = []  # 当前版本内容所取的 cache_id
+    for job_id, known in contents.items():
+        known.sort()
+        for version, (_, cache_id, fingerprint) in enumerate(known, start=1):
+            versions[(job_id, fingerprint)] = version
+            sources[cache_id] = version
+        current_ids.append(cache_id)
+    del contents
+    current_ids.sort()
+
+    # 先写全局招聘表，版本记录与规则命中都引用它
+    for start in range(0, len(current_ids), MIGRATE_BATCH):
+        rows = bind.execute(
+            sa.select(job_cache.c.cache_id, job_cache.c.job_id, job_cache.c.job_data, job_cache.c.cached_at)
+            .where(job_cache.c.cache_id.in_(current_ids[start:start + MIGRATE_BATCH]))
+        ).fetchall()
+        op.bulk_insert(jobs, [
+            {
+                'job_id': job_id, 'version': sources[cache_id], 'fingerprint': cached_fingerprint(job_data),
+                'job_data': job_data, 'updated_at': cached_at
+            }
+            for cache_id, job_id, job_data, cached_at in rows
+        ])
+
+    for rows in iter_cache_batches(
+        bind, job_cache.c.rule_id, job_cache.c.job_id, job_cache.c.job_data, job_cache.c.cached_at
+    ):
+        version_rows = []
+        membership = []
+        for cache_id, rule_id, job_id, job_data, cached_at in rows:
+            fingerprint = cached_fingerprint(job_data)
+            version = versions[(job_id, fingerprint)]
+            if cache_id in sources:
+                version_rows.append({
+                    'job_id': job_id, 'version': version, 'fingerprint': fingerprint,
+                    'job_data': job_data, 'created_at': cached_at
+                })
+            membership.append({
+                'rule_id': rule_id, 'job_id': job_id, 'version': version,
+                'fingerprint': fingerprint, 'matched_at': cached_at
+            })
+
+        if version_rows:
+            op.bulk_insert(job_versions, version_rows)
+        op.bulk_insert(rule_jobs, membership)
+
+    op.drop_table('job_cache')
+
+
+def downgrade():
+    op.create_table('job_cache',
+        sa.Column('cache_id', sa.Integer(), nullable=False),
+        sa.Column('rule_id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(length=100), nullable=False),
+        sa.Column('job_data', sa.Text(), nullable=True),
+        sa.Column('cached_at', sa.DateTime(), nullable=True),
+        sa.Column('fingerprint', sa.BigInteger(), nullable=True),
+        sa.ForeignKeyConstraint(['rule_id'], ['monitoring_rules.rule_id'], ),
+        sa.PrimaryKeyConstraint('cache_id'),
+        sa.UniqueConstraint('rule_id', 'job_id', name='uq_rule_job')
+    )
+    op.create_index(op.f('ix_job_cache_rule_id'), 'job_cache', ['rule_id'], unique=False)
+    op.create_index(op.f('ix_job_cache_job_id'), 'job_cache', ['job_id'], unique=False)
+
+    bind = op.get_bind()
+    bind.execute(
+        job_cache.insert().from_select(
+            ['rule_id', 'job_id', 'job_data', 'fingerprint', 'cached_at'],
+            sa.select(
+                rule_jobs.c.rule_id, rule_jobs.c.job_id, job_versions.c.job_data,
+                rule_jobs.c.fingerprint, rule_jobs.c.matched_at
+            ).select_from(rule_jobs.join(
+                job_versions,
+                (job_versions.c.job_id == rule_jobs.c.job_id) & (job_versions.c.version == rule_jobs.c.version)
+            ))
+        )
+    )
+
+    # 引用版本的扫描结果还原为招聘数据副本
+    scan_results = sa.table('scan_results',
+        sa.column('result_id', sa.Integer),
+        sa.column('jobs_new', sa.Text),
+        sa.column('jobs_updated', sa.Text),
+        sa.column('jobs_deleted', sa.Text),
+        sa.column('job_refs', sa.Text)
+    )
+    data = {
+        (job_id, version): job_data
+        for job_id, version, job_data in bind.execute(
+            sa.select(job_versions.c.job_id, job_versions.c.version, job_versions.c.job_data)
+        )
+    }
+    results = bind.execute(
+        sa.select(scan_results.c.result_id, scan_results.c.job_refs).where(scan_results.c.job_refs.isnot(None))
+    ).fetchall()
+    for result_id, job_refs in results:
+        refs = json.loads(job_refs)
+        values = {}
+        for kind in ('new', 'updated', 'deleted'):
+            jobs_list = [json.loads(data[tuple(ref)]) for ref in refs.get(kind, []) if tuple(ref) in data]
+            values[f'jobs_{kind}'] = json.dumps(jobs_list, ensure_ascii=False)
+        bind.execute(scan_results.update().where(scan_results.c.result_id == result_id).values(**values))
+
+    op.drop_column('scan_results', 'job_refs')
+    op.drop_index(op.f('ix_rule_jobs_job_id'), table_name='rule_jobs')
+    op.drop_table('rule_jobs')
+    op.drop_index(op.f('ix_job_versions_job_id'), table_name='job_versions')
+    op.drop_table('job_versions')
+    op.drop_table('jobs')
@@ -0,0 +1,74 @@
+"""Add change count columns to scan results
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import json
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+# 回填时每批读取的结果数
+BACKFILL_BATCH = 1000
+
+scan_results = sa.table('scan_results',
+    sa.column('result_id', sa.Integer),
+    sa.column('jobs_new', sa.Text),
+    sa.column('jobs_updated', sa.Text),
+    sa.column('jobs_deleted', sa.Text),
+    sa.column('job_refs', sa.Text),
+    sa.column('new_count', sa.Integer),
+    sa.column('updated_count', sa.Integer),
+    sa.column('deleted_count', sa.Integer)
+)
+
+
+def upgrade():
+    op.add_column('scan_results', sa.Column('new_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('scan_results', sa.Column('updated_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('scan_results', sa.Column('deleted_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # 回填已有结果的数量：新结果取版本引用的长度，旧结果取招聘数据列表的长度
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        # 按主键分批读取，避免一次性加载全部招聘数据
+        rows = bind.execute(
+            sa.select(
+                scan_results.c.result_id, scan_results.c.jobs_new, scan_results.c.jobs_updated,
+                scan_results.c.jobs_deleted, scan_results.c.job_refs
+            ).where(scan_results.c.result_id > last_id).order_by(scan_results.c.result_id).limit(BACKFILL_BATCH)
+        ).fetchall()
+        if not rows:
+            break
+
+        for result_id, jobs_new, jobs_updated, jobs_deleted, job_refs in rows:
+            if job_refs:
+                refs = json.loads(job_refs)
+                counts = [len(refs.get(kind) or []) for kind in ('new', 'updated', 'deleted')]
+            else:
+                counts = [len(json.loads(blob)) if blob else 0 for blob in (jobs_new, jobs_updated, jobs_deleted)]
+
+            if any(counts):
+                bind.execute(
+                    scan_results.update().where(scan_results.c.result_id == result_id).values(
+                        new_count=counts[0], updated_count=counts[1], deleted_count=counts[2]
+                    )
+                )
+
+        last_id = rows[-1][0]
+
+
+def downgrade():
+    op.drop_column('scan_results', 'deleted_count')
+    op.drop_column('scan_results', 'updated_count')
+    op.drop_column('scan_results', 'new_count')
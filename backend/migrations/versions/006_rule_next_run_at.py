@@ -0,0 +1,27 @@
+"""Add next_run_at to monitoring rules for database-driven scheduling
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 已有规则为空，由调度任务首次领取时按规则ID在一个周期内错开排期
+    op.add_column('monitoring_rules', sa.Column('next_run_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_monitoring_rules_next_run_at'), 'monitoring_rules', ['next_run_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_monitoring_rules_next_run_at'), table_name='monitoring_rules')
+    op.drop_column('monitoring_rules', 'next_run_at')
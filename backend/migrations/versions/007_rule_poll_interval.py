@@ -0,0 +1,25 @@
+"""Add adaptive poll interval to monitoring rules
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 为空表示使用默认间隔，之后按各规则的扫描结果自适应调整
+    op.add_column('monitoring_rules', sa.Column('poll_interval', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('monitoring_rules', 'poll_interval')
@@ -0,0 +1,25 @@
+"""Add platform journal epoch to rule sync watermark
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 为空的规则在下次执行时全量同步一次并记录平台当前纪元
+    op.add_column('monitoring_rules', sa.Column('sync_epoch', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    op.drop_column('monitoring_rules', 'sync_epoch')
@@ -0,0 +1,25 @@
+"""Mark scan results produced by a full sync
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 已有结果按增量扫描处理，自适应轮询照常参考
+    op.add_column('scan_results', sa.Column('full_sync', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    op.drop_column('scan_results', 'full_sync')
@@ -0,0 +1,133 @@
+"""
+测试公共夹具
+使用内存 SQLite 数据库；平台客户端替换为内存中的假平台，通知任务不入队
+"""
+import os
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import User
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakePlatform:
+    """
+    只实现监控任务用到的接口：/api/v1/stats、/api/v1/jobs/search、/api/v1/jobs/updates
+    变更日志为空，序号与纪元固定，修改招聘后调用 bump() 推进序号
+    """
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.epoch = 'epoch-1'
+        self.last_seq = 1
+
+    def bump(self):
+        self.last_seq += 1
+
+    def search(self, params):
+        keywords = [keyword.lower() for keyword in params.get('keyword', '').split(',') if keyword]
+        return [
+            job for job in self.jobs
+            if job['status'] == 'active'
+            and (not keywords or any(
+                keyword in text.lower() for keyword in keywords for text in [job['position'], *job['skills']]
+            ))
+            and (not params.get('city') or job['location'] == params['city'])
+            and job['salary_max'] >= params['salary_min'] and job['salary_min'] <= params['salary_max']
+        ]
+
+    def get(self, path, params=None, **kwargs):
+        params = params or {}
+        if path == '/api/v1/stats':
+            data = {'last_seq': self.last_seq, 'epoch': self.epoch}
+        elif path == '/api/v1/jobs/search':
+            data = {'jobs': self.search(params)}
+        elif path == '/api/v1/jobs/updates':
+            data = {
+                'updated': [], 'deleted': [], 'changes': [],
+                'last_seq': self.last_seq, 'epoch': self.epoch, 'resync': False
+            }
+        else:
+            raise AssertionError(f'unexpected platform request: {path}')
+        return FakeResponse({'code': 0, 'message': 'success', 'data': data})
+
+
+def make_job(job_id, position, skills, salary_min=15, salary_max=25, city='北京', status='active'):
+    return {
+        'id': job_id,
+        'company': '测试公司',
+        'position': position,
+        'skills': skills,
+        'location': city,
+        'salary_min': salary_min,
+        'salary_max': salary_max,
+        'job_description': f'{position} 岗位',
+        'status': status,
+        'experience_required': 3,
+        'update_date': '2026-10-18T00:00:00'
+    }
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config.update(TESTING=True)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username='tester', email='tester@example.com')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.user_id))}'}
+
+
+@pytest.fixture
+def platform(monkeypatch):
+    platform = FakePlatform([
+        make_job('py-1', '后端开发工程师', ['Python', 'Django']),
+        make_job('py-2', '数据工程师', ['Python', 'Spark']),
+        make_job('java-1', '后端开发工程师', ['Java', 'Spring']),
+        make_job('java-2', '架构师', ['Java', '微服务']),
+        make_job('java-3', '全栈开发工程师', ['Java', 'Vue'])
+    ])
+    monkeypatch.setattr('app.tasks.monitor.get_platform_client', lambda: platform)
+    return platform
+
+
+@pytest.fixture(autouse=True)
+def sent_notifications(monkeypatch):
+    """通知任务不入队，只记录结果ID"""
+    sent = []
+    monkeypatch.setattr('app.tasks.email.send_monitoring_notification.delay', sent.append)
+    return sent
@@ -0,0 +1,63 @@
+"""汇总通知"""
+from datetime import datetime, timedelta
+
+from app import db, mail
+from app.models import MonitoringRule, ScanResult
+from app.tasks.email import send_monitoring_notification
+from app.tasks.monitor import execute_monitoring_task
+
+
+def create_hourly_rule(user):
+    rule = MonitoringRule(
+        user_id=user.user_id, rule_name='python', notification_trigger='hourly'
+    )
+    rule.set_keywords(['python'])
+    db.session.add(rule)
+    db.session.commit()
+    return rule.rule_id
+
+
+def age_results(rule_id, hours):
+    for result in ScanResult.query.filter_by(rule_id=rule_id):
+        result.scan_time -= timedelta(hours=hours)
+    db.session.commit()
+
+
+def test_hourly_digest_is_queued_once_per_window(app, user, platform, sent_notifications):
+    rule_id = create_hourly_rule(user)
+
+    # 变化不满一个窗口时不通知
+    for _ in range(12):
+        execute_monitoring_task(rule_id)
+    assert sent_notifications == []
+
+    age_results(rule_id, 2)
+    execute_monitoring_task(rule_id)
+    assert len(sent_notifications) == 1
+
+
+def test_digest_without_pending_results_is_skipped(app, user, platform, sent_notifications, monkeypatch):
+    outbox = []
+    monkeypatch.setattr(mail, 'send', outbox.append)
+    rule_id = create_hourly_rule(user)
+
+    execute_monitoring_task(rule_id)
+    age_results(rule_id, 2)
+    execute_monitoring_task(rule_id)
+    execute_monitoring_task(rule_id)
+    # 邮件任务尚未执行时的两次扫描各自入队了一次
+    assert len(sent_notifications) == 2
+
+    first, second = sent_notifications
+    send_monitoring_notification(first)
+    assert len(outbox) == 1
+    changed = ScanResult.query.filter(ScanResult.rule_id == rule_id, ScanResult.new_count > 0).all()
+    assert changed and all(result.email_sent for result in changed)
+
+    # 第二个任务执行时变化已随第一封汇总发送，不发送空的或重复的汇总
+    assert send_monitoring_notification(second) == {'result_id': second, 'skipped': True}
+    assert len(outbox) == 1
+
+    # 刚发送过，窗口内不再入队
+    execute_monitoring_task(rule_id)
+    assert len(sent_notifications) == 2
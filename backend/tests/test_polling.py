@@ -0,0 +1,42 @@
+"""自适应轮询"""
+from datetime import timedelta
+
+from app import db
+from app.models import MonitoringRule, ScanResult
+from app.tasks.monitor import execute_monitoring_task
+
+from conftest import make_job
+
+
+def create_rule(user):
+    rule = MonitoringRule(user_id=user.user_id, rule_name='python')
+    rule.set_keywords(['python'])
+    db.session.add(rule)
+    db.session.commit()
+    return rule.rule_id
+
+
+def test_full_syncs_do_not_adapt_interval(app, user, platform):
+    rule_id = create_rule(user)
+
+    # 首次扫描：全部是新增，但属于全量对账
+    execute_monitoring_task(rule_id)
+    execute_monitoring_task(rule_id)
+    rule = db.session.get(MonitoringRule, rule_id)
+    assert rule.poll_interval is None
+
+    # 定期对账时发现新招聘，同样不作为变化频繁的依据
+    platform.jobs.append(make_job('py-3', '算法工程师', ['Python', 'PyTorch']))
+    platform.bump()
+    rule.last_full_sync_at -= timedelta(hours=app.config['MONITOR_FULL_SYNC_HOURS'] + 1)
+    db.session.commit()
+
+    summary = execute_monitoring_task(rule_id)
+    assert summary['changes'] == {'new': 1, 'updated': 0, 'deleted': 0}
+    assert db.session.get(MonitoringRule, rule_id).poll_interval is None
+
+    full_syncs = [
+        result.full_sync
+        for result in ScanResult.query.filter_by(rule_id=rule_id).order_by(ScanResult.result_id)
+    ]
+    assert full_syncs == [True, False, True]
@@ -0,0 +1,45 @@
+"""监控规则同步水位"""
+from app import db
+from app.models import MonitoringRule, RuleJob
+from app.tasks.monitor import execute_monitoring_task
+
+
+def rule_job_ids(rule_id):
+    return {job_id for job_id, in RuleJob.query.with_entities(RuleJob.job_id).filter_by(rule_id=rule_id)}
+
+
+def test_editing_filters_forces_full_sync(client, auth_headers, platform):
+    response = client.post('/api/v1/monitoring-rules', headers=auth_headers, json={
+        'rule_name': 'python', 'keywords': ['python']
+    })
+    rule_id = response.get_json()['data']['rule_id']
+
+    execute_monitoring_task(rule_id)
+    rule = db.session.get(MonitoringRule, rule_id)
+    assert rule.sync_seq == platform.last_seq and rule.sync_epoch == platform.epoch
+    assert rule_job_ids(rule_id) == {'py-1', 'py-2'}
+
+    response = client.patch(f'/api/v1/monitoring-rules/{rule_id}', headers=auth_headers, json={
+        'keywords': ['java']
+    })
+    assert response.status_code == 200
+    rule = db.session.get(MonitoringRule, rule_id)
+    assert rule.sync_seq is None and rule.sync_epoch is None and rule.last_full_sync_at is None
+
+    summary = execute_monitoring_task(rule_id)
+    assert summary['changes'] == {'new': 3, 'updated': 0, 'deleted': 2}
+    assert rule_job_ids(rule_id) == {'java-1', 'java-2', 'java-3'}
+
+
+def test_editing_other_fields_keeps_watermark(client, auth_headers, platform):
+    response = client.post('/api/v1/monitoring-rules', headers=auth_headers, json={
+        'rule_name': 'python', 'keywords': ['python']
+    })
+    rule_id = response.get_json()['data']['rule_id']
+    execute_monitoring_task(rule_id)
+
+    client.patch(f'/api/v1/monitoring-rules/{rule_id}', headers=auth_headers, json={
+        'rule_name': 'renamed', 'keywords': ['python'], 'notification_trigger': 'daily'
+    })
+    rule = db.session.get(MonitoringRule, rule_id)
+    assert rule.sync_seq == platform.last_seq and rule.sync_epoch == platform.epoch
@@ -0,0 +1,79 @@
+"""监控规则调度"""
+import math
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import MonitoringRule
+from app.tasks import polling, scheduler
+
+
+def test_ticks_in_one_window_share_a_sweep(app, user, monkeypatch):
+    dispatched = []
+    monkeypatch.setattr(scheduler, 'dispatch_rules', lambda sweep_id, rule_ids: dispatched.append(sweep_id))
+
+    start = datetime(2026, 10, 18, 8, 0)
+    for rule_id in range(1, 5):
+        db.session.add(MonitoringRule(
+            rule_id=rule_id, user_id=user.user_id, rule_name=f'rule {rule_id}',
+            next_run_at=start + timedelta(minutes=rule_id * 3)
+        ))
+    db.session.commit()
+
+    class FrozenDatetime(datetime):
+        now_value = start
+
+        @classmethod
+        def utcnow(cls):
+            return cls.now_value
+
+    monkeypatch.setattr(scheduler, 'datetime', FrozenDatetime)
+    for minute in (3, 6, 9, 12):
+        FrozenDatetime.now_value = start + timedelta(minutes=minute)
+        scheduler.schedule_due_rules()
+
+    window = app.config['MONITOR_SWEEP_WINDOW_MINUTES']
+    assert window == 10
+    # 08:03 / 08:06 / 08:09 属于同一个 10 分钟窗口，08:12 起为新的一轮
+    assert len(dispatched) == 4
+    assert dispatched[0] == dispatched[1] == dispatched[2]
+    assert dispatched[3] != dispatched[0]
+
+
+def test_default_budget_bounds_adapted_polling(app, user, monkeypatch):
+    dispatched = []
+    monkeypatch.setattr(scheduler, 'dispatch_rules', lambda sweep_id, rule_ids: dispatched.append(len(rule_ids)))
+
+    # 所有规则都因变化频繁缩短到最短间隔，且同时到期
+    start = datetime(2026, 10, 18, 8, 0)
+    min_interval = app.config['MONITOR_POLL_MIN_MINUTES']
+    for rule_id in range(1, 61):
+        db.session.add(MonitoringRule(
+            rule_id=rule_id, user_id=user.user_id, rule_name=f'rule {rule_id}',
+            poll_interval=min_interval, next_run_at=start
+        ))
+    db.session.commit()
+
+    assert app.config['MONITOR_POLL_BUDGET_PER_MINUTE'] == 0
+    default_interval = app.config['MONITOR_INTERVAL_MINUTES']
+    budget = polling.poll_budget(default_interval)
+    assert budget == 60 * polling.BUDGET_HEADROOM / default_interval
+
+    # 放大后的预期轮询量不超过预算
+    scale = polling.budget_scale(default_interval, budget)
+    assert 60 / (min_interval * scale) <= budget + 1e-9
+
+    class FrozenDatetime(datetime):
+        now_value = start
+
+        @classmethod
+        def utcnow(cls):
+            return cls.now_value
+
+    monkeypatch.setattr(scheduler, 'datetime', FrozenDatetime)
+    for minute in range(30):
+        FrozenDatetime.now_value = start + timedelta(minutes=minute)
+        scheduler.schedule_due_rules()
+
+    # 每分钟领取的规则数不超过预算，积压的到期规则顺延到后面的分钟
+    assert dispatched and max(dispatched) <= math.ceil(budget)
+    assert sum(dispatched) <= math.ceil(budget) * 30
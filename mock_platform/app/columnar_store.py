@@ -0,0 +1,465 @@
+"""
+列式招聘数据存储
+以数组按列保存招聘信息，公司/岗位/城市等字符串字段编码为整数，
+岗位描述按模板按需重建，读取时再组装成与 dict 存储相同结构的字典
+"""
+from array import array
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from mmap import mmap
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+
+# 技能按顺序打包进一个 uint32：每个技能 5 位编码（0 表示空位），最多 6 个
+SKILL_BITS = 5
+SKILL_SLOTS = 6
+SKILL_MASK = (1 << SKILL_BITS) - 1
+SKILLS_OVERFLOW = 0xFFFFFFFF
+
+# 列名 -> array 类型码
+COLUMNS = {
+    "company": 'H',
+    "position": 'H',
+    "city": 'H',
+    "education": 'H',
+    "status": 'B',
+    "salary_min": 'i',
+    "salary_max": 'i',
+    "experience": 'H',
+    "view_count": 'I',
+    "skill_codes": 'I',
+    "publish_date": 'q',
+    "update_date": 'q'
+}
+
+# 字符串编码表
+TABLES = ("companies", "positions", "cities", "educations", "statuses", "skills")
+
+# 字符串编码列 -> 编码表
+GROUP_TABLES = {
+    "company": "companies",
+    "position": "positions",
+    "city": "cities",
+    "education": "educations",
+    "status": "statuses"
+}
+
+# 稀疏列
+SPARSE = ("skills_overflow", "description_suffix", "description_full", "extra")
+
+FIELDS = (
+    "id", "company", "position", "salary_min", "salary_max", "skills",
+    "experience_required", "education_required", "location", "job_description",
+    "publish_date", "update_date", "status", "view_count"
+)
+
+
+class Interner:
+    """字符串 <-> 整数编码"""
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for value in values or []:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def value(self, code: int) -> str:
+        return self.values[code]
+
+
+def _to_micros(value: str) -> int:
+    return (datetime.fromisoformat(value) - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> str:
+    return (EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+class ColumnarJobStore(MutableMapping):
+    """
+    列式招聘存储，实现与 Dict[str, Dict] 相同的映射接口
+    读取返回新组装的字典，修改字典后需重新写回（store[job_id] = job）
+    cache_decoded=True 时缓存组装结果（与 dict 存储一样，读取返回共享的字典，调用方不得原地修改）
+    """
+
+    def __init__(
+        self,
+        describe: Callable[[str, List[str], int], str],
+        companies: Optional[List[str]] = None,
+        positions: Optional[List[str]] = None,
+        cities: Optional[List[str]] = None,
+        education_levels: Optional[List[str]] = None,
+        skills: Optional[List[str]] = None,
+        cache_decoded: bool = False
+    ):
+        # 由 (岗位, 技能, 经验) 生成模板描述
+        self._describe = describe
+        # 招聘ID -> 已组装的字典
+        self._decoded: Optional[Dict[str, Dict]] = {} if cache_decoded else None
+
+        self._companies = Interner(companies)
+        self._positions = Interner(positions)
+        self._cities = Interner(cities)
+        self._educations = Interner(education_levels)
+        self._statuses = Interner(["active", "inactive", "deleted"])
+        self._skills = Interner(skills)
+
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+
+        for name, typecode in COLUMNS.items():
+            setattr(self, f'_{name}', array(typecode))
+
+        # 稀疏列：只为少数不符合紧凑编码的招聘保存
+        self._skills_overflow: Dict[str, List[str]] = {}
+        self._description_suffix: Dict[str, str] = {}
+        self._description_full: Dict[str, str] = {}
+        self._extra: Dict[str, Dict] = {}
+
+        # 快照文件的内存映射（列为其上的只读视图时不为空）
+        self._mapped: Optional[mmap] = None
+
+    def _columns(self) -> List[array]:
+        return [getattr(self, f'_{name}') for name in COLUMNS]
+
+    def _ensure_writable(self):
+        """从快照加载的列是只读的内存映射视图，首次写入前复制为数组"""
+        if self._mapped is None:
+            return
+
+        for name, typecode in COLUMNS.items():
+            setattr(self, f'_{name}', array(typecode, getattr(self, f'_{name}')))
+
+        self.close()
+
+    def close(self):
+        """释放快照文件的内存映射（列仍为映射视图时，之后不可再读取）"""
+        if self._mapped is None:
+            return
+
+        for name in COLUMNS:
+            column = getattr(self, f'_{name}')
+            if isinstance(column, memoryview):
+                column.release()
+
+        self._mapped.close()
+        self._mapped = None
+
+    def copy(self) -> 'ColumnarJobStore':
+        """复制存储：列复制为独立数组（映射视图也会被物化），不共享内存映射"""
+        clone = ColumnarJobStore(self._describe, cache_decoded=self._decoded is not None)
+        if self._decoded is not None:
+            clone._decoded = dict(self._decoded)
+
+        clone._ids = list(self._ids)
+        clone._rows = dict(self._rows)
+        for name, typecode in COLUMNS.items():
+            setattr(clone, f'_{name}', array(typecode, getattr(self, f'_{name}')))
+        for name in TABLES:
+            setattr(clone, f'_{name}', Interner(getattr(self, f'_{name}').values))
+        for name in SPARSE:
+            setattr(clone, f'_{name}', dict(getattr(self, f'_{name}')))
+
+        return clone
+
+    def export_state(self) -> Dict:
+        """导出存储状态（供快照写入）"""
+        return {
+            "ids": self._ids,
+            "columns": {name: getattr(self, f'_{name}') for name in COLUMNS},
+            "tables": {name: getattr(self, f'_{name}').values for name in TABLES},
+            "sparse": {name: getattr(self, f'_{name}') for name in SPARSE}
+        }
+
+    def load_state(self, state: Dict, mapped: Optional[mmap] = None):
+        """
+        从快照恢复存储状态
+        mapped 为快照文件的内存映射，此时 columns 为其上的只读视图，按需分页读入
+        """
+        self.close()
+
+        self._ids = list(state["ids"])
+        self._rows = {job_id: row for row, job_id in enumerate(self._ids)}
+
+        for name in COLUMNS:
+            setattr(self, f'_{name}', state["columns"][name])
+        for name in TABLES:
+            setattr(self, f'_{name}', Interner(state["tables"][name]))
+        for name in SPARSE:
+            setattr(self, f'_{name}', dict(state["sparse"][name]))
+
+        self._mapped = mapped
+        if self._decoded is not None:
+            self._decoded = {}
+
+    def partition(self, parts: Optional[np.ndarray] = None, count: int = 1) -> List['ColumnarRows']:
+        """
+        按 parts（每行所属的分区号，0 <= 分区号 < count）把各行划分为 count 个分区，
+        返回各分区的只读行视图（供按编码列批量建索引）；默认全部行为一个分区
+        """
+        ids = np.array(self._ids, dtype=object)
+        columns = {name: np.asarray(getattr(self, f'_{name}')) for name in COLUMNS}
+
+        if parts is None:
+            return [ColumnarRows(self, ids, columns)]
+
+        order = np.argsort(parts, kind='stable')
+        bounds = np.searchsorted(parts[order], np.arange(1, count))
+
+        return [
+            ColumnarRows(self, ids[rows], {name: column[rows] for name, column in columns.items()})
+            for rows in np.split(order, bounds)
+        ]
+
+    def _pack_skills(self, skills: List[str]) -> Optional[int]:
+        if len(skills) > SKILL_SLOTS:
+            return None
+
+        packed = 0
+        for slot, skill in enumerate(skills):
+            code = self._skills.code(skill) + 1
+            if code > SKILL_MASK:
+                return None
+            packed |= code << (slot * SKILL_BITS)
+
+        return packed
+
+    def _unpack_skills(self, packed: int) -> List[str]:
+        skills = []
+        while packed:
+            skills.append(self._skills.value((packed & SKILL_MASK) - 1))
+            packed >>= SKILL_BITS
+        return skills
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self._rows
+
+    def __getitem__(self, job_id: str) -> Dict:
+        if self._decoded is not None:
+            job = self._decoded.get(job_id)
+            if job is not None:
+                return job
+
+        row = self._rows[job_id]
+
+        packed = self._skill_codes[row]
+        if packed == SKILLS_OVERFLOW:
+            skills = list(self._skills_overflow[job_id])
+        else:
+            skills = self._unpack_skills(packed)
+
+        position = self._positions.value(self._position[row])
+        experience = self._experience[row]
+
+        description = self._description_full.get(job_id)
+        if description is None:
+            description = self._describe(position, skills, experience)
+            description += self._description_suffix.get(job_id, '')
+
+        job = {
+            "id": job_id,
+            "company": self._companies.value(self._company[row]),
+            "position": position,
+            "salary_min": self._salary_min[row],
+            "salary_max": self._salary_max[row],
+            "skills": skills,
+            "experience_required": experience,
+            "education_required": self._educations.value(self._education[row]),
+            "location": self._cities.value(self._city[row]),
+            "job_description": description,
+            "publish_date": _from_micros(self._publish_date[row]),
+            "update_date": _from_micros(self._update_date[row]),
+            "status": self._statuses.value(self._status[row]),
+            "view_count": self._view_count[row]
+        }
+
+        extra = self._extra.get(job_id)
+        if extra:
+            job.update(extra)
+
+        if self._decoded is not None:
+            self._decoded[job_id] = job
+
+        return job
+
+    def __setitem__(self, job_id: str, job: Dict):
+        self._ensure_writable()
+
+        row = self._rows.get(job_id)
+        if row is None:
+            row = self._rows[job_id] = len(self._ids)
+            self._ids.append(job_id)
+            for column in self._columns():
+                column.append(0)
+
+        self._company[row] = self._companies.code(job['company'])
+        self._position[row] = self._positions.code(job['position'])
+        self._city[row] = self._cities.code(job['location'])
+        self._education[row] = self._educations.code(job['education_required'])
+        self._status[row] = self._statuses.code(job['status'])
+        self._salary_min[row] = job['salary_min']
+        self._salary_max[row] = job['salary_max']
+        self._experience[row] = job['experience_required']
+        self._view_count[row] = job['view_count']
+        self._publish_date[row] = _to_micros(job['publish_date'])
+        self._update_date[row] = _to_micros(job['update_date'])
+
+        packed = self._pack_skills(job['skills'])
+        self._skills_overflow.pop(job_id, None)
+        if packed is None:
+            self._skill_codes[row] = SKILLS_OVERFLOW
+            self._skills_overflow[job_id] = list(job['skills'])
+        else:
+            self._skill_codes[row] = packed
+
+        # 描述与模板一致时不保存；模板后追加的更新说明只保存追加部分
+        self._description_suffix.pop(job_id, None)
+        self._description_full.pop(job_id, None)
+        description = job['job_description']
+        template = self._describe(job['position'], job['skills'], job['experience_required'])
+        if description.startswith(template):
+            if len(description) > len(template):
+                self._description_suffix[job_id] = description[len(template):]
+        else:
+            self._description_full[job_id] = description
+
+        extra = {key: value for key, value in job.items() if key not in FIELDS}
+        if extra:
+            self._extra[job_id] = extra
+        else:
+            self._extra.pop(job_id, None)
+
+        if self._decoded is not None:
+            self._decoded[job_id] = job
+
+    def __delitem__(self, job_id: str):
+        self._ensure_writable()
+
+        row = self._rows.pop(job_id)
+        last = len(self._ids) - 1
+
+        # 用最后一行填补被删除的行
+        if row != last:
+            moved_id = self._ids[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+            for column in self._columns():
+                column[row] = column[last]
+
+        self._ids.pop()
+        for column in self._columns():
+            column.pop()
+
+        self._skills_overflow.pop(job_id, None)
+        self._description_suffix.pop(job_id, None)
+        self._description_full.pop(job_id, None)
+        self._extra.pop(job_id, None)
+        if self._decoded is not None:
+            self._decoded.pop(job_id, None)
+
+
+class ColumnarRows:
+    """
+    列式存储中部分行的只读视图：按列取值分组得到招聘ID列表，不组装招聘字典
+    字符串编码列的分组键为原字符串，数值列为整数
+    """
+
+    def __init__(self, store: ColumnarJobStore, ids: np.ndarray, columns: Dict[str, np.ndarray]):
+        self._store = store
+        self._ids = ids
+        self._columns = columns
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids.tolist())
+
+    def _group(self, codes: np.ndarray, rows: Optional[np.ndarray] = None) -> Dict[int, List[str]]:
+        """按取值对行分组，返回 取值 -> 招聘ID列表；rows 为 codes 各元素所在的行（默认逐行对应）"""
+        if not len(codes):
+            return {}
+
+        if rows is None:
+            rows = np.arange(len(codes))
+
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+        starts = [0] + bounds.tolist()
+
+        return {
+            int(sorted_codes[start]): self._ids[chunk].tolist()
+            for start, chunk in zip(starts, np.split(rows[order], bounds))
+        }
+
+    def grouped_ids(self, name: str) -> Dict:
+        """按列取值分组的招聘ID"""
+        groups = self._group(self._columns[name])
+
+        table = GROUP_TABLES.get(name)
+        if table is None:
+            return groups
+
+        values = getattr(self._store, f'_{table}').values
+        return {values[code]: ids for code, ids in groups.items()}
+
+    def skill_ids(self) -> Dict[str, List[str]]:
+        """按技能分组的招聘ID：逐个技能位解出编码后整体分组，超出打包容量的招聘单独处理"""
+        packed = self._columns['skill_codes']
+        overflow = packed == SKILLS_OVERFLOW
+        rows = np.flatnonzero(~overflow)
+        packed = packed[rows]
+
+        codes = []
+        code_rows = []
+        for slot in range(SKILL_SLOTS):
+            slot_codes = (packed >> (slot * SKILL_BITS)) & SKILL_MASK
+            present = slot_codes != 0
+            codes.append(slot_codes[present])
+            code_rows.append(rows[present])
+
+        skills = self._store._skills
+        groups = {
+            skills.value(code - 1): ids
+            for code, ids in self._group(np.concatenate(codes), np.concatenate(code_rows)).items()
+        }
+        for job_id in self._ids[overflow].tolist():
+            for skill in self._store._skills_overflow[job_id]:
+                groups.setdefault(skill, []).append(job_id)
+
+        return groups
+
+    def column_values(self, name: str) -> List[int]:
+        """数值列的全部取值（与招聘ID顺序一致）"""
+        return self._columns[name].tolist()
+
+    def update_keys(self) -> List[Tuple[str, str]]:
+        """按 (update_date, id) 排好序的键，与对各招聘字典取键后排序的结果相同"""
+        micros = self._columns['update_date']
+        order = np.lexsort((self._ids.astype(str), micros))
+
+        # ISO 格式字符串的先后与时间一致，每个不同的时间只格式化一次
+        unique, inverse = np.unique(micros, return_inverse=True)
+        dates = [_from_micros(value) for value in unique.tolist()]
+
+        return list(zip(
+            [dates[i] for i in inverse[order].tolist()],
+            self._ids[order].tolist()
+        ))
@@ -2,17 +2,63 @@
 招聘数据生成器
 使用Faker生成模拟招聘信息，支持增删改查和定时更新
 """
+import gc
 import uuid
 import random
+import base64
+import threading
+import numpy as np
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from faker import Faker
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, MutableMapping, Optional, Tuple
+from .job_index import ShardedJobIndex
+from .columnar_store import ColumnarJobStore
+from .journal import ChangeJournal
+from .snapshot import pop_clean_marker, read_snapshot, write_clean_marker, write_snapshot
+from .state import PlatformState
 
 fake = Faker('zh_CN')
 
 
+def encode_cursor(job: Dict) -> str:
+    """由一页最后一条招聘生成下一页游标"""
+    raw = f"{job['update_date']}|{job['id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """解析游标为 (update_date, id)，格式错误时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    except (UnicodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    update_date, sep, job_id = raw.partition('|')
+    if not sep or not job_id:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    return update_date, job_id
+
+
+@contextmanager
+def gc_paused():
+    """批量创建大量容器对象时暂停循环垃圾回收：新建的对象之间没有循环引用，逐代扫描只是白白耗时"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 class JobDataGenerator:
-    """招聘数据生成器"""
+    """
+    招聘数据生成器
+    数据保存在不可变的 PlatformState 中：读操作每次调用只取一次当前状态，全程无锁；
+    写操作串行执行，在状态副本上修改后整体发布，读者不会看到修改到一半的数据
+    """
     
     # 预定义数据
     COMPANIES = [
@@ -44,38 +90,227 @@ class JobDataGenerator:
     
     EDUCATION_LEVELS = ["本科", "硕士", "博士", "大专", "不限"]
     
-    def __init__(self):
-        self.jobs: Dict[str, Dict] = {}
-        self.deleted_jobs: Dict[str, Dict] = {}
+    # 薪资下限（K）、薪资跨度、工作经验（年）的可选值
+    SALARY_MIN_CHOICES = [8, 10, 15, 20, 25, 30, 35, 40]
+    SALARY_SPREADS = [5, 10, 15, 20]
+    EXPERIENCE_CHOICES = [0, 1, 2, 3, 5, 8, 10]
+    
+    # 批量生成时每批的条数，控制中间数组的内存
+    BULK_CHUNK_SIZE = 100_000
+    
+    STORAGE_BACKENDS = ('dict', 'columnar')
+    
+    def __init__(
+        self,
+        storage: str = 'dict',
+        seed: Optional[int] = None,
+        journal_retention: Optional[timedelta] = None,
+        journal_max_entries: Optional[int] = None
+    ):
+        """
+        storage: 招聘数据存储方式
+        - dict: 每条招聘一个字典（默认）
+        - columnar: 列式紧凑存储，适合百万级数据
+        seed: 随机种子，指定后生成的数据（含招聘ID）与后续更新均可复现
+        journal_retention: 变更日志至少保留的时间范围（默认24小时）
+        journal_max_entries: 变更日志条目数上限（默认不限制）
+        """
+        if storage not in self.STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend: {storage}")
+        
+        self.storage = storage
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.journal_retention = journal_retention
+        self.journal_max_entries = journal_max_entries
+        self._state = PlatformState(self._create_store(storage), journal=self._new_journal())
+        # 写操作互斥；读操作不加锁
+        self._write_lock = threading.Lock()
+        
+        # dict 存储写快照用的列式编码副本及其对应的变更序号，之后的快照只重新编码变更过的招聘
+        self._snapshot_store: Optional[ColumnarJobStore] = None
+        self._snapshot_seq = 0
+        self._snapshot_lock = threading.Lock()
+        
+        # 实例标识区分不同进程生成的数据
+        self.instance_id = uuid.uuid4().hex[:8]
+    
+    @property
+    def jobs(self) -> MutableMapping[str, Dict]:
+        return self._state.jobs
+    
+    @property
+    def deleted_jobs(self) -> MutableMapping[str, Dict]:
+        return self._state.deleted_jobs
+    
+    @property
+    def index(self) -> ShardedJobIndex:
+        return self._state.index
+    
+    @property
+    def journal(self) -> ChangeJournal:
+        return self._state.journal
+    
+    @property
+    def version(self) -> int:
+        return self._state.version
+    
+    @property
+    def data_version(self) -> str:
+        """当前数据版本标识（用作 ETag）"""
+        return f"{self.instance_id}-{self._state.version}"
+    
+    @contextmanager
+    def _mutate(self) -> Iterator[PlatformState]:
+        """写操作：在当前状态的副本上修改，正常结束后整体发布；出错时丢弃副本"""
+        with self._write_lock:
+            state = self._state.copy()
+            yield state
+            self._state = state
+    
+    def _create_store(self, storage: str, cache_decoded: bool = False) -> MutableMapping[str, Dict]:
+        """创建招聘数据存储"""
+        if storage == 'columnar':
+            return ColumnarJobStore(
+                describe=self._generate_job_description,
+                companies=self.COMPANIES,
+                positions=self.POSITIONS,
+                cities=self.CITIES,
+                education_levels=self.EDUCATION_LEVELS,
+                skills=self.SKILLS,
+                cache_decoded=cache_decoded
+            )
+        
+        return {}
+    
+    def _new_journal(self) -> ChangeJournal:
+        return ChangeJournal(retention=self.journal_retention, max_entries=self.journal_max_entries)
     
     def initialize_jobs(self, count: int = 500):
         """初始化招聘数据"""
         print(f"正在生成 {count} 条招聘信息...")
         
-        for _ in range(count):
-            job = self._generate_job()
-            self.jobs[job['id']] = job
+        with self._write_lock:
+            jobs = self._create_store(self.storage)
+            for job in self._generate_jobs_bulk(count):
+                jobs[job['id']] = job
+            
+            state = PlatformState(
+                jobs,
+                index=ShardedJobIndex.for_size(len(jobs)),
+                journal=self._new_journal(),
+                version=self._state.version + 1
+            )
+            state.index.extend(jobs.values())
+            self._state = state
+            self._snapshot_store = None
+        
+        print(f"成功生成 {len(jobs)} 条招聘信息")
+    
+    def _new_job_id(self) -> str:
+        """生成招聘ID：指定种子时由种子派生，保证可复现"""
+        if self.seed is None:
+            return str(uuid.uuid4())
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+    
+    def save_snapshot(self, path: str, clean_shutdown: bool = False):
+        """
+        将当前招聘数据、下架招聘和变更日志写入快照文件（读取某一版本，不阻塞写操作）
+        clean_shutdown: 进程正常退出前的最后一次快照，之后不再有变更，恢复时可沿用日志纪元
+        """
+        with self._snapshot_lock:
+            state = self._state
+            store = self._encoded_store(state)
+            # 先作废上次的正常退出标记，避免新快照写入后异常退出时被误用
+            pop_clean_marker(path)
+            write_snapshot(path, store, dict(state.deleted_jobs), state.journal.to_dict())
+            if clean_shutdown:
+                write_clean_marker(path, state.journal.epoch, state.journal.last_seq)
+        
+        print(f"已保存快照: {path}，共 {len(store)} 条招聘信息")
+    
+    def _encoded_store(self, state: PlatformState) -> ColumnarJobStore:
+        """
+        快照写入的列式存储：列式数据合并覆盖层得到独立副本；
+        dict 数据首次全量编码，之后按变更日志只重新编码上次快照以来变更过的招聘
+        """
+        if isinstance(state.jobs.base, ColumnarJobStore):
+            return state.jobs.materialized()
+        
+        store = self._snapshot_store
+        entries = state.journal.entries_after(self._snapshot_seq) if store is not None else None
+        
+        if entries is None:
+            store = self._create_store('columnar')
+            for job_id, job in state.jobs.items():
+                store[job_id] = job
+        else:
+            for job_id in dict.fromkeys(entry.job_id for entry in entries):
+                job = state.jobs.get(job_id)
+                if job is not None:
+                    store[job_id] = job
+                elif job_id in store:
+                    del store[job_id]
+        
+        self._snapshot_store = store
+        self._snapshot_seq = state.journal.last_seq
+        return store
+    
+    def restore_snapshot(self, path: str):
+        """
+        从快照文件恢复数据并由编码列直接重建索引
+        两种存储都直接使用文件的内存映射；dict 存储缓存组装后的字典，读过一次后与 dict 一样快
+        快照之后的变更已经丢失，调用方按序号取到过的变更可能与恢复后重新编号的不同，
+        因此日志开始新纪元；只有正常退出前写入的快照（带正常退出标记）沿用原纪元
+        """
+        snapshot = read_snapshot(path)
+        journal = snapshot["journal"]
+        marker = pop_clean_marker(path)
+        resume = marker == {
+            "epoch": journal.get("epoch"),
+            "last_seq": journal["base_seq"] + len(journal["entries"])
+        }
         
-        print(f"成功生成 {len(self.jobs)} 条招聘信息")
+        jobs = self._create_store('columnar', cache_decoded=self.storage == 'dict')
+        jobs.load_state(snapshot["store"], snapshot["mapped"])
+        
+        with self._write_lock, gc_paused():
+            state = PlatformState(
+                jobs,
+                deleted_jobs=snapshot["deleted_jobs"],
+                index=ShardedJobIndex.for_size(len(jobs)),
+                journal=ChangeJournal.from_dict(
+                    journal,
+                    retention=self.journal_retention,
+                    max_entries=self.journal_max_entries,
+                    resume=resume
+                ),
+                version=self._state.version + 1
+            )
+            state.index.extend_columnar(jobs)
+            self._state = state
+            self._snapshot_store = None
+        
+        print(f"已从快照恢复 {len(jobs)} 条招聘信息")
     
     def _generate_job(self) -> Dict:
         """生成单条招聘信息"""
-        job_id = str(uuid.uuid4())
-        company = random.choice(self.COMPANIES)
-        position = random.choice(self.POSITIONS)
+        job_id = self._new_job_id()
+        company = self.rng.choice(self.COMPANIES)
+        position = self.rng.choice(self.POSITIONS)
         
         # 随机选择3-5个技能
-        skills = random.sample(self.SKILLS, k=random.randint(3, 5))
+        skills = self.rng.sample(self.SKILLS, k=self.rng.randint(3, 5))
         
         # 薪资范围（K为单位）
-        salary_min = random.choice([8, 10, 15, 20, 25, 30, 35, 40])
-        salary_max = salary_min + random.choice([5, 10, 15, 20])
+        salary_min = self.rng.choice(self.SALARY_MIN_CHOICES)
+        salary_max = salary_min + self.rng.choice(self.SALARY_SPREADS)
         
         # 工作经验（年）
-        experience = random.choice([0, 1, 2, 3, 5, 8, 10])
+        experience = self.rng.choice(self.EXPERIENCE_CHOICES)
         
         # 发布时间（过去30天内随机）
-        publish_date = datetime.now() - timedelta(days=random.randint(0, 30))
+        publish_date = datetime.now() - timedelta(days=self.rng.randint(0, 30))
         
         return {
             "id": job_id,
@@ -85,15 +320,77 @@ class JobDataGenerator:
             "salary_max": salary_max,
             "skills": skills,
             "experience_required": experience,
-            "education_required": random.choice(self.EDUCATION_LEVELS),
-            "location": random.choice(self.CITIES),
+            "education_required": self.rng.choice(self.EDUCATION_LEVELS),
+            "location": self.rng.choice(self.CITIES),
             "job_description": self._generate_job_description(position, skills, experience),
             "publish_date": publish_date.isoformat(),
             "update_date": publish_date.isoformat(),
             "status": "active",
-            "view_count": random.randint(10, 1000)
+            "view_count": self.rng.randint(10, 1000)
         }
     
+    def _generate_jobs_bulk(self, count: int) -> Iterator[Dict]:
+        """
+        批量生成招聘信息：用 NumPy 按批向量化抽取各字段，
+        字段分布与 _generate_job 相同，种子相同时结果相同
+        """
+        np_rng = np.random.default_rng(self.rng.getrandbits(64) if self.seed is not None else None)
+        
+        now = datetime.now()
+        # 发布时间只有31种取值，预先格式化
+        dates = [(now - timedelta(days=days)).isoformat() for days in range(31)]
+        skill_count = len(self.SKILLS)
+        
+        for chunk_start in range(0, count, self.BULK_CHUNK_SIZE):
+            size = min(self.BULK_CHUNK_SIZE, count - chunk_start)
+            
+            companies = np_rng.integers(0, len(self.COMPANIES), size).tolist()
+            positions = np_rng.integers(0, len(self.POSITIONS), size).tolist()
+            cities = np_rng.integers(0, len(self.CITIES), size).tolist()
+            educations = np_rng.integers(0, len(self.EDUCATION_LEVELS), size).tolist()
+            salary_mins = np_rng.choice(self.SALARY_MIN_CHOICES, size)
+            salary_maxs = (salary_mins + np_rng.choice(self.SALARY_SPREADS, size)).tolist()
+            salary_mins = salary_mins.tolist()
+            experiences = np_rng.choice(self.EXPERIENCE_CHOICES, size).tolist()
+            days = np_rng.integers(0, 31, size).tolist()
+            view_counts = np_rng.integers(10, 1001, size).tolist()
+            
+            # 每行对技能下标做随机排列，取前3-5个即为无放回抽样
+            skill_orders = np_rng.random((size, skill_count)).argsort(axis=1)[:, :5].tolist()
+            skill_ks = np_rng.integers(3, 6, size).tolist()
+            
+            # 随机字节按 UUID4 规范设置版本位与变体位后整体转十六进制
+            id_bytes = np_rng.integers(0, 256, (size, 16), dtype=np.uint8)
+            id_bytes[:, 6] = (id_bytes[:, 6] & 0x0F) | 0x40
+            id_bytes[:, 8] = (id_bytes[:, 8] & 0x3F) | 0x80
+            id_hex = id_bytes.tobytes().hex()
+            
+            for i in range(size):
+                h = id_hex[i * 32:(i + 1) * 32]
+                job_id = f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+                
+                position = self.POSITIONS[positions[i]]
+                skills = [self.SKILLS[k] for k in skill_orders[i][:skill_ks[i]]]
+                experience = experiences[i]
+                publish_date = dates[days[i]]
+                
+                yield {
+                    "id": job_id,
+                    "company": self.COMPANIES[companies[i]],
+                    "position": position,
+                    "salary_min": salary_mins[i],
+                    "salary_max": salary_maxs[i],
+                    "skills": skills,
+                    "experience_required": experience,
+                    "education_required": self.EDUCATION_LEVELS[educations[i]],
+                    "location": self.CITIES[cities[i]],
+                    "job_description": self._generate_job_description(position, skills, experience),
+                    "publish_date": publish_date,
+                    "update_date": publish_date,
+                    "status": "active",
+                    "view_count": view_counts[i]
+                }
+    
     def _generate_job_description(self, position: str, skills: List[str], experience: int) -> str:
         """生成岗位描述"""
         desc = f"""
@@ -120,58 +417,69 @@ class JobDataGenerator:
         return desc
     
     def random_update_jobs(self, update_ratio: float = 0.1):
-        """随机更新部分招聘信息"""
-        job_ids = list(self.jobs.keys())
-        update_count = int(len(job_ids) * update_ratio)
-        
-        if update_count == 0:
+        """随机更新部分招聘信息（整批作为一个新版本发布）"""
+        if int(len(self._state.jobs) * update_ratio) == 0:
             return
         
-        jobs_to_update = random.sample(job_ids, update_count)
-        
-        for job_id in jobs_to_update:
-            job = self.jobs[job_id]
-            
-            # 随机选择更新操作
-            operation = random.choice([
-                'salary',      # 薪资调整
-                'status',      # 状态变更
-                'description', # 描述修改
-                'delete'       # 下架（5%概率）
-            ])
+        with self._mutate() as state:
+            job_ids = list(state.jobs.keys())
+            jobs_to_update = self.rng.sample(job_ids, int(len(job_ids) * update_ratio))
             
-            if operation == 'salary':
-                # 薪资±10%
-                adjustment = random.choice([-0.1, 0.1])
-                job['salary_min'] = int(job['salary_min'] * (1 + adjustment))
-                job['salary_max'] = int(job['salary_max'] * (1 + adjustment))
-            
-            elif operation == 'status':
-                # 状态切换
-                job['status'] = 'inactive' if job['status'] == 'active' else 'active'
-            
-            elif operation == 'description':
-                # 描述微调
-                job['job_description'] += f"\n\n【更新于{datetime.now().strftime('%Y-%m-%d')}】需求有所调整"
-            
-            elif operation == 'delete' and random.random() < 0.05:
-                # 5%概率下架
-                job['status'] = 'deleted'
-                self.deleted_jobs[job_id] = job
-                del self.jobs[job_id]
-                continue
-            
-            job['update_date'] = datetime.now().isoformat()
+            for job_id in jobs_to_update:
+                old_job = state.jobs[job_id]
+                job = dict(old_job)
+                now = datetime.now()
+                fields = []
+                
+                # 随机选择更新操作
+                operation = self.rng.choice([
+                    'salary',      # 薪资调整
+                    'status',      # 状态变更
+                    'description', # 描述修改
+                    'delete'       # 下架（5%概率）
+                ])
+                
+                if operation == 'salary':
+                    # 薪资±10%
+                    adjustment = self.rng.choice([-0.1, 0.1])
+                    job['salary_min'] = int(job['salary_min'] * (1 + adjustment))
+                    job['salary_max'] = int(job['salary_max'] * (1 + adjustment))
+                    fields = ['salary_min', 'salary_max']
+                
+                elif operation == 'status':
+                    # 状态切换
+                    job['status'] = 'inactive' if job['status'] == 'active' else 'active'
+                    fields = ['status']
+                
+                elif operation == 'description':
+                    # 描述微调
+                    job['job_description'] += f"\n\n【更新于{now.strftime('%Y-%m-%d')}】需求有所调整"
+                    fields = ['job_description']
+                
+                elif operation == 'delete' and self.rng.random() < 0.05:
+                    # 5%概率下架
+                    state.remove(job_id)
+                    job['status'] = 'deleted'
+                    job['update_date'] = now.isoformat()
+                    state.deleted_jobs[job_id] = job
+                    state.journal.append(job_id, 'deleted', ['status', 'update_date'], now)
+                    continue
+                
+                job['update_date'] = now.isoformat()
+                state.replace(old_job, job)
+                state.journal.append(job_id, 'updated', fields + ['update_date'], now)
         
         print(f"已更新 {len(jobs_to_update)} 条招聘信息")
     
     def add_new_jobs(self, count: int = 5):
-        """新增招聘信息"""
-        for _ in range(count):
-            job = self._generate_job()
-            self.jobs[job['id']] = job
-        
-        print(f"已新增 {count} 条招聘信息，当前总数: {len(self.jobs)}")
+        """新增招聘信息（整批作为一个新版本发布）"""
+        with self._mutate() as state:
+            for _ in range(count):
+                job = self._generate_job()
+                state.insert(job)
+                state.journal.append(job['id'], 'created')
+        
+        print(f"已新增 {count} 条招聘信息，当前总数: {len(state.jobs)}")
     
     def get_jobs(
         self,
@@ -179,35 +487,28 @@ class JobDataGenerator:
         per_page: int = 20,
         status: str = 'active',
         city: Optional[str] = None,
-        keyword: Optional[str] = None
+        keyword: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[Dict]:
-        """获取招聘列表（分页）"""
-        jobs = list(self.jobs.values())
-        
-        # 过滤
-        if status:
-            jobs = [j for j in jobs if j['status'] == status]
-        
-        if city:
-            jobs = [j for j in jobs if j['location'] == city]
-        
-        if keyword:
-            keyword = keyword.lower()
-            jobs = [
-                j for j in jobs
-                if keyword in j['position'].lower()
-                or keyword in j['company'].lower()
-                or any(keyword in skill.lower() for skill in j['skills'])
-            ]
-        
-        # 排序（最新更新在前）
-        jobs.sort(key=lambda x: x['update_date'], reverse=True)
-        
-        # 分页
-        start = (page - 1) * per_page
-        end = start + per_page
-        
-        return jobs[start:end]
+        """
+        获取招聘列表（最新更新在前）
+        指定 cursor 时从游标位置继续向后翻页（忽略 page），否则按页码分页
+        候选集为倒排表的只读视图（只按状态/城市过滤时不复制），翻页只检查到凑满一页为止
+        """
+        state = self._state
+        
+        if status or city or keyword:
+            job_ids = state.index.candidates_view(status=status, city=city, keyword=keyword)
+        else:
+            job_ids = None
+        
+        if cursor:
+            page_ids = state.index.newest(job_ids, limit=per_page, before=decode_cursor(cursor))
+        else:
+            start = (page - 1) * per_page
+            page_ids = state.index.newest(job_ids, limit=per_page, offset=start)
+        
+        return [state.jobs[job_id] for job_id in page_ids]
     
     def count_jobs(
         self,
@@ -215,29 +516,27 @@ class JobDataGenerator:
         city: Optional[str] = None,
         keyword: Optional[str] = None
     ) -> int:
-        """统计招聘数量"""
-        jobs = list(self.jobs.values())
-        
-        if status:
-            jobs = [j for j in jobs if j['status'] == status]
-        
-        if city:
-            jobs = [j for j in jobs if j['location'] == city]
-        
-        if keyword:
-            keyword = keyword.lower()
-            jobs = [
-                j for j in jobs
-                if keyword in j['position'].lower()
-                or keyword in j['company'].lower()
-                or any(keyword in skill.lower() for skill in j['skills'])
-            ]
-        
-        return len(jobs)
+        """统计招聘数量（只按状态/城市过滤时直接取倒排表大小）"""
+        return len(self._state.index.candidates_view(status=status, city=city, keyword=keyword))
     
     def get_job_by_id(self, job_id: str) -> Optional[Dict]:
         """根据ID获取招聘详情"""
-        return self.jobs.get(job_id)
+        return self._state.jobs.get(job_id)
+    
+    def get_jobs_by_ids(self, job_ids: List[str]) -> Tuple[Dict[str, Dict], List[str]]:
+        """批量获取招聘详情，返回 (招聘ID -> 招聘信息, 不存在的ID)"""
+        jobs = self._state.jobs
+        found: Dict[str, Dict] = {}
+        missing: List[str] = []
+        
+        for job_id in dict.fromkeys(job_ids):
+            job = jobs.get(job_id)
+            if job is None:
+                missing.append(job_id)
+            else:
+                found[job_id] = job
+        
+        return found, missing
     
     def search_jobs(
         self,
@@ -248,73 +547,148 @@ class JobDataGenerator:
         salary_max: int = 999999
     ) -> List[Dict]:
         """搜索招聘信息"""
-        jobs = list(self.jobs.values())
-        
-        # 只返回active状态
-        jobs = [j for j in jobs if j['status'] == 'active']
-        
-        # 关键词过滤
-        if keyword:
-            keyword = keyword.lower()
-            jobs = [
-                j for j in jobs
-                if keyword in j['position'].lower()
-                or keyword in j['company'].lower()
-                or any(keyword in skill.lower() for skill in j['skills'])
-            ]
-        
-        # 技能过滤
-        if skills:
-            jobs = [
-                j for j in jobs
-                if any(skill in j['skills'] for skill in skills)
-            ]
-        
-        # 城市过滤
-        if city:
-            jobs = [j for j in jobs if j['location'] == city]
-        
-        # 薪资过滤
-        jobs = [
-            j for j in jobs
-            if j['salary_max'] >= salary_min and j['salary_min'] <= salary_max
+        return list(self.iter_search_jobs(
+            keyword=keyword,
+            skills=skills,
+            city=city,
+            salary_min=salary_min,
+            salary_max=salary_max
+        ))
+    
+    def iter_search_jobs(
+        self,
+        keyword: str = '',
+        skills: Optional[List[str]] = None,
+        city: Optional[str] = None,
+        salary_min: int = 0,
+        salary_max: int = 999999
+    ) -> Iterator[Dict]:
+        """
+        逐条产出搜索结果，只预先计算命中的招聘ID（供流式导出使用）
+        整个遍历过程读取同一版本的数据，期间的更新不影响结果
+        """
+        state = self._state
+        
+        # 只返回active状态，关键词/技能/城市过滤均为倒排表交集，薪资走区间索引
+        job_ids = state.index.candidates(
+            status='active',
+            city=city,
+            keyword=keyword,
+            skills=skills,
+            salary_range=(salary_min, salary_max)
+        )
+        
+        for job_id in job_ids:
+            yield state.jobs[job_id]
+    
+    def match_rules(self, rules: List[Dict]) -> List[List[str]]:
+        """批量匹配监控规则，所有规则基于同一版本的数据求值"""
+        return [list(job_ids) for job_ids in self._state.index.match_rules(rules)]
+    
+    def get_updates_since(
+        self,
+        since: Optional[datetime] = None,
+        since_seq: Optional[int] = None
+    ) -> Dict:
+        """
+        获取指定时间或序号之后的更新
+        优先从变更日志读取，代价与变更数成正比；
+        时间早于日志覆盖范围时退回全量扫描；
+        序号超出日志保留范围时只返回 resync 标记与当前序号，由调用方自行全量同步；
+        返回值都带日志纪元，纪元变化说明序号已不连续（平台重新生成了数据），调用方应全量同步
+        """
+        state = self._state
+        
+        if since_seq is None:
+            if since.tzinfo is not None:
+                since = since.astimezone().replace(tzinfo=None)
+            since_seq = state.journal.seq_at(since)
+            
+            if since_seq is None:
+                return self._scan_updates_since(state, since)
+        
+        entries = state.journal.entries_after(since_seq)
+        
+        if entries is None:
+            # 序号已超出日志保留范围（或平台已重启）：调用方需全量同步，不返回招聘数据
+            return {
+                "epoch": state.journal.epoch,
+                "last_seq": state.journal.last_seq,
+                "resync": True
+            }
+        
+        updated_ids: Dict[str, None] = {}
+        deleted_ids: Dict[str, None] = {}
+        
+        for entry in entries:
+            if entry.operation == 'deleted':
+                updated_ids.pop(entry.job_id, None)
+                deleted_ids[entry.job_id] = None
+            else:
+                updated_ids[entry.job_id] = None
+        
+        updated_jobs = [state.jobs[job_id] for job_id in updated_ids if job_id in state.jobs]
+        deleted_jobs = [
+            state.deleted_jobs[job_id] for job_id in deleted_ids
+            if job_id in state.deleted_jobs
         ]
         
-        return jobs
+        return {
+            "updated": updated_jobs,
+            "deleted": deleted_jobs,
+            "changes": [entry.to_dict() for entry in entries],
+            "count": {
+                "updated": len(updated_jobs),
+                "deleted": len(deleted_jobs)
+            },
+            "epoch": state.journal.epoch,
+            "last_seq": state.journal.last_seq,
+            "resync": False
+        }
     
-    def get_updates_since(self, since: datetime) -> Dict:
-        """获取指定时间后的更新"""
+    @staticmethod
+    def _scan_updates_since(state: PlatformState, since: datetime) -> Dict:
+        """全量扫描指定时间后的更新"""
         updated_jobs = [
-            j for j in self.jobs.values()
+            j for j in state.jobs.values()
             if datetime.fromisoformat(j['update_date']) > since
         ]
         
         deleted_jobs = [
-            j for j in self.deleted_jobs.values()
+            j for j in state.deleted_jobs.values()
             if datetime.fromisoformat(j['update_date']) > since
         ]
         
         return {
             "updated": updated_jobs,
             "deleted": deleted_jobs,
+            "changes": [],
             "count": {
                 "updated": len(updated_jobs),
                 "deleted": len(deleted_jobs)
-            }
+            },
+            "epoch": state.journal.epoch,
+            "last_seq": state.journal.last_seq,
+            "resync": False
         }
     
     def get_statistics(self) -> Dict:
-        """获取统计信息"""
-        active_jobs = [j for j in self.jobs.values() if j['status'] == 'active']
-        inactive_jobs = [j for j in self.jobs.values() if j['status'] == 'inactive']
+        """获取统计信息（读取增量维护的计数，O(1)）"""
+        state = self._state
+        stats = state.index.stats
+        # 计数表为 defaultdict，读取时用 get 避免写入已发布的状态
+        active = stats.status_counts.get('active', 0)
         
         return {
-            "total": len(self.jobs),
-            "active": len(active_jobs),
-            "inactive": len(inactive_jobs),
-            "deleted": len(self.deleted_jobs),
-            "cities": list(set(j['location'] for j in active_jobs)),
-            "companies": list(set(j['company'] for j in active_jobs)),
-            "avg_salary": sum(j['salary_max'] for j in active_jobs) // len(active_jobs) if active_jobs else 0
+            "total": len(state.jobs),
+            "active": active,
+            "inactive": stats.status_counts.get('inactive', 0),
+            "deleted": len(state.deleted_jobs),
+            "cities": list(stats.city_counts),
+            "companies": list(stats.company_counts),
+            "city_counts": dict(stats.city_counts),
+            "company_counts": dict(stats.company_counts),
+            "avg_salary": stats.active_salary_sum // active if active else 0,
+            "epoch": state.journal.epoch,
+            "last_seq": state.journal.last_seq
         }
-
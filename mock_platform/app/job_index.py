@@ -0,0 +1,817 @@
+"""
+招聘数据倒排索引
+为岗位/公司/技能、城市、状态维护 词项 -> 招聘ID 的倒排表，随数据增删改增量更新；
+平台状态使用按招聘ID分片的 ShardedJobIndex，写时复制只复制被修改的分片
+"""
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from collections.abc import Set as AbstractSet
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+# (update_date, id)：列表按此键排序，最新更新的排在末尾
+OrderKey = Tuple[str, str]
+
+
+def _copy_postings(postings: Dict) -> Dict:
+    return {key: set(ids) for key, ids in postings.items()}
+
+
+def _newest_page(
+    job_ids: Optional[AbstractSet],
+    limit: int,
+    offset: int,
+    before: Optional[OrderKey],
+    total: int,
+    key_of: Callable[[str], OrderKey],
+    iter_keys: Callable[[Optional[OrderKey]], Iterator[OrderKey]]
+) -> List[str]:
+    """
+    按更新时间倒序取一页招聘ID
+    job_ids 为 None 表示不过滤；候选集很小时直接排序候选集，
+    否则沿有序序列从新到旧遍历（iter_keys），只检查到凑满一页为止
+    """
+    wanted = offset + limit
+    if wanted <= 0:
+        return []
+
+    if job_ids is not None:
+        # 顺序遍历预计要检查的条目数
+        expected_scan = wanted * max(total, 1) // max(len(job_ids), 1)
+
+        if not job_ids or len(job_ids) < expected_scan:
+            keys = [key_of(job_id) for job_id in job_ids]
+            if before:
+                keys = [key for key in keys if key < before]
+            keys = heapq.nlargest(wanted, keys)
+            return [key[1] for key in keys[offset:]]
+
+    page: List[str] = []
+    for _, job_id in iter_keys(before):
+        if job_ids is not None and job_id not in job_ids:
+            continue
+        if offset:
+            offset -= 1
+            continue
+        page.append(job_id)
+        if len(page) >= limit:
+            break
+
+    return page
+
+
+class SalaryIndex:
+    """
+    薪资区间索引
+    薪资取值是离散的小整数集合，按 salary_min / salary_max 分桶，
+    桶键保存在有序数组中用二分定位，区间重叠查询只遍历命中的桶
+    """
+
+    def __init__(self):
+        self.bounds: Dict[str, Tuple[int, int]] = {}
+        self._by_min: Dict[int, Set[str]] = {}
+        self._by_max: Dict[int, Set[str]] = {}
+        self._min_keys: List[int] = []
+        self._max_keys: List[int] = []
+
+    def copy(self) -> 'SalaryIndex':
+        clone = SalaryIndex()
+        clone.bounds = dict(self.bounds)
+        clone._by_min = _copy_postings(self._by_min)
+        clone._by_max = _copy_postings(self._by_max)
+        clone._min_keys = list(self._min_keys)
+        clone._max_keys = list(self._max_keys)
+        return clone
+
+    @staticmethod
+    def _add_bucket(buckets: Dict[int, Set[str]], keys: List[int], value: int, job_id: str):
+        ids = buckets.get(value)
+        if ids is None:
+            ids = buckets[value] = set()
+            insort(keys, value)
+        ids.add(job_id)
+
+    @staticmethod
+    def _remove_bucket(buckets: Dict[int, Set[str]], keys: List[int], value: int, job_id: str):
+        ids = buckets[value]
+        ids.discard(job_id)
+        if not ids:
+            del buckets[value]
+            del keys[bisect_left(keys, value)]
+
+    def add(self, job_id: str, salary_min: int, salary_max: int):
+        self.bounds[job_id] = (salary_min, salary_max)
+        self._add_bucket(self._by_min, self._min_keys, salary_min, job_id)
+        self._add_bucket(self._by_max, self._max_keys, salary_max, job_id)
+
+    def extend(self, items: Iterable[Tuple[str, int, int]]):
+        """批量加入 (job_id, salary_min, salary_max)"""
+        bounds: Dict[str, Tuple[int, int]] = {}
+        by_min: Dict[int, List[str]] = defaultdict(list)
+        by_max: Dict[int, List[str]] = defaultdict(list)
+
+        for job_id, salary_min, salary_max in items:
+            bounds[job_id] = (salary_min, salary_max)
+            by_min[salary_min].append(job_id)
+            by_max[salary_max].append(job_id)
+
+        self.extend_grouped(bounds, by_min, by_max)
+
+    def extend_grouped(
+        self,
+        bounds: Dict[str, Tuple[int, int]],
+        by_min: Dict[int, List[str]],
+        by_max: Dict[int, List[str]]
+    ):
+        """批量加入已按 salary_min / salary_max 分好组的招聘"""
+        self.bounds.update(bounds)
+
+        for buckets, keys, collected in (
+            (self._by_min, self._min_keys, by_min),
+            (self._by_max, self._max_keys, by_max)
+        ):
+            for value, ids in collected.items():
+                if value not in buckets:
+                    buckets[value] = set()
+                    insort(keys, value)
+                buckets[value].update(ids)
+
+    def remove(self, job_id: str):
+        salary_min, salary_max = self.bounds.pop(job_id)
+        self._remove_bucket(self._by_min, self._min_keys, salary_min, job_id)
+        self._remove_bucket(self._by_max, self._max_keys, salary_max, job_id)
+
+    def _min_buckets(self, salary_max: int) -> List[Set[str]]:
+        """salary_min <= 查询上限 的桶"""
+        end = bisect_right(self._min_keys, salary_max)
+        return [self._by_min[key] for key in self._min_keys[:end]]
+
+    def _max_buckets(self, salary_min: int) -> List[Set[str]]:
+        """salary_max >= 查询下限 的桶"""
+        start = bisect_left(self._max_keys, salary_min)
+        return [self._by_max[key] for key in self._max_keys[start:]]
+
+    def _narrowest_side(self, salary_min: int, salary_max: int) -> Tuple[List[Set[str]], int]:
+        """两侧条件中命中较少的一侧的桶及其招聘数量"""
+        min_side = self._min_buckets(salary_max)
+        max_side = self._max_buckets(salary_min)
+        min_count = sum(len(ids) for ids in min_side)
+        max_count = sum(len(ids) for ids in max_side)
+
+        if min_count <= max_count:
+            return min_side, min_count
+        return max_side, max_count
+
+    def overlaps(self, job_id: str, salary_min: int, salary_max: int) -> bool:
+        low, high = self.bounds[job_id]
+        return high >= salary_min and low <= salary_max
+
+    def filter(self, job_ids: Iterable[str], salary_min: int, salary_max: int) -> Set[str]:
+        """从已有候选集中筛出薪资区间重叠的招聘"""
+        return {
+            job_id for job_id in job_ids
+            if self.overlaps(job_id, salary_min, salary_max)
+        }
+
+    def intersect(self, job_ids: Set[str], salary_min: int, salary_max: int) -> Set[str]:
+        """
+        与候选集求交：候选集较小时直接逐个校验，
+        否则只遍历命中较少一侧的薪资桶
+        """
+        buckets, count = self._narrowest_side(salary_min, salary_max)
+
+        if len(job_ids) <= count:
+            return self.filter(job_ids, salary_min, salary_max)
+
+        result: Set[str] = set()
+        for ids in buckets:
+            result |= self.filter(ids & job_ids, salary_min, salary_max)
+
+        return result
+
+
+class UpdateOrder:
+    """
+    按 (update_date, id) 有序的招聘序列
+    被更新的招聘总是移到末尾（append），旧位置只做惰性删除标记，
+    失效条目过多时再整体压缩，避免在列表中间频繁删除
+    """
+
+    # 失效条目超过该数量且多于有效条目时压缩
+    COMPACT_THRESHOLD = 1024
+
+    def __init__(self):
+        self.order: List[OrderKey] = []
+        self.current: Dict[str, OrderKey] = {}
+        self._stale = 0
+
+    def copy(self) -> 'UpdateOrder':
+        clone = UpdateOrder()
+        clone.order = list(self.order)
+        clone.current = dict(self.current)
+        clone._stale = self._stale
+        return clone
+
+    @staticmethod
+    def key_of(job: Dict) -> OrderKey:
+        return job['update_date'], job['id']
+
+    def add(self, job: Dict):
+        key = self.key_of(job)
+        self.current[job['id']] = key
+
+        if not self.order or key >= self.order[-1]:
+            self.order.append(key)
+        else:
+            insort(self.order, key)
+
+    def extend(self, keys: Iterable[OrderKey]):
+        """批量加入后统一排序一次（已有序的输入排序代价为线性）"""
+        keys = list(keys)
+        self.current.update({key[1]: key for key in keys})
+        self.order.extend(keys)
+        self.order.sort()
+
+    def remove(self, job: Dict):
+        if self.current.pop(job['id'], None) is None:
+            return
+
+        self._stale += 1
+        if self._stale > self.COMPACT_THRESHOLD and self._stale > len(self.current):
+            self.compact()
+
+    def compact(self):
+        """清除失效条目"""
+        self.order = [key for key in self.order if self.current.get(key[1]) == key]
+        self._stale = 0
+
+    def iter_newest(self, before: Optional[OrderKey] = None) -> Iterator[OrderKey]:
+        """从新到旧遍历有效的 (update_date, id)；指定 before 时只返回排在该键之前（更旧）的招聘"""
+        order = self.order
+        position = bisect_left(order, before) if before else len(order)
+
+        for i in range(position - 1, -1, -1):
+            key = order[i]
+            if self.current.get(key[1]) == key:
+                yield key
+
+
+class JobStatistics:
+    """增量维护的统计计数（状态数量，在招岗位的城市/公司分布与薪资总和）"""
+
+    def __init__(self):
+        self.status_counts: Dict[str, int] = defaultdict(int)
+        self.city_counts: Dict[str, int] = defaultdict(int)
+        self.company_counts: Dict[str, int] = defaultdict(int)
+        self.active_salary_sum = 0
+
+    def copy(self) -> 'JobStatistics':
+        clone = JobStatistics()
+        clone.status_counts.update(self.status_counts)
+        clone.city_counts.update(self.city_counts)
+        clone.company_counts.update(self.company_counts)
+        clone.active_salary_sum = self.active_salary_sum
+        return clone
+
+    def _apply(self, job: Dict, delta: int):
+        self.status_counts[job['status']] += delta
+
+        if job['status'] != 'active':
+            return
+
+        for counts, key in ((self.city_counts, job['location']), (self.company_counts, job['company'])):
+            counts[key] += delta
+            if not counts[key]:
+                del counts[key]
+        self.active_salary_sum += delta * job['salary_max']
+
+    def add(self, job: Dict):
+        self._apply(job, 1)
+
+    def remove(self, job: Dict):
+        self._apply(job, -1)
+
+    def merge(self, other: 'JobStatistics'):
+        """累加另一组计数（汇总各分片）"""
+        for counts, other_counts in (
+            (self.status_counts, other.status_counts),
+            (self.city_counts, other.city_counts),
+            (self.company_counts, other.company_counts)
+        ):
+            for key, count in other_counts.items():
+                if count:
+                    counts[key] += count
+        self.active_salary_sum += other.active_salary_sum
+
+
+class JobIndex:
+    """招聘信息倒排索引"""
+
+    def __init__(self):
+        # 小写词项（岗位、公司、技能） -> 招聘ID集合
+        self.terms: Dict[str, Set[str]] = {}
+        # 技能原文 -> 招聘ID集合（技能过滤区分大小写）
+        self.skills: Dict[str, Set[str]] = {}
+        self.cities: Dict[str, Set[str]] = {}
+        self.statuses: Dict[str, Set[str]] = {}
+        self.salary = SalaryIndex()
+        self.updates = UpdateOrder()
+        self.stats = JobStatistics()
+        self.all_ids: Set[str] = set()
+
+    def copy(self) -> 'JobIndex':
+        """深拷贝索引（倒排表逐个复制，招聘ID字符串共享）"""
+        clone = JobIndex()
+        clone.terms = _copy_postings(self.terms)
+        clone.skills = _copy_postings(self.skills)
+        clone.cities = _copy_postings(self.cities)
+        clone.statuses = _copy_postings(self.statuses)
+        clone.salary = self.salary.copy()
+        clone.updates = self.updates.copy()
+        clone.stats = self.stats.copy()
+        clone.all_ids = set(self.all_ids)
+        return clone
+
+    @staticmethod
+    def _job_terms(job: Dict) -> Set[str]:
+        """提取招聘信息中可被关键词命中的词项"""
+        terms = {job['position'].lower(), job['company'].lower()}
+        terms.update(skill.lower() for skill in job['skills'])
+        return terms
+
+    @staticmethod
+    def _add_posting(postings: Dict[str, Set[str]], key: str, job_id: str):
+        postings.setdefault(key, set()).add(job_id)
+
+    @staticmethod
+    def _remove_posting(postings: Dict[str, Set[str]], key: str, job_id: str):
+        ids = postings.get(key)
+        if ids is None:
+            return
+        ids.discard(job_id)
+        if not ids:
+            del postings[key]
+
+    def add(self, job: Dict):
+        """将招聘信息加入索引"""
+        self._add_postings(job)
+        self.updates.add(job)
+        self.stats.add(job)
+
+    def extend(self, jobs: Iterable[Dict]):
+        """
+        批量加入索引（初始化时使用）：先按键收集ID列表再一次性并入倒排表，
+        有序序列只排序一次
+        """
+        terms: Dict[str, List[str]] = defaultdict(list)
+        skills: Dict[str, List[str]] = defaultdict(list)
+        cities: Dict[str, List[str]] = defaultdict(list)
+        statuses: Dict[str, List[str]] = defaultdict(list)
+        salaries: List[Tuple[str, int, int]] = []
+        keys: List[OrderKey] = []
+        lowered: Dict[str, str] = {}
+
+        def lower(value: str) -> str:
+            result = lowered.get(value)
+            if result is None:
+                result = lowered[value] = value.lower()
+            return result
+
+        for job in jobs:
+            job_id = job['id']
+            job_terms = {lower(job['position']), lower(job['company'])}
+            for skill in job['skills']:
+                job_terms.add(lower(skill))
+                skills[skill].append(job_id)
+            for term in job_terms:
+                terms[term].append(job_id)
+
+            cities[job['location']].append(job_id)
+            statuses[job['status']].append(job_id)
+            salaries.append((job_id, job['salary_min'], job['salary_max']))
+            keys.append((job['update_date'], job_id))
+            self.stats.add(job)
+
+        for postings, collected in (
+            (self.terms, terms),
+            (self.skills, skills),
+            (self.cities, cities),
+            (self.statuses, statuses)
+        ):
+            for key, ids in collected.items():
+                postings.setdefault(key, set()).update(ids)
+
+        self.all_ids.update(key[1] for key in keys)
+        self.salary.extend(salaries)
+        self.updates.extend(keys)
+
+    def extend_columnar(self, store):
+        """
+        由列式存储的行视图（ColumnarRows）批量建索引，结果与对这些招聘调用 extend 相同：
+        各倒排表直接由按列取值分组的招聘ID得到，不逐条组装招聘字典（快照恢复时使用）
+        """
+        groups = {name: store.grouped_ids(name) for name in ('position', 'company', 'city', 'status')}
+        groups['skills'] = store.skill_ids()
+
+        for postings, collected in (
+            (self.skills, groups['skills']),
+            (self.cities, groups['city']),
+            (self.statuses, groups['status'])
+        ):
+            for key, ids in collected.items():
+                postings.setdefault(key, set()).update(ids)
+
+        for name in ('position', 'company', 'skills'):
+            for value, ids in groups[name].items():
+                self.terms.setdefault(value.lower(), set()).update(ids)
+
+        job_ids = list(store)
+        salary_max = store.column_values('salary_max')
+        self.all_ids.update(job_ids)
+        self.salary.extend_grouped(
+            dict(zip(job_ids, zip(store.column_values('salary_min'), salary_max))),
+            store.grouped_ids('salary_min'),
+            store.grouped_ids('salary_max')
+        )
+        self.updates.extend(store.update_keys())
+
+        # 统计计数：在招岗位按城市/公司分组计数，薪资总和只累加在招岗位
+        stats = self.stats
+        active = set(groups['status'].get('active', ()))
+        for status, ids in groups['status'].items():
+            stats.status_counts[status] += len(ids)
+        for counts, name in ((stats.city_counts, 'city'), (stats.company_counts, 'company')):
+            for key, ids in groups[name].items():
+                count = len(active.intersection(ids))
+                if count:
+                    counts[key] += count
+        stats.active_salary_sum += sum(
+            value for job_id, value in zip(job_ids, salary_max) if job_id in active
+        )
+
+    def _add_postings(self, job: Dict):
+        job_id = job['id']
+        self.all_ids.add(job_id)
+
+        for term in self._job_terms(job):
+            self._add_posting(self.terms, term, job_id)
+        for skill in job['skills']:
+            self._add_posting(self.skills, skill, job_id)
+
+        self._add_posting(self.cities, job['location'], job_id)
+        self._add_posting(self.statuses, job['status'], job_id)
+        self.salary.add(job_id, job['salary_min'], job['salary_max'])
+
+    def remove(self, job: Dict):
+        """将招聘信息移出索引"""
+        job_id = job['id']
+        self.all_ids.discard(job_id)
+
+        for term in self._job_terms(job):
+            self._remove_posting(self.terms, term, job_id)
+        for skill in job['skills']:
+            self._remove_posting(self.skills, skill, job_id)
+
+        self._remove_posting(self.cities, job['location'], job_id)
+        self._remove_posting(self.statuses, job['status'], job_id)
+        self.salary.remove(job_id)
+        self.updates.remove(job)
+        self.stats.remove(job)
+
+    def update(self, old_job: Dict, new_job: Dict):
+        """招聘信息变更后更新索引"""
+        self.remove(old_job)
+        self.add(new_job)
+
+    def match_keyword(self, keyword: str) -> Set[str]:
+        """
+        关键词子串匹配：在词表（岗位/公司/技能，规模很小）中查找包含关键词的词项，
+        合并其倒排表
+        """
+        keyword = keyword.lower()
+        matched: Set[str] = set()
+
+        for term, ids in self.terms.items():
+            if keyword in term:
+                matched |= ids
+
+        return matched
+
+    def match_skills(self, skills: Iterable[str]) -> Set[str]:
+        """命中任一技能的招聘ID"""
+        matched: Set[str] = set()
+
+        for skill in skills:
+            matched |= self.skills.get(skill, set())
+
+        return matched
+
+    def candidates(
+        self,
+        status: Optional[str] = None,
+        city: Optional[str] = None,
+        keyword: Optional[str] = None,
+        skills: Optional[List[str]] = None,
+        salary_range: Optional[Tuple[int, int]] = None
+    ) -> Set[str]:
+        """按条件求倒排表交集，返回满足全部过滤条件的招聘ID"""
+        postings: List[Set[str]] = []
+
+        if status:
+            postings.append(self.statuses.get(status, set()))
+        if city:
+            postings.append(self.cities.get(city, set()))
+        if keyword:
+            postings.append(self.match_keyword(keyword))
+        if skills:
+            postings.append(self.match_skills(skills))
+
+        if not postings:
+            result = set(self.all_ids)
+        else:
+            # 从最短的倒排表开始求交集
+            postings.sort(key=len)
+            result = set(postings[0])
+            for ids in postings[1:]:
+                if not result:
+                    break
+                result &= ids
+
+        # 薪资区间最后与候选集合并，不生成中间列表
+        if salary_range and result:
+            result = self.salary.intersect(result, *salary_range)
+
+        return result
+
+    def candidates_view(
+        self,
+        status: Optional[str] = None,
+        city: Optional[str] = None,
+        keyword: Optional[str] = None
+    ) -> AbstractSet:
+        """
+        只读的候选集（供分页与计数）：只按状态或只按城市过滤（或不过滤）时直接返回倒排表本身，
+        不复制，代价与数据量无关；其余情况同 candidates。调用方不得修改返回的集合
+        """
+        if not keyword:
+            if not city:
+                return self.statuses.get(status, set()) if status else self.all_ids
+            if not status:
+                return self.cities.get(city, set())
+
+        return self.candidates(status=status, city=city, keyword=keyword)
+
+    def match_rules(self, rules: List[Dict]) -> List[Set[str]]:
+        """
+        一次求值多条监控规则（只匹配在招岗位），返回与 rules 顺序对应的招聘ID集合
+        规则字段: keywords（任一命中）、exclude_keywords、cities（任一命中）、salary_min、salary_max
+        各规则共用的关键词/城市倒排表只合并一次，条件完全相同的规则直接复用结果
+        """
+        active = self.statuses.get('active', set())
+        keyword_cache: Dict[str, Set[str]] = {}
+        results: Dict[Tuple, Set[str]] = {}
+
+        def keyword_ids(keyword: str) -> Set[str]:
+            ids = keyword_cache.get(keyword)
+            if ids is None:
+                ids = keyword_cache[keyword] = self.match_keyword(keyword)
+            return ids
+
+        def union(sets: Iterable[Set[str]]) -> Set[str]:
+            matched: Set[str] = set()
+            for ids in sets:
+                matched |= ids
+            return matched
+
+        matches = []
+        for rule in rules:
+            keywords = frozenset(kw.lower() for kw in rule.get('keywords') or [] if kw)
+            excludes = frozenset(kw.lower() for kw in rule.get('exclude_keywords') or [] if kw)
+            cities = frozenset(rule.get('cities') or [])
+            salary_min = rule.get('salary_min')
+            salary_max = rule.get('salary_max')
+            key = (keywords, excludes, cities, salary_min, salary_max)
+
+            result = results.get(key)
+            if result is None:
+                postings = [active]
+                if keywords:
+                    postings.append(union(keyword_ids(kw) for kw in keywords))
+                if cities:
+                    postings.append(union(self.cities.get(city, set()) for city in cities))
+
+                postings.sort(key=len)
+                result = set(postings[0])
+                for ids in postings[1:]:
+                    if not result:
+                        break
+                    result &= ids
+
+                for kw in excludes:
+                    if not result:
+                        break
+                    result -= keyword_ids(kw)
+
+                if (salary_min is not None or salary_max is not None) and result:
+                    result = self.salary.intersect(
+                        result,
+                        salary_min if salary_min is not None else 0,
+                        salary_max if salary_max is not None else 999999
+                    )
+
+                results[key] = result
+
+            matches.append(result)
+
+        return matches
+
+    def newest(
+        self,
+        job_ids: Optional[AbstractSet],
+        limit: int,
+        offset: int = 0,
+        before: Optional[OrderKey] = None
+    ) -> List[str]:
+        """按更新时间倒序取一页招聘ID（job_ids 为 None 表示不过滤）"""
+        return _newest_page(
+            job_ids, limit, offset, before,
+            total=len(self.updates.current),
+            key_of=self.updates.current.__getitem__,
+            iter_keys=self.updates.iter_newest
+        )
+
+
+class ShardedIdSet(AbstractSet):
+    """各分片ID集合的只读并集视图：不复制集合，成员判断只查招聘ID所在的分片"""
+
+    def __init__(self, parts: List[AbstractSet], shard_of: Callable[[str], int]):
+        self._parts = parts
+        self._shard_of = shard_of
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self._parts[self._shard_of(job_id)]
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._parts)
+
+    def __iter__(self) -> Iterator[str]:
+        return chain.from_iterable(self._parts)
+
+
+class ShardedJobIndex:
+    """
+    按招聘ID散列分片的倒排索引，对外接口与 JobIndex 相同
+    copy() 只复制分片列表，与原索引共享全部分片；写操作首次修改某个分片时才复制该分片，
+    一次只涉及少量招聘的写入不必复制整个索引。查询在各分片上执行后合并结果
+    """
+
+    # 每个分片的目标招聘数；分片数在建索引时按数据量确定，之后不再调整
+    SHARD_SIZE = 4096
+    MAX_SHARDS = 1024
+
+    def __init__(self, shard_count: int = 1):
+        self.shards: List[JobIndex] = [JobIndex() for _ in range(shard_count)]
+        # 本版本独占（已复制过）的分片
+        self._owned: Set[int] = set(range(shard_count))
+        self._stats: Optional[JobStatistics] = None
+
+    @classmethod
+    def for_size(cls, count: int) -> 'ShardedJobIndex':
+        """按数据量创建索引：少量数据只用一个分片，与 JobIndex 行为一致"""
+        return cls(min(cls.MAX_SHARDS, max(1, count // cls.SHARD_SIZE)))
+
+    def copy(self) -> 'ShardedJobIndex':
+        """写时复制：新索引与原索引共享全部分片"""
+        clone = ShardedJobIndex(0)
+        clone.shards = list(self.shards)
+        clone._stats = self._stats
+        return clone
+
+    def __len__(self) -> int:
+        return sum(len(shard.updates.current) for shard in self.shards)
+
+    def _shard_of(self, job_id: str) -> int:
+        return hash(job_id) % len(self.shards)
+
+    def _writable(self, shard: int) -> JobIndex:
+        """取得可修改的分片（与其他版本共享时先复制）"""
+        if shard not in self._owned:
+            self.shards[shard] = self.shards[shard].copy()
+            self._owned.add(shard)
+        self._stats = None
+        return self.shards[shard]
+
+    @property
+    def stats(self) -> JobStatistics:
+        """各分片统计计数的汇总（按版本缓存）"""
+        stats = self._stats
+        if stats is None:
+            stats = JobStatistics()
+            for shard in self.shards:
+                stats.merge(shard.stats)
+            self._stats = stats
+        return stats
+
+    def add(self, job: Dict):
+        self._writable(self._shard_of(job['id'])).add(job)
+
+    def remove(self, job: Dict):
+        self._writable(self._shard_of(job['id'])).remove(job)
+
+    def update(self, old_job: Dict, new_job: Dict):
+        self._writable(self._shard_of(new_job['id'])).update(old_job, new_job)
+
+    def extend(self, jobs: Iterable[Dict]):
+        """批量加入索引：先按分片归类，再逐个分片批量加入"""
+        groups: Dict[int, List[Dict]] = defaultdict(list)
+        for job in jobs:
+            groups[self._shard_of(job['id'])].append(job)
+
+        for shard, shard_jobs in groups.items():
+            self._writable(shard).extend(shard_jobs)
+
+    def extend_columnar(self, store):
+        """由列式存储（ColumnarJobStore）批量建索引：按分片划分各行后逐个分片由编码列建索引"""
+        count = len(self.shards)
+        parts = None
+        if count > 1:
+            parts = np.fromiter((self._shard_of(job_id) for job_id in store), dtype=np.int64, count=len(store))
+
+        for shard, rows in enumerate(store.partition(parts, count)):
+            if len(rows):
+                self._writable(shard).extend_columnar(rows)
+
+    def candidates(
+        self,
+        status: Optional[str] = None,
+        city: Optional[str] = None,
+        keyword: Optional[str] = None,
+        skills: Optional[List[str]] = None,
+        salary_range: Optional[Tuple[int, int]] = None
+    ) -> Set[str]:
+        """按条件求满足全部过滤条件的招聘ID，各分片结果取并集"""
+        results = [
+            shard.candidates(status, city, keyword, skills, salary_range)
+            for shard in self.shards
+        ]
+        if len(results) == 1:
+            return results[0]
+        return set().union(*results)
+
+    def candidates_view(
+        self,
+        status: Optional[str] = None,
+        city: Optional[str] = None,
+        keyword: Optional[str] = None
+    ) -> AbstractSet:
+        """只读的候选集（同 JobIndex.candidates_view）：各分片结果不合并，包装为按分片判断成员的视图"""
+        parts = [shard.candidates_view(status, city, keyword) for shard in self.shards]
+        if len(parts) == 1:
+            return parts[0]
+        return ShardedIdSet(parts, self._shard_of)
+
+    def match_rules(self, rules: List[Dict]) -> List[Set[str]]:
+        """一次求值多条监控规则（参数同 JobIndex.match_rules），各分片结果按规则合并"""
+        if len(self.shards) == 1:
+            return self.shards[0].match_rules(rules)
+
+        per_shard = [shard.match_rules(rules) for shard in self.shards]
+
+        # 条件相同的规则在各分片复用同一结果集合，合并后同样复用
+        merged: Dict[Tuple[int, ...], Set[str]] = {}
+        matches = []
+        for parts in zip(*per_shard):
+            key = tuple(map(id, parts))
+            result = merged.get(key)
+            if result is None:
+                result = merged[key] = set().union(*parts)
+            matches.append(result)
+
+        return matches
+
+    def _key_of(self, job_id: str) -> OrderKey:
+        return self.shards[self._shard_of(job_id)].updates.current[job_id]
+
+    def _iter_newest(self, before: Optional[OrderKey] = None) -> Iterator[OrderKey]:
+        """从新到旧归并各分片的有序序列"""
+        if len(self.shards) == 1:
+            return self.shards[0].updates.iter_newest(before)
+        return heapq.merge(*(shard.updates.iter_newest(before) for shard in self.shards), reverse=True)
+
+    def newest(
+        self,
+        job_ids: Optional[AbstractSet],
+        limit: int,
+        offset: int = 0,
+        before: Optional[OrderKey] = None
+    ) -> List[str]:
+        """按更新时间倒序取一页招聘ID（job_ids 为 None 表示不过滤）"""
+        return _newest_page(
+            job_ids, limit, offset, before,
+            total=len(self),
+            key_of=self._key_of,
+            iter_keys=self._iter_newest
+        )
@@ -0,0 +1,175 @@
+"""
+招聘数据变更日志
+只追加的内存日志，每次新增/更新/下架记录一条带单调递增序号的变更，
+供 /api/v1/jobs/updates 按序号或时间增量拉取；
+按时间保留最近一段的变更（覆盖调用方最长的同步间隔），可另设条目数上限控制内存；
+各数据版本共享同一组条目列表，每个版本只记录自己可见的条目数，复制版本不复制列表；
+每个日志有一个纪元标识，序号只在同一纪元内连续：重新生成数据即开始新纪元；
+从快照恢复时快照之后的变更已丢失、序号会被重复使用，除非快照是正常退出前写入的，否则同样开始新纪元
+"""
+import uuid
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+
+
+class JournalEntry(NamedTuple):
+    seq: int
+    timestamp: datetime
+    job_id: str
+    operation: str  # created, updated, deleted
+    fields: List[str]
+
+    def to_dict(self) -> Dict:
+        return {
+            "seq": self.seq,
+            "timestamp": self.timestamp.isoformat(),
+            "job_id": self.job_id,
+            "operation": self.operation,
+            "fields": self.fields
+        }
+
+
+class ChangeJournal:
+    """变更日志"""
+
+    # 默认保留时间，与后端全量对账周期一致：更早的水位无论如何都会全量对账
+    DEFAULT_RETENTION = timedelta(hours=24)
+    # 过期条目累积到该数量（且不少于总数的 1/8）才批量丢弃，避免每次追加都移动列表
+    TRIM_BATCH = 1024
+
+    def __init__(
+        self,
+        started_at: Optional[datetime] = None,
+        retention: Optional[timedelta] = None,
+        max_entries: Optional[int] = None,
+        epoch: Optional[str] = None
+    ):
+        """
+        retention: 至少保留的时间范围
+        max_entries: 条目数上限（为空不限制），超出后丢弃最旧的一半
+        epoch: 纪元标识，为空时新建
+        """
+        self.epoch = epoch or uuid.uuid4().hex
+        self.retention = retention or self.DEFAULT_RETENTION
+        self.max_entries = max_entries
+        self.entries: List[JournalEntry] = []
+        # 与 entries 一一对应，用于按时间二分查找
+        self.timestamps: List[datetime] = []
+        # 日志覆盖的起始时间：早于该时间的变更不在日志中
+        self.started_at = started_at or datetime.now()
+        # entries[0] 之前的最后一个序号
+        self.base_seq = 0
+        # 本版本可见的条目数：列表可能与后续版本共享，其后的条目属于更新的版本
+        self._count = 0
+
+    def to_dict(self) -> Dict:
+        """导出为可 JSON 序列化的结构（供快照写入）"""
+        return {
+            "epoch": self.epoch,
+            "started_at": self.started_at.isoformat(),
+            "base_seq": self.base_seq,
+            "entries": [
+                [entry.seq, entry.timestamp.isoformat(), entry.job_id, entry.operation, entry.fields]
+                for entry in self.entries[:self._count]
+            ]
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict,
+        retention: Optional[timedelta] = None,
+        max_entries: Optional[int] = None,
+        resume: bool = False
+    ) -> 'ChangeJournal':
+        """
+        由 to_dict 的结果恢复（保留策略取当前配置）
+        resume: 沿用原纪元（数据之后没有丢失的变更时）；否则开始新纪元，调用方据此全量同步
+        """
+        journal = cls(
+            started_at=datetime.fromisoformat(data["started_at"]),
+            retention=retention,
+            max_entries=max_entries,
+            epoch=data.get("epoch") if resume else None
+        )
+        journal.base_seq = data["base_seq"]
+
+        for seq, timestamp, job_id, operation, fields in data["entries"]:
+            timestamp = datetime.fromisoformat(timestamp)
+            journal.entries.append(JournalEntry(seq, timestamp, job_id, operation, fields))
+            journal.timestamps.append(timestamp)
+        journal._count = len(journal.entries)
+
+        return journal
+
+    def copy(self) -> 'ChangeJournal':
+        """复制出新版本：与原版本共享条目列表，新版本追加的条目原版本不可见"""
+        journal = ChangeJournal(self.started_at, self.retention, self.max_entries, self.epoch)
+        journal.entries = self.entries
+        journal.timestamps = self.timestamps
+        journal.base_seq = self.base_seq
+        journal._count = self._count
+        return journal
+
+    @property
+    def last_seq(self) -> int:
+        return self.base_seq + self._count
+
+    def append(
+        self,
+        job_id: str,
+        operation: str,
+        fields: Optional[List[str]] = None,
+        timestamp: Optional[datetime] = None
+    ) -> int:
+        """追加一条变更，返回其序号（写操作串行，只在最新版本上追加）"""
+        # 列表末尾多出的条目来自被丢弃的写操作（出错未发布），没有读者能看到，直接截掉
+        if len(self.entries) > self._count:
+            del self.entries[self._count:]
+            del self.timestamps[self._count:]
+
+        timestamp = timestamp or datetime.now()
+        # 保证时间单调，二分查找才成立
+        if self._count and timestamp < self.timestamps[-1]:
+            timestamp = self.timestamps[-1]
+
+        entry = JournalEntry(self.last_seq + 1, timestamp, job_id, operation, fields or [])
+        self.entries.append(entry)
+        self.timestamps.append(timestamp)
+        self._count += 1
+
+        expired = 0
+        if self.timestamps[0] < timestamp - self.retention:
+            expired = bisect_left(self.timestamps, timestamp - self.retention)
+        if expired >= max(self.TRIM_BATCH, self._count // 8):
+            self._trim(expired)
+        elif self.max_entries and self._count > self.max_entries:
+            self._trim(self._count // 2)
+
+        return entry.seq
+
+    def _trim(self, count: int):
+        """丢弃最旧的 count 条：换成新列表，旧版本的读者仍持有原列表"""
+        self.started_at = self.timestamps[count - 1]
+        self.base_seq += count
+        self.entries = self.entries[count:]
+        self.timestamps = self.timestamps[count:]
+        self._count -= count
+
+    def seq_at(self, since: datetime) -> Optional[int]:
+        """
+        将时间换算为序号：返回时间不晚于 since 的最后一条变更的序号，
+        since 早于日志覆盖范围时返回 None
+        """
+        if since < self.started_at:
+            return None
+
+        return self.base_seq + bisect_right(self.timestamps, since, 0, self._count)
+
+    def entries_after(self, seq: int) -> Optional[List[JournalEntry]]:
+        """序号大于 seq 的变更；seq 对应的条目已被丢弃或超出当前序号时返回 None"""
+        if seq < self.base_seq or seq > self.last_seq:
+            return None
+
+        return self.entries[seq - self.base_seq:self._count]
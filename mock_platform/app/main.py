@@ -2,19 +2,50 @@
 模拟招聘平台 - 主应用
 提供RESTful API接口，定时生成和更新招聘信息
 """
-from flask import Flask, jsonify, request
-from datetime import datetime
-from .data_generator import JobDataGenerator
+from flask import Flask, Response, jsonify, make_response, request, stream_with_context
+from functools import wraps
+from datetime import datetime, timedelta
+from .data_generator import JobDataGenerator, encode_cursor
 from apscheduler.schedulers.background import BackgroundScheduler
 import atexit
+import json
+import os
+import signal
+import sys
+import threading
 
 app = Flask(__name__)
 
-# 初始化数据生成器
-job_generator = JobDataGenerator()
+# 流式导出时每次写出的招聘条数
+EXPORT_CHUNK_SIZE = 500
 
-# 初始化数据（500+条招聘信息）
-job_generator.initialize_jobs(count=500)
+# 批量查询单次最多的招聘ID数
+MAX_BATCH_SIZE = 500
+
+# 批量匹配单次最多的规则数
+MAX_MATCH_RULES = 10000
+
+# 初始化数据生成器（MOCK_JOB_STORAGE=columnar 时使用列式紧凑存储）
+# MOCK_SEED 指定随机种子，使压测数据可复现
+# MOCK_JOURNAL_RETENTION_HOURS 为变更日志保留时间，应不短于后端最长的规则执行间隔；
+# MOCK_JOURNAL_MAX_ENTRIES 为条目数上限（0 不限制），数据量很大时用于控制内存
+seed = os.getenv('MOCK_SEED')
+job_generator = JobDataGenerator(
+    storage=os.getenv('MOCK_JOB_STORAGE', 'dict'),
+    seed=int(seed) if seed else None,
+    journal_retention=timedelta(hours=float(os.getenv('MOCK_JOURNAL_RETENTION_HOURS', 24))),
+    journal_max_entries=int(os.getenv('MOCK_JOURNAL_MAX_ENTRIES', 0)) or None
+)
+
+# 快照文件：存在时从快照恢复，避免每次重启都生成全新数据
+SNAPSHOT_PATH = os.getenv('MOCK_SNAPSHOT_PATH')
+SNAPSHOT_INTERVAL_MINUTES = int(os.getenv('MOCK_SNAPSHOT_INTERVAL_MINUTES', 5))
+
+if SNAPSHOT_PATH and os.path.exists(SNAPSHOT_PATH):
+    job_generator.restore_snapshot(SNAPSHOT_PATH)
+else:
+    # 初始化数据（默认500条招聘信息，可通过 MOCK_INITIAL_JOBS 调整）
+    job_generator.initialize_jobs(count=int(os.getenv('MOCK_INITIAL_JOBS', 500)))
 
 
 def update_jobs_task():
@@ -29,17 +60,60 @@ def add_new_jobs_task():
     print(f"[{datetime.now()}] 执行新增任务，新增5条")
 
 
+def snapshot_task():
+    """定时快照任务：持久化平台数据"""
+    job_generator.save_snapshot(SNAPSHOT_PATH)
+    print(f"[{datetime.now()}] 执行快照任务")
+
+
 # 配置定时任务
 scheduler = BackgroundScheduler()
 scheduler.add_job(func=update_jobs_task, trigger="interval", minutes=10, id='update_jobs')
 scheduler.add_job(func=add_new_jobs_task, trigger="interval", minutes=25, id='add_new_jobs')
+if SNAPSHOT_PATH:
+    scheduler.add_job(func=snapshot_task, trigger="interval", minutes=SNAPSHOT_INTERVAL_MINUTES, id='snapshot')
 scheduler.start()
 
-# 确保应用退出时关闭调度器
-atexit.register(lambda: scheduler.shutdown())
+
+def shutdown():
+    """应用正常退出时关闭调度器（等待进行中的更新完成）并保存最后一次快照，标记为正常退出"""
+    scheduler.shutdown()
+    if SNAPSHOT_PATH:
+        job_generator.save_snapshot(SNAPSHOT_PATH, clean_shutdown=True)
+
+
+atexit.register(shutdown)
+
+# docker stop 发送 SIGTERM，默认处理会直接终止进程而不执行 atexit；
+# 转为正常退出，使最后一次快照得以写入（只有主线程能注册信号处理）
+if threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+
+def etag_cached(view):
+    """
+    以数据版本作为 ETag：请求携带的 If-None-Match 与当前版本一致时直接返回 304，
+    不执行查询和序列化
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = job_generator.data_version
+        
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response.set_etag(etag)
+        return response
+    
+    return wrapper
 
 
 @app.route('/api/v1/jobs', methods=['GET'])
+@etag_cached
 def get_jobs():
     """
     获取招聘列表（支持分页和过滤）
@@ -50,22 +124,34 @@ def get_jobs():
     - status: 状态过滤（active/inactive）
     - city: 城市过滤
     - keyword: 关键词搜索（岗位或技能）
+    - cursor: 翻页游标（取自上一页返回的 next_cursor，指定后忽略 page）
     """
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 20))
     status = request.args.get('status', 'active')
     city = request.args.get('city')
     keyword = request.args.get('keyword')
+    cursor = request.args.get('cursor')
     
-    jobs = job_generator.get_jobs(
-        page=page,
-        per_page=per_page,
-        status=status,
-        city=city,
-        keyword=keyword
-    )
+    try:
+        jobs = job_generator.get_jobs(
+            page=page,
+            per_page=per_page,
+            status=status,
+            city=city,
+            keyword=keyword,
+            cursor=cursor
+        )
+    except ValueError:
+        return jsonify({
+            "code": 400,
+            "message": "Invalid cursor",
+            "data": None,
+            "timestamp": datetime.now().isoformat()
+        }), 400
     
     total = job_generator.count_jobs(status=status, city=city, keyword=keyword)
+    next_cursor = encode_cursor(jobs[-1]) if jobs and len(jobs) == per_page else None
     
     return jsonify({
         "code": 0,
@@ -76,7 +162,8 @@ def get_jobs():
                 "page": page,
                 "per_page": per_page,
                 "total": total,
-                "pages": (total + per_page - 1) // per_page
+                "pages": (total + per_page - 1) // per_page,
+                "next_cursor": next_cursor
             }
         },
         "timestamp": datetime.now().isoformat()
@@ -84,6 +171,7 @@ def get_jobs():
 
 
 @app.route('/api/v1/jobs/<job_id>', methods=['GET'])
+@etag_cached
 def get_job_detail(job_id):
     """获取单条招聘详情"""
     job = job_generator.get_job_by_id(job_id)
@@ -104,7 +192,135 @@ def get_job_detail(job_id):
     })
 
 
+@app.route('/api/v1/jobs/batch', methods=['POST'])
+def get_jobs_batch():
+    """
+    批量获取招聘详情
+    
+    Body参数:
+    - ids: 招聘ID列表（最多 MAX_BATCH_SIZE 个）
+    
+    返回 jobs（招聘ID -> 招聘信息）与 missing（不存在的ID）
+    """
+    data = request.get_json(silent=True) or {}
+    job_ids = data.get('ids')
+    
+    if not isinstance(job_ids, list) or not all(isinstance(job_id, str) for job_id in job_ids):
+        return jsonify({
+            "code": 400,
+            "message": "'ids' must be a list of job IDs",
+            "data": None,
+            "timestamp": datetime.now().isoformat()
+        }), 400
+    
+    if len(job_ids) > MAX_BATCH_SIZE:
+        return jsonify({
+            "code": 400,
+            "message": f"Too many ids (max {MAX_BATCH_SIZE})",
+            "data": None,
+            "timestamp": datetime.now().isoformat()
+        }), 400
+    
+    jobs, missing = job_generator.get_jobs_by_ids(job_ids)
+    
+    return jsonify({
+        "code": 0,
+        "message": "success",
+        "data": {
+            "jobs": jobs,
+            "missing": missing
+        },
+        "timestamp": datetime.now().isoformat()
+    })
+
+
+# 监控规则中必须为字符串列表 / 整数的字段（均可省略或为 null）
+RULE_LIST_FIELDS = ('keywords', 'exclude_keywords', 'cities')
+RULE_INT_FIELDS = ('salary_min', 'salary_max')
+
+
+def _invalid_rule_field(rule: dict):
+    """返回规则中第一个类型不合法的字段名，全部合法时返回 None"""
+    for field in RULE_LIST_FIELDS:
+        value = rule.get(field)
+        if value is not None and not (
+            isinstance(value, list) and all(isinstance(item, str) for item in value)
+        ):
+            return field
+
+    for field in RULE_INT_FIELDS:
+        value = rule.get(field)
+        # bool 是 int 的子类，需单独排除
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            return field
+
+    return None
+
+
+@app.route('/api/v1/jobs/match', methods=['POST'])
+def match_jobs():
+    """
+    批量匹配监控规则（只匹配在招岗位），一次请求求值多条规则
+    
+    Body参数:
+    - rules: 规则列表（最多 MAX_MATCH_RULES 条），每条包含
+      - id: 规则标识（原样返回）
+      - keywords: 关键词列表（命中任一即可）
+      - exclude_keywords: 排除关键词列表
+      - cities: 城市列表（命中任一即可）
+      - salary_min / salary_max: 薪资区间（与岗位薪资区间重叠即可），整数
+    列表字段须为字符串列表，类型不符时返回 400
+    
+    返回 results，与 rules 顺序一一对应
+    """
+    data = request.get_json(silent=True) or {}
+    rules = data.get('rules')
+    
+    if not isinstance(rules, list) or not all(isinstance(rule, dict) for rule in rules):
+        return jsonify({
+            "code": 400,
+            "message": "'rules' must be a list of rule objects",
+            "data": None,
+            "timestamp": datetime.now().isoformat()
+        }), 400
+    
+    if len(rules) > MAX_MATCH_RULES:
+        return jsonify({
+            "code": 400,
+            "message": f"Too many rules (max {MAX_MATCH_RULES})",
+            "data": None,
+            "timestamp": datetime.now().isoformat()
+        }), 400
+    
+    for position, rule in enumerate(rules):
+        field = _invalid_rule_field(rule)
+        if field is not None:
+            expected = "a list of strings" if field in RULE_LIST_FIELDS else "an integer"
+            return jsonify({
+                "code": 400,
+                "message": f"rules[{position}].{field} must be {expected}",
+                "data": None,
+                "timestamp": datetime.now().isoformat()
+            }), 400
+    
+    matches = job_generator.match_rules(rules)
+    
+    return jsonify({
+        "code": 0,
+        "message": "success",
+        "data": {
+            "results": [
+                {"id": rule.get('id'), "job_ids": job_ids, "count": len(job_ids)}
+                for rule, job_ids in zip(rules, matches)
+            ],
+            "count": len(rules)
+        },
+        "timestamp": datetime.now().isoformat()
+    })
+
+
 @app.route('/api/v1/jobs/search', methods=['GET'])
+@etag_cached
 def search_jobs():
     """
     搜索招聘信息
@@ -116,19 +332,7 @@ def search_jobs():
     - salary_min: 最低薪资
     - salary_max: 最高薪资
     """
-    keyword = request.args.get('keyword', '')
-    skills = request.args.get('skills', '').split(',') if request.args.get('skills') else None
-    city = request.args.get('city')
-    salary_min = int(request.args.get('salary_min', 0))
-    salary_max = int(request.args.get('salary_max', 999999))
-    
-    jobs = job_generator.search_jobs(
-        keyword=keyword,
-        skills=skills,
-        city=city,
-        salary_min=salary_min,
-        salary_max=salary_max
-    )
+    jobs = job_generator.search_jobs(**_search_filters())
     
     return jsonify({
         "code": 0,
@@ -141,35 +345,87 @@ def search_jobs():
     })
 
 
+@app.route('/api/v1/jobs/export', methods=['GET'])
+def export_jobs():
+    """
+    流式导出搜索结果（NDJSON，每行一条招聘信息，分块传输）
+    
+    Query参数与 /api/v1/jobs/search 相同
+    """
+    jobs = job_generator.iter_search_jobs(**_search_filters())
+    
+    def generate():
+        lines = []
+        for job in jobs:
+            lines.append(json.dumps(job, ensure_ascii=False))
+            if len(lines) >= EXPORT_CHUNK_SIZE:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def _search_filters():
+    """解析搜索类接口共用的过滤参数"""
+    return {
+        "keyword": request.args.get('keyword', ''),
+        "skills": request.args.get('skills', '').split(',') if request.args.get('skills') else None,
+        "city": request.args.get('city'),
+        "salary_min": int(request.args.get('salary_min', 0)),
+        "salary_max": int(request.args.get('salary_max', 999999))
+    }
+
+
 @app.route('/api/v1/jobs/updates', methods=['GET'])
 def get_updates():
     """
-    获取指定时间后的更新
+    获取指定时间或变更序号后的更新
     
     Query参数:
     - since: ISO格式时间戳
+    - since_seq: 变更序号（取自上次返回的 last_seq，优先于 since）
+    
+    since_seq 已超出变更日志保留范围时返回 resync=true 与当前 last_seq（不含招聘数据），
+    调用方应全量同步后从该序号继续；
+    返回的 epoch 为变更日志纪元，与上次记录的不同（平台重新生成了数据，或从非正常退出的快照恢复）时序号不可比较，同样需要全量同步
     """
     since_str = request.args.get('since')
+    since_seq_str = request.args.get('since_seq')
+    since = None
+    since_seq = None
     
-    if not since_str:
+    if not since_str and not since_seq_str:
         return jsonify({
             "code": 400,
-            "message": "Missing 'since' parameter",
+            "message": "Missing 'since' or 'since_seq' parameter",
             "data": None,
             "timestamp": datetime.now().isoformat()
         }), 400
     
-    try:
-        since = datetime.fromisoformat(since_str.replace('Z', '+00:00'))
-    except ValueError:
-        return jsonify({
-            "code": 400,
-            "message": "Invalid datetime format",
-            "data": None,
-            "timestamp": datetime.now().isoformat()
-        }), 400
+    if since_seq_str:
+        try:
+            since_seq = int(since_seq_str)
+        except ValueError:
+            return jsonify({
+                "code": 400,
+                "message": "Invalid since_seq",
+                "data": None,
+                "timestamp": datetime.now().isoformat()
+            }), 400
+    else:
+        try:
+            since = datetime.fromisoformat(since_str.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({
+                "code": 400,
+                "message": "Invalid datetime format",
+                "data": None,
+                "timestamp": datetime.now().isoformat()
+            }), 400
     
-    updates = job_generator.get_updates_since(since)
+    updates = job_generator.get_updates_since(since=since, since_seq=since_seq)
     
     return jsonify({
         "code": 0,
@@ -180,6 +436,7 @@ def get_updates():
 
 
 @app.route('/api/v1/stats', methods=['GET'])
+@etag_cached
 def get_stats():
     """获取平台统计信息"""
     stats = job_generator.get_statistics()
@@ -0,0 +1,153 @@
+"""
+平台数据快照
+将招聘数据（列式编码）、下架招聘和变更日志写入单个文件，
+启动时内存映射该文件恢复，列数据按需分页读入而不是整体复制
+
+文件格式:
+    MAGIC(8字节) | 头部长度(uint64, 小端) | 头部JSON | 填充至8字节对齐 | 数据区
+数据区依次存放招聘ID（换行分隔的UTF-8文本）和各列的原始字节，偏移记录在头部
+
+进程正常退出前写入最后一次快照后，另写一个正常退出标记（快照路径加 .clean），
+记录快照对应的日志纪元与序号；只有带该标记的快照恢复后才能沿用原纪元继续编号
+"""
+import json
+import mmap
+import os
+import struct
+from datetime import datetime
+from typing import Dict, Optional
+
+from .columnar_store import ColumnarJobStore
+
+MAGIC = b'JOBSNAP1'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_snapshot(path: str, store: ColumnarJobStore, deleted_jobs: Dict, journal: Dict):
+    """写入快照：先写临时文件再原子替换，已映射旧文件的读者不受影响"""
+    state = store.export_state()
+
+    ids_blob = '\n'.join(state["ids"]).encode('utf-8')
+    blobs = [ids_blob]
+    columns = {}
+    offset = _align(len(ids_blob))
+
+    for name, column in state["columns"].items():
+        data = memoryview(column).cast('B')
+        columns[name] = {
+            "typecode": column.typecode if hasattr(column, 'typecode') else column.format,
+            "offset": offset,
+            "length": len(column)
+        }
+        blobs.append(data)
+        offset = _align(offset + len(data))
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "count": len(state["ids"]),
+        "ids": {"offset": 0, "size": len(ids_blob)},
+        "columns": columns,
+        "tables": state["tables"],
+        "sparse": state["sparse"],
+        "deleted_jobs": deleted_jobs,
+        "journal": journal
+    }, ensure_ascii=False).encode('utf-8')
+
+    tmp_path = f"{path}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        data_start = _align(f.tell())
+        f.write(b'\0' * (data_start - f.tell()))
+
+        for blob in blobs:
+            f.write(blob)
+            f.write(b'\0' * (_align(f.tell() - data_start) - (f.tell() - data_start)))
+
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> Dict:
+    """
+    读取快照：列数据以内存映射上的只读视图返回
+    返回 {"store": 存储状态, "mapped": 内存映射, "deleted_jobs": ..., "journal": ...}
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapped[:len(MAGIC)] != MAGIC:
+        mapped.close()
+        raise ValueError(f"Not a job snapshot: {path}")
+
+    header_start = len(MAGIC) + 8
+    (header_size,) = struct.unpack('<Q', mapped[len(MAGIC):header_start])
+    header = json.loads(mapped[header_start:header_start + header_size].decode('utf-8'))
+
+    if header["format"] != FORMAT_VERSION:
+        mapped.close()
+        raise ValueError(f"Unsupported snapshot format: {header['format']}")
+
+    data_start = _align(header_start + header_size)
+
+    ids_start = data_start + header["ids"]["offset"]
+    ids_blob = mapped[ids_start:ids_start + header["ids"]["size"]].decode('utf-8')
+    ids = ids_blob.split('\n') if header["count"] else []
+
+    buffer = memoryview(mapped)
+    columns = {}
+    for name, column in header["columns"].items():
+        start = data_start + column["offset"]
+        size = column["length"] * struct.calcsize(column["typecode"])
+        columns[name] = buffer[start:start + size].cast(column["typecode"])
+    buffer.release()
+
+    return {
+        "store": {
+            "ids": ids,
+            "columns": columns,
+            "tables": header["tables"],
+            "sparse": header["sparse"]
+        },
+        "mapped": mapped,
+        "deleted_jobs": header["deleted_jobs"],
+        "journal": header["journal"]
+    }
+
+
+def _clean_marker_path(path: str) -> str:
+    return f"{path}.clean"
+
+
+def write_clean_marker(path: str, epoch: str, last_seq: int):
+    """快照为正常退出前写入的最后状态：记录其日志纪元与序号"""
+    with open(_clean_marker_path(path), 'w', encoding='utf-8') as f:
+        json.dump({"epoch": epoch, "last_seq": last_seq}, f)
+
+
+def pop_clean_marker(path: str) -> Optional[Dict]:
+    """读取并删除正常退出标记（不存在时返回 None）：标记只能使用一次"""
+    marker_path = _clean_marker_path(path)
+    try:
+        with open(marker_path, encoding='utf-8') as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        marker = None
+
+    try:
+        os.remove(marker_path)
+    except FileNotFoundError:
+        pass
+
+    return marker
@@ -0,0 +1,141 @@
+"""
+平台数据状态
+招聘数据、下架招聘、索引、变更日志和数据版本组成一个整体，
+发布后只读：写操作在副本上修改后整体替换，读操作持有某一版本即可无锁读取；
+副本与原版本共享未修改的部分（招聘映射的底层存储、索引分片、日志列表），
+一次写操作的开销只与改动量有关，与数据总量无关
+"""
+from typing import Any, Dict, Iterator, MutableMapping, Optional
+
+from .job_index import ShardedJobIndex
+from .journal import ChangeJournal
+
+# 覆盖层中表示“已删除”的标记
+_DELETED = object()
+_MISSING = object()
+
+
+class VersionedMap(MutableMapping):
+    """
+    可廉价复制的映射：底层映射在各版本间共享且不再修改，
+    每个版本的改动记录在自己的覆盖层中，复制只复制覆盖层；
+    覆盖层超过底层的 1/8 时合并出新的底层映射，摊还后每次写入仍是常数开销
+    """
+
+    MIN_COMPACT = 4096
+
+    def __init__(self, base: MutableMapping, overlay: Optional[Dict] = None, size: Optional[int] = None):
+        self.base = base
+        self._overlay: Dict[str, Any] = overlay if overlay is not None else {}
+        self._size = len(base) if size is None else size
+
+    def copy(self) -> 'VersionedMap':
+        return VersionedMap(self.base, dict(self._overlay), self._size)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: str):
+        value = self._overlay.get(key, _MISSING)
+        if value is _MISSING:
+            return self.base[key]
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        value = self._overlay.get(key, _MISSING)
+        if value is _MISSING:
+            return key in self.base
+        return value is not _DELETED
+
+    def __iter__(self) -> Iterator[str]:
+        """与 dict 的顺序一致：修改不改变位置，新增排在最后"""
+        overlay = self._overlay
+        for key in self.base:
+            if overlay.get(key) is not _DELETED:
+                yield key
+        for key, value in overlay.items():
+            if value is not _DELETED and key not in self.base:
+                yield key
+
+    def __setitem__(self, key: str, value):
+        if key not in self:
+            self._size += 1
+        self._overlay[key] = value
+        self._maybe_compact()
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self._size -= 1
+        if key in self.base:
+            self._overlay[key] = _DELETED
+        else:
+            del self._overlay[key]
+        self._maybe_compact()
+
+    def materialized(self) -> MutableMapping:
+        """合并覆盖层得到与底层同类型的独立映射（不修改本映射）"""
+        merged = self.base.copy()
+        for key, value in self._overlay.items():
+            if value is _DELETED:
+                merged.pop(key, None)
+            else:
+                merged[key] = value
+        return merged
+
+    def _maybe_compact(self):
+        if len(self._overlay) > max(self.MIN_COMPACT, len(self.base) // 8):
+            self.base = self.materialized()
+            self._overlay = {}
+
+
+class PlatformState:
+    """某一版本的平台数据"""
+
+    def __init__(
+        self,
+        jobs: MutableMapping[str, Dict],
+        deleted_jobs: Optional[MutableMapping[str, Dict]] = None,
+        index: Optional[ShardedJobIndex] = None,
+        journal: Optional[ChangeJournal] = None,
+        version: int = 0
+    ):
+        self.jobs = jobs if isinstance(jobs, VersionedMap) else VersionedMap(jobs)
+        if not isinstance(deleted_jobs, VersionedMap):
+            deleted_jobs = VersionedMap(deleted_jobs if deleted_jobs is not None else {})
+        self.deleted_jobs = deleted_jobs
+        self.index = index or ShardedJobIndex.for_size(len(jobs))
+        self.journal = journal or ChangeJournal()
+        # 数据版本：任何增删改都会递增
+        self.version = version
+
+    def copy(self) -> 'PlatformState':
+        """复制出可修改的新版本（共享未修改的部分，开销与数据总量无关）"""
+        return PlatformState(
+            jobs=self.jobs.copy(),
+            deleted_jobs=self.deleted_jobs.copy(),
+            index=self.index.copy(),
+            journal=self.journal.copy(),
+            version=self.version
+        )
+
+    def insert(self, job: Dict):
+        """写入新招聘信息并加入索引"""
+        self.jobs[job['id']] = job
+        self.index.add(job)
+        self.version += 1
+
+    def replace(self, old_job: Dict, new_job: Dict):
+        """用修改后的副本替换招聘信息（不原地修改，旧版本的读者不受影响）"""
+        self.jobs[new_job['id']] = new_job
+        self.index.update(old_job, new_job)
+        self.version += 1
+
+    def remove(self, job_id: str) -> Dict:
+        """移除招聘信息并移出索引"""
+        job = self.jobs.pop(job_id)
+        self.index.remove(job)
+        self.version += 1
+        return job
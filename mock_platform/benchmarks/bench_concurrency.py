@@ -0,0 +1,94 @@
+"""
+并发读写基准
+多个读线程持续调用列表/搜索/统计/增量接口，同时一个写线程不断执行随机更新与新增，
+统计读吞吐量与读取过程中出现的异常数（写时复制发布后应为 0）
+
+用法（在 mock_platform 目录下）:
+    python -m benchmarks.bench_concurrency [招聘数量] [读线程数] [秒数]
+"""
+import sys
+import threading
+import time
+from collections import Counter
+
+from app.data_generator import JobDataGenerator
+
+DEFAULT_JOBS = 20_000
+DEFAULT_READERS = 4
+DEFAULT_SECONDS = 10
+
+
+def reader(generator: JobDataGenerator, stop: threading.Event, ops: Counter, errors: Counter):
+    """轮流执行各类读操作，校验每次读到的数据自洽"""
+    since_seq = generator.journal.last_seq
+
+    while not stop.is_set():
+        try:
+            jobs = generator.get_jobs(per_page=20, city="北京")
+            assert all(job['status'] == 'active' and job['location'] == "北京" for job in jobs)
+
+            results = generator.search_jobs(keyword="python", salary_min=20, salary_max=30)
+            assert all(job['salary_max'] >= 20 and job['salary_min'] <= 30 for job in results)
+
+            stats = generator.get_statistics()
+            assert stats['active'] + stats['inactive'] == stats['total']
+
+            updates = generator.get_updates_since(since_seq=since_seq)
+            since_seq = updates['last_seq']
+
+            ops['read'] += 4
+        except Exception as e:
+            errors[type(e).__name__] += 1
+
+
+def writer(generator: JobDataGenerator, stop: threading.Event, ops: Counter, errors: Counter):
+    while not stop.is_set():
+        try:
+            generator.random_update_jobs(update_ratio=0.01)
+            generator.add_new_jobs(count=5)
+            ops['write'] += 2
+        except Exception as e:
+            errors[type(e).__name__] += 1
+
+
+def main(job_count: int, reader_count: int, seconds: float):
+    generator = JobDataGenerator(seed=42)
+    generator.initialize_jobs(job_count)
+
+    stop = threading.Event()
+    ops: Counter = Counter()
+    errors: Counter = Counter()
+
+    threads = [
+        threading.Thread(target=reader, args=(generator, stop, ops, errors))
+        for _ in range(reader_count)
+    ]
+    threads.append(threading.Thread(target=writer, args=(generator, stop, ops, errors)))
+
+    # 写线程每批都会打印日志，基准期间静默
+    stdout = sys.stdout
+    sys.stdout = open('/dev/null', 'w')
+    try:
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    print(f"jobs={job_count:,} readers={reader_count} seconds={seconds}")
+    print(f"reads/s:  {ops['read'] / seconds:,.0f}")
+    print(f"writes/s: {ops['write'] / seconds:,.1f}")
+    print(f"errors:   {sum(errors.values())} {dict(errors) if errors else ''}")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else DEFAULT_JOBS,
+        int(args[1]) if len(args) > 1 else DEFAULT_READERS,
+        float(args[2]) if len(args) > 2 else DEFAULT_SECONDS
+    )
@@ -0,0 +1,68 @@
+"""
+招聘数据存储内存基准
+对比 dict 与 columnar 两种存储在不同数据量下每条招聘占用的字节数
+
+用法（在 mock_platform 目录下）:
+    python -m benchmarks.bench_memory [数量 ...]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from app.data_generator import JobDataGenerator
+from app.job_index import ShardedJobIndex
+
+DEFAULT_COUNTS = [100_000, 1_000_000]
+
+
+def measure(storage: str, count: int) -> dict:
+    """生成 count 条招聘，分别统计存储与索引的内存占用"""
+    generator = JobDataGenerator(storage=storage)
+    gc.collect()
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    before = tracemalloc.get_traced_memory()[0]
+
+    jobs = generator._create_store(storage)
+    for _ in range(count):
+        job = generator._generate_job()
+        jobs[job['id']] = job
+    del job
+
+    gc.collect()
+    after_store = tracemalloc.get_traced_memory()[0]
+
+    index = ShardedJobIndex.for_size(count)
+    index.extend(jobs.values())
+    gc.collect()
+    after_index = tracemalloc.get_traced_memory()[0]
+
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+
+    return {
+        "storage": storage,
+        "count": count,
+        "store_bytes_per_job": (after_store - before) / count,
+        "index_bytes_per_job": (after_index - after_store) / count,
+        "seconds": elapsed
+    }
+
+
+def main(counts):
+    print(f"{'storage':<10}{'jobs':>12}{'store B/job':>14}{'index B/job':>14}{'seconds':>10}")
+    for count in counts:
+        for storage in JobDataGenerator.STORAGE_BACKENDS:
+            result = measure(storage, count)
+            print(
+                f"{result['storage']:<10}{result['count']:>12,}"
+                f"{result['store_bytes_per_job']:>14,.0f}"
+                f"{result['index_bytes_per_job']:>14,.0f}"
+                f"{result['seconds']:>10.1f}"
+            )
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
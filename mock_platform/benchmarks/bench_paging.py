@@ -0,0 +1,68 @@
+"""
+列表分页与计数基准
+按默认的 status=active 过滤连续翻页与计数，对比不过滤时的耗时；
+两者都应与数据量无关（只检查到凑满一页为止，计数直接取倒排表大小）。
+同时与复制候选集后分页的结果比对，确认视图分页的结果不变
+
+用法（在 mock_platform 目录下）:
+    python -m benchmarks.bench_paging [招聘数量] [翻页数]
+"""
+import sys
+import time
+
+from app.data_generator import JobDataGenerator, encode_cursor
+
+DEFAULT_JOBS = 400_000
+DEFAULT_PAGES = 50
+PER_PAGE = 20
+
+
+def page_through(generator: JobDataGenerator, pages: int, status) -> tuple:
+    """用游标连续翻 pages 页，返回 (每页平均秒数, 全部招聘ID)"""
+    cursor = None
+    seen = []
+
+    started = time.perf_counter()
+    for _ in range(pages):
+        jobs = generator.get_jobs(per_page=PER_PAGE, status=status, cursor=cursor)
+        if not jobs:
+            break
+        seen.extend(job['id'] for job in jobs)
+        cursor = encode_cursor(jobs[-1])
+    elapsed = time.perf_counter() - started
+
+    return elapsed / pages, seen
+
+
+def main(job_count: int, pages: int):
+    generator = JobDataGenerator(seed=42)
+    generator.initialize_jobs(job_count)
+    generator.random_update_jobs(update_ratio=0.1)
+
+    per_page_active, active_ids = page_through(generator, pages, 'active')
+    per_page_all, _ = page_through(generator, pages, None)
+
+    started = time.perf_counter()
+    count = generator.count_jobs()
+    count_seconds = time.perf_counter() - started
+
+    # 参照：复制出完整候选集后分页
+    state = generator._state
+    expected = state.index.newest(
+        state.index.candidates(status='active'), limit=len(active_ids)
+    )
+    assert active_ids == expected, "视图分页结果与复制候选集分页不一致"
+    assert count == generator.get_statistics()['active']
+
+    print(f"jobs={job_count:,} pages={pages} per_page={PER_PAGE}")
+    print(f"status=active 每页: {per_page_active * 1000:.2f} ms")
+    print(f"不过滤       每页: {per_page_all * 1000:.2f} ms")
+    print(f"count_jobs:        {count_seconds * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(
+        args[0] if len(args) > 0 else DEFAULT_JOBS,
+        args[1] if len(args) > 1 else DEFAULT_PAGES
+    )